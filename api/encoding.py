@@ -0,0 +1,60 @@
+"""JSON encoding for API responses, with orjson when it is installed.
+
+Everything the API returns is built from dicts, lists, strings and numbers
+read from SQLite, so both encoders produce the same document (key order and
+whitespace aside).
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+ENCODER_ENV_VAR = "WORKOUT_JSON_ENCODER"
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+@dataclass(frozen=True)
+class JsonEncoder:
+    name: str
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+STDLIB_ENCODER = JsonEncoder("stdlib", _stdlib_dumps)
+ORJSON_ENCODER = JsonEncoder("orjson", _orjson_dumps) if orjson is not None else None
+
+
+def select_json_encoder(name: str | None = None) -> JsonEncoder:
+    """Pick an encoder by name ("orjson", "stdlib"), or by the
+    WORKOUT_JSON_ENCODER variable, or the fastest one installed."""
+    name = name or os.environ.get(ENCODER_ENV_VAR) or "auto"
+    if name == "stdlib":
+        return STDLIB_ENCODER
+    if name == "orjson":
+        if ORJSON_ENCODER is None:
+            raise ValueError("JSON_ENCODER_UNAVAILABLE")
+        return ORJSON_ENCODER
+    if name == "auto":
+        return ORJSON_ENCODER or STDLIB_ENCODER
+    raise ValueError("UNKNOWN_JSON_ENCODER")
+
+
+_default_encoder = select_json_encoder()
+
+
+def dumps(value: Any) -> bytes:
+    """Encode with the process default encoder."""
+    return _default_encoder.dumps(value)
@@ -0,0 +1,93 @@
+import csv
+import io
+from typing import Any, Iterator
+
+from api.encoding import dumps
+from db.connection import DbConnection
+from queries.sessions import iter_session_history
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+SESSION_CSV_COLUMNS = [
+    "session_id",
+    "performed_at",
+    "duration_minutes",
+    "notes",
+    "completion_status",
+    "manual_audit_flag",
+    "template_id",
+    "plan_id",
+    "day_index",
+]
+SET_CSV_COLUMNS = [
+    "exercise_id",
+    "exercise_name",
+    "set_number",
+    "reps",
+    "weight",
+    "rpe",
+    "rest_seconds",
+    "is_initial_load",
+]
+
+
+def _iter_ndjson(sessions: Iterator[dict[str, Any]]) -> Iterator[str]:
+    for session in sessions:
+        yield dumps(session).decode("utf-8") + "\n"
+
+
+def _iter_csv(sessions: Iterator[dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SESSION_CSV_COLUMNS + SET_CSV_COLUMNS)
+    for session in sessions:
+        session_values = [
+            session["id"],
+            session["performed_at"],
+            session["duration_minutes"],
+            session["notes"],
+            session["completion_status"],
+            int(session["manual_audit_flag"]),
+            session["template_id"],
+            session["plan_id"],
+            session["day_index"],
+        ]
+        if not session["set_logs"]:
+            writer.writerow(session_values + [None] * len(SET_CSV_COLUMNS))
+        for set_log in session["set_logs"]:
+            writer.writerow(
+                session_values
+                + [
+                    set_log["exercise_id"],
+                    set_log["exercise_name"],
+                    set_log["set_number"],
+                    set_log["reps"],
+                    set_log["weight"],
+                    set_log["rpe"],
+                    set_log["rest_seconds"],
+                    int(set_log["is_initial_load"]),
+                ]
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_history(
+    db: DbConnection,
+    user_id: int,
+    export_format: str = "ndjson",
+    since: str | None = None,
+    until: str | None = None,
+) -> Iterator[str]:
+    """Stream a user's full history as NDJSON (one session per line) or CSV (one set per row)."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("INVALID_EXPORT_FORMAT")
+    sessions = iter_session_history(db, user_id, since=since, until=until)
+    if export_format == "csv":
+        return _iter_csv(sessions)
+    return _iter_ndjson(sessions)
@@ -1,8 +1,11 @@
 from datetime import date
 from typing import Any
 
+from db.connection import DbConnection
 from domain.plans.generator import PlanGenerator
-from domain.plans.swap import apply_swap, list_swap_options
+from domain.plans.swap import SwapRequest, apply_swaps, list_swap_options
+
+MAX_BULK_SWAPS = 200
 
 
 def _parse_start_date(value: str | None) -> date | None:
@@ -11,7 +14,7 @@ def _parse_start_date(value: str | None) -> date | None:
     return date.fromisoformat(value)
 
 
-def generate_plan(db_path: str, payload: dict[str, Any]) -> int:
+def generate_plan(db: DbConnection, payload: dict[str, Any]) -> int:
     if "questionnaire_id" not in payload:
         raise ValueError("questionnaire_id is required")
     questionnaire_id = payload["questionnaire_id"]
@@ -24,7 +27,7 @@ def generate_plan(db_path: str, payload: dict[str, Any]) -> int:
     name = payload.get("name", "Generated Plan")
     generator = PlanGenerator()
     return generator.generate(
-        db_path=db_path,
+        db,
         questionnaire_id=questionnaire_id,
         start_date=start_date,
         weeks=weeks,
@@ -33,7 +36,7 @@ def generate_plan(db_path: str, payload: dict[str, Any]) -> int:
 
 
 def get_swap_options(
-    db_path: str, plan_id: int, day_index: int, sequence: int
+    db: DbConnection, plan_id: int, day_index: int, sequence: int
 ) -> list[dict[str, Any]]:
     if plan_id <= 0:
         raise ValueError("plan_id must be positive")
@@ -41,7 +44,7 @@ def get_swap_options(
         raise ValueError("day_index must be non-negative")
     if sequence <= 0:
         raise ValueError("sequence must be positive")
-    options = list_swap_options(db_path, plan_id, day_index, sequence)
+    options = list_swap_options(db, plan_id, day_index, sequence)
     return [
         {
             "id": option.id,
@@ -50,32 +53,63 @@ def get_swap_options(
             "category": option.category,
             "equipment_id": option.equipment_id,
             "primary_muscle": option.primary_muscle,
+            "suggested": option.suggested,
         }
         for option in options
     ]
 
 
-def swap_plan_exercise(db_path: str, payload: dict[str, Any]) -> None:
-    required_fields = {"plan_id", "day_index", "sequence", "exercise_id"}
+def _parse_swap_request(payload: dict[str, Any]) -> SwapRequest:
+    required_fields = {"day_index", "sequence", "exercise_id"}
     missing = required_fields - payload.keys()
     if missing:
         raise ValueError(f"missing fields: {', '.join(sorted(missing))}")
-    plan_id = payload["plan_id"]
     day_index = payload["day_index"]
     sequence = payload["sequence"]
     exercise_id = payload["exercise_id"]
-    if plan_id <= 0:
-        raise ValueError("plan_id must be positive")
     if day_index < 0:
         raise ValueError("day_index must be non-negative")
     if sequence <= 0:
         raise ValueError("sequence must be positive")
     if exercise_id <= 0:
         raise ValueError("exercise_id must be positive")
-    apply_swap(
-        db_path=db_path,
-        plan_id=plan_id,
-        day_index=day_index,
-        sequence=sequence,
-        new_exercise_id=exercise_id,
-    )
+    return SwapRequest(day_index=day_index, sequence=sequence, exercise_id=exercise_id)
+
+
+def _parse_plan_id(payload: dict[str, Any]) -> int:
+    if "plan_id" not in payload:
+        raise ValueError("missing fields: plan_id")
+    plan_id = payload["plan_id"]
+    if plan_id <= 0:
+        raise ValueError("plan_id must be positive")
+    return plan_id
+
+
+def swap_plan_exercise(db: DbConnection, payload: dict[str, Any]) -> None:
+    required_fields = {"plan_id", "day_index", "sequence", "exercise_id"}
+    missing = required_fields - payload.keys()
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(sorted(missing))}")
+    plan_id = _parse_plan_id(payload)
+    apply_swaps(db, plan_id, [_parse_swap_request(payload)])
+
+
+def swap_plan_exercises(db: DbConnection, payload: dict[str, Any]) -> int:
+    """Apply {"swaps": [{day_index, sequence, exercise_id}, ...]} to one plan
+    in a single transaction; returns the number of slots swapped."""
+    plan_id = _parse_plan_id(payload)
+    swaps = payload.get("swaps")
+    if not isinstance(swaps, list) or not swaps:
+        raise ValueError("swaps must be a non-empty list")
+    if len(swaps) > MAX_BULK_SWAPS:
+        raise ValueError(f"at most {MAX_BULK_SWAPS} swaps per request")
+    requests = []
+    for index, entry in enumerate(swaps):
+        if not isinstance(entry, dict):
+            raise ValueError(f"swaps[{index}] must be an object")
+        try:
+            requests.append(_parse_swap_request(entry))
+        except ValueError as exc:
+            raise ValueError(f"swaps[{index}]: {exc}") from None
+    apply_swaps(db, plan_id, requests)
+    return len(requests)
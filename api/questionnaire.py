@@ -1,7 +1,7 @@
 import re
 from typing import Any
 
-from db.connection import get_db_connection
+from db.connection import DbConnection
 
 SNAKE_CASE_PATTERN = re.compile(r"^[a-z]+(_[a-z]+)*$")
 REQUIRED_FIELDS = {
@@ -111,43 +111,39 @@ def _normalize_payload(payload: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def create_questionnaire(db_path: str, payload: dict[str, Any]) -> int:
+def create_questionnaire(db: DbConnection, payload: dict[str, Any]) -> int:
     normalized = _normalize_payload(payload)
-    db = get_db_connection(db_path)
-    try:
-        with db:
-            db.execute(
-                "UPDATE users SET smallest_increment = ? WHERE id = ?",
-                (normalized["smallest_increment"], normalized["user_id"]),
-            )
-            cursor = db.execute(
-                """
-                INSERT INTO questionnaire_responses
-                    (user_id, goals, experience_level, schedule_days, equipment_available,
-                     session_duration_minutes, injuries_constraints, excluded_patterns,
-                     training_days_of_week, focus_areas, split_variant)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    normalized["user_id"],
-                    normalized["goals"],
-                    normalized["experience_level"],
-                    normalized["schedule_days"],
-                    normalized["equipment_available"],
-                    normalized.get("session_duration_minutes"),
-                    normalized.get("injuries_constraints"),
-                    normalized.get("excluded_patterns"),
-                    ",".join(str(day) for day in normalized["training_days_of_week"])
-                    if normalized["training_days_of_week"]
-                    else None,
-                    ",".join(normalized["focus_areas"])
-                    if normalized.get("focus_areas")
-                    else None,
-                    normalized.get("split_variant"),
-                ),
-            )
-            response_id = cursor.lastrowid
-    finally:
-        db.close()
+    with db:
+        db.execute(
+            "UPDATE users SET smallest_increment = ? WHERE id = ?",
+            (normalized["smallest_increment"], normalized["user_id"]),
+        )
+        cursor = db.execute(
+            """
+            INSERT INTO questionnaire_responses
+                (user_id, goals, experience_level, schedule_days, equipment_available,
+                 session_duration_minutes, injuries_constraints, excluded_patterns,
+                 training_days_of_week, focus_areas, split_variant)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                normalized["user_id"],
+                normalized["goals"],
+                normalized["experience_level"],
+                normalized["schedule_days"],
+                normalized["equipment_available"],
+                normalized.get("session_duration_minutes"),
+                normalized.get("injuries_constraints"),
+                normalized.get("excluded_patterns"),
+                ",".join(str(day) for day in normalized["training_days_of_week"])
+                if normalized["training_days_of_week"]
+                else None,
+                ",".join(normalized["focus_areas"])
+                if normalized.get("focus_areas")
+                else None,
+                normalized.get("split_variant"),
+            ),
+        )
+        response_id = cursor.lastrowid
 
     return int(response_id)
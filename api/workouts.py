@@ -1,29 +1,91 @@
-from typing import Any
+import json
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
 
-from db.connection import DbConnection, get_db_connection
+from db.connection import DbConnection
+from domain.exercises.catalog import get_exercise_catalog
+from domain.progression.records import record_personal_records, refresh_personal_records
+from domain.progression.state import record_session_progression, refresh_progression_states
 from domain.workouts.logging import SessionInput, SetLogInput, validate_session
+from queries.versions import bump_user_data_versions
 
+IMPORT_CHUNK_SIZE = 500
+
+INSERT_SESSION_SQL = """
+    INSERT INTO workout_sessions
+        (user_id, template_id, performed_at, duration_minutes, notes, completion_status, manual_audit_flag)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_SESSION_WITH_ID_SQL = """
+    INSERT INTO workout_sessions
+        (id, user_id, template_id, performed_at, duration_minutes, notes, completion_status, manual_audit_flag)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_SESSION_PLAN_SQL = """
+    INSERT INTO workout_session_plans
+        (session_id, plan_id, day_index)
+    VALUES (?, ?, ?)
+"""
+INSERT_SET_LOG_SQL = """
+    INSERT INTO set_logs
+        (session_id, exercise_id, set_number, reps, weight, rpe, rest_seconds, is_initial_load)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(frozen=True)
+class ImportRecordError:
+    index: int
+    error: str
+
+
+@dataclass
+class ImportResult:
+    session_ids: list[int] = field(default_factory=list)
+    errors: list[ImportRecordError] = field(default_factory=list)
+
+    @property
+    def imported(self) -> int:
+        return len(self.session_ids)
+
+
+@dataclass(frozen=True)
+class _ParsedSession:
+    index: int
+    session: SessionInput
+    set_logs: list[SetLogInput]
+    plan_id: int | None
+    day_index: int | None
+
+
+def _fetch_existing_ids(db: DbConnection, table: str, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    placeholders = ",".join("?" for _ in ids)
+    cursor = db.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", tuple(ids))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _bodyweight_exercise_ids(categories: dict[int, str]) -> set[int]:
+    return {
+        exercise_id
+        for exercise_id, category in categories.items()
+        if category.lower() == "bodyweight"
+    }
 
-def _fetch_exercise_categories(
-    db: DbConnection, exercise_ids: set[int]
-) -> dict[int, str]:
-    if not exercise_ids:
-        return {}
-    placeholders = ",".join("?" for _ in exercise_ids)
-    cursor = db.execute(
-        f"SELECT id, category FROM exercises WHERE id IN ({placeholders})",
-        tuple(exercise_ids),
-    )
-    rows = cursor.fetchall()
-    categories = {row[0]: row[1] for row in rows}
-    missing = exercise_ids - categories.keys()
-    if missing:
-        raise ValueError("INVALID_EXERCISE_ID")
-    return categories
 
+def _require_id(value: Any, field: str) -> int:
+    # Ids are used as set members and lookup keys before validation runs.
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{field} must be an integer")
+    return value
 
-def create_session(db_path: str, payload: dict[str, Any]) -> int:
-    db = get_db_connection(db_path)
+
+def _parse_session_payload(
+    payload: dict[str, Any],
+) -> tuple[SessionInput, list[SetLogInput], int | None, int | None]:
     plan_id = payload.get("plan_id")
     day_index = payload.get("day_index")
     try:
@@ -33,7 +95,7 @@ def create_session(db_path: str, payload: dict[str, Any]) -> int:
         plan_id = None
         day_index = None
     session = SessionInput(
-        user_id=payload["user_id"],
+        user_id=_require_id(payload["user_id"], "user_id"),
         performed_at=payload["performed_at"],
         duration_minutes=payload.get("duration_minutes"),
         notes=payload.get("notes"),
@@ -43,7 +105,7 @@ def create_session(db_path: str, payload: dict[str, Any]) -> int:
     )
     set_logs = [
         SetLogInput(
-            exercise_id=entry["exercise_id"],
+            exercise_id=_require_id(entry["exercise_id"], "exercise_id"),
             set_number=entry["set_number"],
             reps=entry["reps"],
             weight=entry["weight"],
@@ -53,68 +115,201 @@ def create_session(db_path: str, payload: dict[str, Any]) -> int:
         )
         for entry in payload["set_logs"]
     ]
+    return session, set_logs, plan_id, day_index
+
+
+def _session_row(session: SessionInput) -> tuple:
+    return (
+        session.user_id,
+        session.template_id,
+        session.performed_at,
+        session.duration_minutes,
+        session.notes,
+        session.completion_status,
+        1 if session.manual_audit_flag else 0,
+    )
+
+
+def _set_log_rows(session_id: int, set_logs: Iterable[SetLogInput]) -> list[tuple]:
+    return [
+        (
+            session_id,
+            set_log.exercise_id,
+            set_log.set_number,
+            set_log.reps,
+            set_log.weight,
+            set_log.rpe,
+            set_log.rest_seconds,
+            1 if set_log.is_initial_load else 0,
+        )
+        for set_log in set_logs
+    ]
+
+
+def create_session(db: DbConnection, payload: dict[str, Any]) -> int:
+    session, set_logs, plan_id, day_index = _parse_session_payload(payload)
     exercise_ids = {set_log.exercise_id for set_log in set_logs}
-    categories = _fetch_exercise_categories(db, exercise_ids)
-    bodyweight_exercise_ids = {
-        exercise_id
-        for exercise_id, category in categories.items()
-        if category.lower() == "bodyweight"
-    }
-    validate_session(session, set_logs, bodyweight_exercise_ids)
+    categories = get_exercise_catalog(db).categories(exercise_ids)
+    if exercise_ids - categories.keys():
+        raise ValueError("INVALID_EXERCISE_ID")
+    validate_session(session, set_logs, _bodyweight_exercise_ids(categories))
 
-    try:
-        with db:
-            cursor = db.execute(
-                """
-                INSERT INTO workout_sessions
-                    (user_id, template_id, performed_at, duration_minutes, notes, completion_status, manual_audit_flag)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    session.user_id,
-                    session.template_id,
-                    session.performed_at,
-                    session.duration_minutes,
-                    session.notes,
-                    session.completion_status,
-                    1 if session.manual_audit_flag else 0,
-                ),
+    with db:
+        cursor = db.execute(INSERT_SESSION_SQL, _session_row(session))
+        session_id = cursor.lastrowid
+        if plan_id is not None and day_index is not None:
+            db.execute(INSERT_SESSION_PLAN_SQL, (session_id, plan_id, day_index))
+        db.executemany(INSERT_SET_LOG_SQL, _set_log_rows(session_id, set_logs))
+        record_session_progression(db, session.user_id, session_id, set_logs)
+        record_personal_records(db, session.user_id, session_id, session.performed_at, set_logs)
+        bump_user_data_versions(db, [session.user_id])
+
+    return int(session_id)
+
+
+def _parse_import_chunk(
+    db: DbConnection, chunk: list[tuple[int, Any]], result: ImportResult
+) -> list[_ParsedSession]:
+    parsed: list[_ParsedSession] = []
+    for index, payload in chunk:
+        try:
+            if isinstance(payload, ValueError):
+                raise payload
+            if not isinstance(payload, dict):
+                raise ValueError("session must be an object")
+            parsed.append(_ParsedSession(index, *_parse_session_payload(payload)))
+        except KeyError as exc:
+            result.errors.append(ImportRecordError(index, f"{exc.args[0]} is required"))
+        except (TypeError, ValueError) as exc:
+            result.errors.append(ImportRecordError(index, str(exc)))
+
+    # One lookup per table for the whole chunk instead of one per session.
+    categories = get_exercise_catalog(db).categories(
+        {set_log.exercise_id for record in parsed for set_log in record.set_logs}
+    )
+    bodyweight_ids = _bodyweight_exercise_ids(categories)
+    user_ids = _fetch_existing_ids(db, "users", {record.session.user_id for record in parsed})
+    plan_ids = _fetch_existing_ids(
+        db, "plans", {record.plan_id for record in parsed if record.plan_id is not None}
+    )
+
+    valid: list[_ParsedSession] = []
+    for record in parsed:
+        try:
+            validate_session(record.session, record.set_logs, bodyweight_ids)
+            if record.session.user_id not in user_ids:
+                raise ValueError("INVALID_USER_ID")
+            if any(set_log.exercise_id not in categories for set_log in record.set_logs):
+                raise ValueError("INVALID_EXERCISE_ID")
+            if record.plan_id is not None and record.plan_id not in plan_ids:
+                raise ValueError("INVALID_PLAN_ID")
+            set_keys = Counter(
+                (set_log.exercise_id, set_log.set_number) for set_log in record.set_logs
             )
-            session_id = cursor.lastrowid
-            if plan_id is not None and day_index is not None:
-                db.execute(
-                    """
-                    INSERT INTO workout_session_plans
-                        (session_id, plan_id, day_index)
-                    VALUES (?, ?, ?)
-                    """,
-                    (
-                        session_id,
-                        plan_id,
-                        day_index,
-                    ),
-                )
-            db.executemany(
-                """
-                INSERT INTO set_logs
-                    (session_id, exercise_id, set_number, reps, weight, rpe, rest_seconds, is_initial_load)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        session_id,
-                        set_log.exercise_id,
-                        set_log.set_number,
-                        set_log.reps,
-                        set_log.weight,
-                        set_log.rpe,
-                        set_log.rest_seconds,
-                        1 if set_log.is_initial_load else 0,
-                    )
-                    for set_log in set_logs
-                ],
+            if any(count > 1 for count in set_keys.values()):
+                raise ValueError("DUPLICATE_SET_NUMBER")
+        except (TypeError, ValueError) as exc:
+            result.errors.append(ImportRecordError(record.index, str(exc)))
+            continue
+        valid.append(record)
+    return valid
+
+
+def _insert_import_chunk(db: DbConnection, records: list[_ParsedSession]) -> list[int]:
+    # BEGIN IMMEDIATE takes the write lock before ids are allocated, so the
+    # explicit ids below cannot collide with another writer.
+    db.execute("BEGIN IMMEDIATE")
+    with db:
+        next_id = db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM workout_sessions").fetchone()[0]
+        session_ids = list(range(next_id, next_id + len(records)))
+        db.executemany(
+            INSERT_SESSION_WITH_ID_SQL,
+            [
+                (session_id, *_session_row(record.session))
+                for session_id, record in zip(session_ids, records)
+            ],
+        )
+        db.executemany(
+            INSERT_SESSION_PLAN_SQL,
+            [
+                (session_id, record.plan_id, record.day_index)
+                for session_id, record in zip(session_ids, records)
+                if record.plan_id is not None and record.day_index is not None
+            ],
+        )
+        db.executemany(
+            INSERT_SET_LOG_SQL,
+            [
+                row
+                for session_id, record in zip(session_ids, records)
+                for row in _set_log_rows(session_id, record.set_logs)
+            ],
+        )
+        touched: dict[int, set[int]] = {}
+        for record in records:
+            touched.setdefault(record.session.user_id, set()).update(
+                set_log.exercise_id for set_log in record.set_logs
             )
-    finally:
-        db.close()
+        for user_id, exercise_ids in touched.items():
+            refresh_progression_states(db, user_id, exercise_ids)
+            refresh_personal_records(db, user_id, exercise_ids)
+        bump_user_data_versions(db, touched)
+    return session_ids
 
-    return int(session_id)
+
+def iter_ndjson_payloads(lines: Iterable[str | bytes]) -> Iterator[Any]:
+    """Parse an NDJSON stream lazily, one session per non-blank line.
+
+    A line that is not valid JSON is passed through as a ValueError so that
+    import_sessions reports it against that record and carries on.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield ValueError(f"invalid JSON: {exc.msg}")
+
+
+def _chunked(payloads: Iterable[Any], size: int) -> Iterator[list[tuple[int, Any]]]:
+    chunk: list[tuple[int, Any]] = []
+    for index, payload in enumerate(payloads):
+        chunk.append((index, payload))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_sessions(
+    db: DbConnection, payloads: Iterable[Any], chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportResult:
+    """Validate and insert many sessions, reporting failures per record.
+
+    payloads may be any iterable of create_session payloads (a list, or a
+    generator over an NDJSON stream); errors refer to records by their
+    0-based position. Each chunk is inserted with executemany in its own
+    transaction. If the database still rejects a chunk, it is retried one
+    session at a time so one bad record cannot sink its neighbours.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    result = ImportResult()
+    for chunk in _chunked(payloads, chunk_size):
+        records = _parse_import_chunk(db, chunk, result)
+        if not records:
+            continue
+        try:
+            result.session_ids.extend(_insert_import_chunk(db, records))
+        except sqlite3.DatabaseError:
+            for record in records:
+                try:
+                    result.session_ids.extend(_insert_import_chunk(db, [record]))
+                except sqlite3.DatabaseError as exc:
+                    result.errors.append(ImportRecordError(record.index, str(exc)))
+    result.errors.sort(key=lambda error: error.index)
+    return result
@@ -0,0 +1 @@
+"""Synthetic-data benchmarks for the query, domain and HTTP hot paths."""
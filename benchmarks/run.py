@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Time the hot read and write paths against a synthetic database.
+
+    python -m benchmarks.run --users 50 --weeks 104 --output results.json
+    python -m benchmarks.run --db bench.db --compare results.json
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import pathlib
+import platform
+import sqlite3
+import sys
+import tempfile
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from api.workouts import create_session
+from benchmarks.synthetic import SyntheticConfig, build_synthetic_db, pick_sample
+from benchmarks.timing import (
+    DEFAULT_ROUNDS,
+    DEFAULT_THRESHOLD,
+    DEFAULT_WARMUP,
+    compare_results,
+    measure,
+)
+from db.connection import DEFAULT_PROFILE, get_db_connection
+from domain.cache import LruCache
+from domain.plans.generator import PlanGenerator
+from domain.plans.swap import list_swap_options
+from domain.progression.engine import recommend_next_load, recommend_next_loads
+from queries.exercise_history import fetch_exercise_history
+from queries.plans import fetch_planned_exercises
+from server.app import create_app
+
+BENCH_SESSIONS_START = datetime(2030, 1, 1)
+
+
+def _session_payload(sample: dict[str, int], counter: itertools.count) -> dict[str, Any]:
+    # Each round logs a distinct, later session so writes never collide.
+    performed_at = BENCH_SESSIONS_START + timedelta(minutes=next(counter))
+    return {
+        "user_id": sample["user_id"],
+        "performed_at": performed_at.isoformat() + "Z",
+        "completion_status": "completed",
+        "set_logs": [
+            {
+                "exercise_id": sample["exercise_id"],
+                "set_number": set_number,
+                "reps": 8,
+                "weight": 50.0,
+                "rpe": 8.0,
+                "rest_seconds": 90,
+            }
+            for set_number in (1, 2, 3)
+        ],
+    }
+
+
+def build_cases(db_path: pathlib.Path) -> dict[str, Callable[[], Any]]:
+    sample = pick_sample(db_path)
+    user_id = sample["user_id"]
+    exercise_id = sample["exercise_id"]
+    plan_id = sample["plan_id"]
+    db = get_db_connection(db_path, profile=DEFAULT_PROFILE)
+    day_exercise_ids = [
+        row.exercise_id
+        for row in fetch_planned_exercises(db, [plan_id])[plan_id]
+        if row.day_index == sample["day_index"]
+    ]
+    client = create_app(db_path).test_client()
+    counter = itertools.count()
+
+    def get(url: str) -> Callable[[], Any]:
+        def call() -> None:
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+        return call
+
+    def post_session() -> None:
+        response = client.post("/workouts/sessions", json=_session_payload(sample, counter))
+        if response.status_code != 200:
+            raise RuntimeError(f"POST /workouts/sessions returned {response.status_code}")
+
+    return {
+        "fetch_exercise_history": lambda: fetch_exercise_history(db, user_id, exercise_id),
+        "recommend_next_load": lambda: recommend_next_load(db, user_id, exercise_id),
+        "recommend_next_loads": lambda: recommend_next_loads(db, user_id, day_exercise_ids),
+        "plan_generate": lambda: PlanGenerator().generate(db, sample["questionnaire_id"]),
+        "plan_generate_uncached": lambda: PlanGenerator(skeleton_cache=LruCache(1)).generate(
+            db, sample["questionnaire_id"]
+        ),
+        "list_swap_options": lambda: list_swap_options(
+            db, plan_id, sample["day_index"], sample["sequence"]
+        ),
+        "create_session": lambda: create_session(db, _session_payload(sample, counter)),
+        "http_get_plan": get(f"/plans/{plan_id}"),
+        "http_get_sessions": get(f"/workouts/sessions?user_id={user_id}"),
+        "http_get_exercise_history": get(f"/exercises/{exercise_id}/history?user_id={user_id}"),
+        "http_get_recommendation": get(
+            f"/progression/recommendations?user_id={user_id}&exercise_id={exercise_id}"
+        ),
+        "http_post_session": post_session,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=None,
+        help="Synthetic database to reuse, or to create if missing (default: a temp file).",
+    )
+    parser.add_argument("--users", type=int, default=SyntheticConfig.users)
+    parser.add_argument("--weeks", type=int, default=SyntheticConfig.weeks)
+    parser.add_argument(
+        "--questionnaires-per-user", type=int, default=SyntheticConfig.questionnaires_per_user
+    )
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument(
+        "--only", action="append", default=None, help="Run just this benchmark (repeatable)."
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Write results JSON here.")
+    parser.add_argument("--compare", type=pathlib.Path, help="Baseline results JSON to compare to.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Fail when a median exceeds the baseline by this ratio.",
+    )
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        users=args.users,
+        weeks=args.weeks,
+        questionnaires_per_user=args.questionnaires_per_user,
+        seed=args.seed,
+    )
+    db_path = args.db or pathlib.Path(tempfile.mkdtemp(prefix="bench-")) / "bench.db"
+    dataset_summary = None
+    if not db_path.exists():
+        print(f"building synthetic database at {db_path}", file=sys.stderr)
+        dataset_summary = build_synthetic_db(db_path, config).summary()
+        print(f"  {dataset_summary}", file=sys.stderr)
+
+    cases = build_cases(db_path)
+    unknown = set(args.only or ()) - cases.keys()
+    if unknown:
+        raise SystemExit(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = {}
+    for name, call in cases.items():
+        if args.only and name not in args.only:
+            continue
+        stats = measure(name, call, rounds=args.rounds, warmup=args.warmup)
+        results[name] = stats.to_dict()
+        print(
+            f"{name:28s} median {stats.median * 1000:9.3f} ms  "
+            f"min {stats.min * 1000:9.3f} ms  ops {stats.ops:9.1f}/s",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "db": str(db_path),
+            "config": asdict(config),
+            "dataset": dataset_summary,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        regressions = []
+        for comparison in compare_results(results, baseline):
+            flag = "REGRESSED" if comparison.regressed(args.threshold) else ""
+            print(
+                f"{comparison.name:28s} {comparison.baseline_median * 1000:9.3f} ms -> "
+                f"{comparison.current_median * 1000:9.3f} ms  x{comparison.ratio:5.2f} {flag}",
+                file=sys.stderr,
+            )
+            if comparison.regressed(args.threshold):
+                regressions.append(comparison.name)
+        if regressions:
+            print(f"{len(regressions)} regressions over x{args.threshold}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
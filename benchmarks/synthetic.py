@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+from api.questionnaire import create_questionnaire
+from api.workouts import import_sessions
+from data.exercises.seed_exercises import parse_exercise_rows, seed_sqlite
+from db.connection import DEFAULT_PROFILE, get_db_connection
+from db.migrations import apply_migrations
+from domain.plans.generator import EQUIPMENT_ALLOWED, PlanGenerator
+from queries.plans import fetch_planned_exercises
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LIBRARY_PATH = REPO_ROOT / "EXERCISE_LIBRARY_EXPANDED.md"
+HISTORY_START = datetime(2022, 1, 3, 7, 0)
+
+GOALS = ("general_fitness", "muscle_gain", "strength", "weight_loss")
+EXPERIENCE_LEVELS = ("beginner", "intermediate", "advanced")
+SESSION_DURATIONS = (None, 30, 45, 60, 75, 90)
+FOCUS_AREAS = ("arms", "shoulders", "chest", "back", "legs", "core")
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Scale knobs for a generated database. The same seed and sizes always
+    produce the same rows."""
+
+    users: int = 50
+    weeks: int = 104
+    questionnaires_per_user: int = 2
+    skip_rate: float = 0.05
+    seed: int = 1234
+
+
+@dataclass
+class SyntheticDataset:
+    db_path: Path
+    config: SyntheticConfig
+    user_ids: list[int] = field(default_factory=list)
+    questionnaire_ids: list[int] = field(default_factory=list)
+    plan_ids: list[int] = field(default_factory=list)
+    sessions: int = 0
+    set_logs: int = 0
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "users": len(self.user_ids),
+            "questionnaires": len(self.questionnaire_ids),
+            "plans": len(self.plan_ids),
+            "sessions": self.sessions,
+            "set_logs": self.set_logs,
+        }
+
+
+def _random_questionnaire(rng: random.Random, user_id: int) -> dict[str, Any]:
+    schedule_days = rng.choice((2, 3, 3, 4, 4, 5, 6))
+    payload: dict[str, Any] = {
+        "user_id": user_id,
+        "goals": rng.choice(GOALS),
+        "experience_level": rng.choice(EXPERIENCE_LEVELS),
+        "equipment_available": rng.choice(tuple(EQUIPMENT_ALLOWED)),
+        "smallest_increment": rng.choice((1.25, 2.5, 2.5, 5.0)),
+        "schedule_days": schedule_days,
+        "session_duration_minutes": rng.choice(SESSION_DURATIONS),
+    }
+    if rng.random() < 0.4:
+        payload["focus_areas"] = rng.sample(FOCUS_AREAS, rng.randint(1, 2))
+    if schedule_days == 5:
+        payload["split_variant"] = rng.choice(("ppl_upper_lower", "ppl_push_pull"))
+    return payload
+
+
+def _session_payloads(
+    rng: random.Random,
+    config: SyntheticConfig,
+    user_id: int,
+    plan_id: int,
+    planned: list[Any],
+) -> Iterator[dict[str, Any]]:
+    days: dict[int, list[Any]] = {}
+    for row in planned:
+        days.setdefault(row.day_index, []).append(row)
+    weights = {row.exercise_id: row.starting_weight or 0.0 for row in planned}
+    for week in range(config.weeks):
+        for day_index, rows in sorted(days.items()):
+            performed_at = HISTORY_START + timedelta(
+                weeks=week, days=day_index, minutes=rng.randint(0, 600)
+            )
+            payload: dict[str, Any] = {
+                "user_id": user_id,
+                "performed_at": performed_at.isoformat() + "Z",
+                "plan_id": plan_id,
+                "day_index": day_index,
+                "duration_minutes": rng.randint(30, 90),
+            }
+            if rng.random() < config.skip_rate:
+                yield {**payload, "completion_status": "skipped", "set_logs": []}
+                continue
+            set_logs = []
+            for row in rows:
+                weight = weights[row.exercise_id]
+                for set_number in range(1, row.target_sets + 1):
+                    set_logs.append(
+                        {
+                            "exercise_id": row.exercise_id,
+                            "set_number": set_number,
+                            "reps": rng.randint(row.target_reps_min - 2, row.target_reps_max),
+                            "weight": weight,
+                            "rpe": rng.choice((6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5)),
+                            "rest_seconds": rng.choice((60, 90, 120, 180)),
+                        }
+                    )
+                # Slow, noisy progression with the odd deload.
+                if rng.random() < 0.3:
+                    weights[row.exercise_id] = max(0.0, weight + rng.choice((-5.0, 2.5, 2.5, 5.0)))
+            yield {**payload, "completion_status": "completed", "set_logs": set_logs}
+
+
+def build_synthetic_db(db_path: str | Path, config: SyntheticConfig = SyntheticConfig()) -> SyntheticDataset:
+    """Create a fresh database at db_path filled with deterministic fake users,
+    questionnaires, plans and config.weeks of logged sessions per user.
+
+    Sessions follow each user's latest plan and go through import_sessions,
+    so set logs and progression state look like real logging.
+    """
+    db_path = Path(db_path)
+    if db_path.exists():
+        raise ValueError("SYNTHETIC_DB_EXISTS")
+    apply_migrations(db_path)
+    seed_sqlite(
+        db_path,
+        parse_exercise_rows(LIBRARY_PATH.read_text(encoding="utf-8").splitlines()),
+        batch_size=500,
+    )
+    rng = random.Random(config.seed)
+    dataset = SyntheticDataset(db_path=db_path, config=config)
+    db = get_db_connection(db_path, profile=DEFAULT_PROFILE)
+    try:
+        with db:
+            db.executemany(
+                "INSERT INTO users (id, email, smallest_increment) VALUES (?, ?, 2.5)",
+                [(user_id, f"user{user_id}@example.test") for user_id in range(1, config.users + 1)],
+            )
+        generator = PlanGenerator()
+        for user_id in range(1, config.users + 1):
+            dataset.user_ids.append(user_id)
+            plan_id = None
+            for _ in range(config.questionnaires_per_user):
+                questionnaire_id = create_questionnaire(db, _random_questionnaire(rng, user_id))
+                dataset.questionnaire_ids.append(questionnaire_id)
+                plan_id = generator.generate(
+                    db, questionnaire_id, start_date=HISTORY_START.date()
+                )
+                dataset.plan_ids.append(plan_id)
+            if plan_id is None:
+                continue
+            planned = fetch_planned_exercises(db, [plan_id])[plan_id]
+            result = import_sessions(
+                db, _session_payloads(rng, config, user_id, plan_id, planned)
+            )
+            if result.errors:
+                raise RuntimeError(f"synthetic import failed: {result.errors[0]}")
+            dataset.sessions += result.imported
+        dataset.set_logs = db.execute("SELECT COUNT(*) FROM set_logs").fetchone()[0]
+        db.execute("ANALYZE")
+    finally:
+        db.close()
+    return dataset
+
+
+def pick_sample(db_path: str | Path, user_id: int = 1) -> dict[str, int]:
+    """Pick the user's logged plan and its first slot to aim benchmarks at."""
+    connection = sqlite3.connect(db_path)
+    try:
+        row = connection.execute(
+            """
+            SELECT p.id, p.generated_from_questionnaire_id, pe.day_index, pe.sequence, pe.exercise_id
+            FROM plans p
+            JOIN planned_exercises pe ON pe.plan_id = p.id
+            WHERE p.id = (SELECT MAX(id) FROM plans WHERE user_id = ?)
+            ORDER BY pe.day_index, pe.sequence
+            LIMIT 1
+            """,
+            (user_id,),
+        ).fetchone()
+    finally:
+        connection.close()
+    if row is None:
+        raise ValueError("SYNTHETIC_DB_EMPTY")
+    return {
+        "user_id": user_id,
+        "plan_id": row[0],
+        "questionnaire_id": row[1],
+        "day_index": row[2],
+        "sequence": row[3],
+        "exercise_id": row[4],
+    }
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+DEFAULT_ROUNDS = 50
+DEFAULT_WARMUP = 3
+DEFAULT_THRESHOLD = 1.25
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    """Wall-clock stats for one benchmark, in seconds (pytest-benchmark's fields)."""
+
+    name: str
+    rounds: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    stddev: float
+
+    @property
+    def ops(self) -> float:
+        return 1.0 / self.mean if self.mean > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "ops": self.ops}
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline_median: float
+    current_median: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_median / self.baseline_median if self.baseline_median > 0 else float("inf")
+
+    def regressed(self, threshold: float) -> bool:
+        return self.ratio > threshold
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    rounds: int = DEFAULT_ROUNDS,
+    warmup: int = DEFAULT_WARMUP,
+) -> TimingStats:
+    if rounds <= 0:
+        raise ValueError("rounds must be positive")
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return TimingStats(
+        name=name,
+        rounds=rounds,
+        min=min(samples),
+        max=max(samples),
+        mean=statistics.fmean(samples),
+        median=statistics.median(samples),
+        stddev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    )
+
+
+def compare_results(
+    current: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]]
+) -> list[Comparison]:
+    """Pair up benchmarks present in both result sets by median time.
+
+    Medians are compared rather than means so one slow round (a GC pause,
+    a checkpoint) does not read as a regression.
+    """
+    return [
+        Comparison(
+            name=name,
+            baseline_median=baseline[name]["median"],
+            current_median=current[name]["median"],
+        )
+        for name in current
+        if name in baseline
+    ]
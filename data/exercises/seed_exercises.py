@@ -4,8 +4,13 @@ import pathlib
 from typing import Iterable, List, Tuple
 
 from db.connection import get_db_connection
+from queries.catalog import bump_catalog_version
 
-def parse_exercise_rows(lines: Iterable[str]) -> List[Tuple[str, str, str, str, str, str]]:
+# name, primary_muscle, equipment, movement_pattern, category, equipment_id, alternatives
+SeedRow = Tuple[str, str, str, str, str, str, str]
+
+
+def parse_exercise_rows(lines: Iterable[str]) -> List[SeedRow]:
     rows = []
     for line in lines:
         stripped = line.strip()
@@ -18,17 +23,17 @@ def parse_exercise_rows(lines: Iterable[str]) -> List[Tuple[str, str, str, str,
             continue
         if parts[0] == "Exercise":
             continue
-        name, pattern, muscles, equipment, _level, _alts, category, equipment_id = parts[:8]
-        rows.append((name, muscles, equipment, pattern, category, equipment_id))
+        name, pattern, muscles, equipment, _level, alts, category, equipment_id = parts[:8]
+        rows.append((name, muscles, equipment, pattern, category, equipment_id, alts))
     return rows
 
 
-def chunked(items: List[Tuple[str, str, str, str, str, str]], size: int) -> Iterable[List[Tuple[str, str, str, str, str, str]]]:
+def chunked(items: List[SeedRow], size: int) -> Iterable[List[SeedRow]]:
     for index in range(0, len(items), size):
         yield items[index : index + size]
 
 
-def seed_sqlite(db_path: pathlib.Path, rows: List[Tuple[str, str, str, str, str, str]], batch_size: int) -> None:
+def seed_sqlite(db_path: pathlib.Path, rows: List[SeedRow], batch_size: int) -> None:
     connection = get_db_connection(db_path)
     cursor = connection.cursor()
     cursor.execute("DELETE FROM exercises")
@@ -36,16 +41,43 @@ def seed_sqlite(db_path: pathlib.Path, rows: List[Tuple[str, str, str, str, str,
     for batch in chunked(rows, batch_size):
         cursor.executemany(
             """
-            INSERT INTO exercises (name, primary_muscle, equipment, movement_pattern, category, equipment_id)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO exercises (
+                name, primary_muscle, equipment, movement_pattern, category, equipment_id,
+                alternatives
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
             batch,
         )
         connection.commit()
+    # Cached catalogs key on this stamp, so bump it only once every row is in.
+    bump_catalog_version(connection)
+    connection.commit()
     connection.close()
 
 
-def write_sql(rows: List[Tuple[str, str, str, str, str, str]]) -> str:
+def update_exercise_alternatives(db_path: pathlib.Path, rows: List[SeedRow]) -> int:
+    """Backfill the Alternatives column by exercise name; returns rows updated.
+
+    For databases whose exercises are already referenced by plans or
+    sessions, where seed_sqlite's delete-and-reinsert is not possible.
+    """
+    connection = get_db_connection(db_path)
+    try:
+        with connection:
+            cursor = connection.executemany(
+                "UPDATE exercises SET alternatives = ? WHERE name = ? AND alternatives <> ?",
+                [(row[6], row[0], row[6]) for row in rows],
+            )
+            updated = cursor.rowcount
+            if updated:
+                bump_catalog_version(connection)
+    finally:
+        connection.close()
+    return updated
+
+
+def write_sql(rows: List[SeedRow]) -> str:
     values = []
     for row in rows:
         escaped = [value.replace("'", "''") for value in row]
@@ -54,7 +86,8 @@ def write_sql(rows: List[Tuple[str, str, str, str, str, str]]) -> str:
         )
     joined = ",\n".join(values)
     return (
-        "INSERT INTO exercises (name, primary_muscle, equipment, movement_pattern, category, equipment_id)\n"
+        "INSERT INTO exercises "
+        "(name, primary_muscle, equipment, movement_pattern, category, equipment_id, alternatives)\n"
         "VALUES\n"
         f"{joined};\n"
     )
@@ -1,12 +1,229 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Iterator
+
+from db.tracing import SqlTracer
 
 DbConnection = sqlite3.Connection
 
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_TIMEOUT_SECONDS = 5.0
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """PRAGMA settings applied to every connection opened by a pool.
+
+    A None value leaves SQLite's default in place. journal_mode is a property
+    of the database file, so it is only applied by writable connections.
+    """
+
+    journal_mode: str | None = "wal"
+    synchronous: str | None = "normal"
+    mmap_size: int | None = 256 * 1024 * 1024
+    cache_size: int | None = -64_000
+    temp_store: str | None = "memory"
+    busy_timeout_ms: int = 5_000
+
+
+DEFAULT_PROFILE = ConnectionProfile()
+
+
+@dataclass
+class QueryStats:
+    """Running totals for the statements issued on one connection."""
+
+    statements: int = 0
+    seconds: float = 0.0
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that charges execute and fetch time to its connection.
+
+    Only execute calls count as statements; fetches add time, since SQLite
+    does most of a SELECT's work while rows are being stepped. When the
+    connection has a tracer, a SELECT is reported to it at its first fetch so
+    that stepping time is part of the statement.
+    """
+
+    _traced: tuple[str, Any, float] | None = None
+    _traced_sql: str | None = None
+
+    def _report(self) -> None:
+        traced, self._traced = self._traced, None
+        if traced is not None:
+            sql, parameters, seconds = traced
+            self.connection.tracer.observe(self.connection, sql, parameters, seconds)
+
+    def _executed(self, sql: str, parameters: Any, seconds: float) -> None:
+        self.connection.record_statement(sql, seconds)
+        if self.connection.tracer is None:
+            return
+        self._traced = (sql, parameters, seconds)
+        self._traced_sql = sql
+        if self.description is None:
+            self._report()
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        if self._traced is not None:
+            self._report()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except BaseException:
+            self.connection.record_statement(sql, time.perf_counter() - started)
+            raise
+        self._executed(sql, parameters, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        if self._traced is not None:
+            self._report()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except BaseException:
+            self.connection.record_statement(sql, time.perf_counter() - started)
+            raise
+        # The parameter rows may be a spent generator, so nothing to explain.
+        self._executed(sql, None, time.perf_counter() - started)
+        return self
+
+    def _timed(self, fetch: Any, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            seconds = time.perf_counter() - started
+            self.connection.record_time(seconds)
+            if self._traced is not None:
+                sql, parameters, executed = self._traced
+                self._traced = (sql, parameters, executed + seconds)
+                self._report()
+            elif self._traced_sql is not None:
+                self.connection.tracer.add_time(self._traced_sql, seconds)
+
+    def fetchone(self) -> Any:
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        if size is None:
+            return self._timed(super().fetchmany)
+        return self._timed(super().fetchmany, size)
+
+    def fetchall(self) -> list[Any]:
+        return self._timed(super().fetchall)
+
+    def __next__(self) -> Any:
+        return self._timed(super().__next__)
+
+    def close(self) -> None:
+        if self._traced is not None:
+            self._report()
+        super().close()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection that keeps QueryStats for everything run on it.
+
+    Callers read and reset the totals with take_query_stats(), e.g. once per
+    HTTP request. Commit time (including `with db:` blocks) is counted too.
+    Setting tracer to a SqlTracer also aggregates statements by shape.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.query_stats = QueryStats()
+        self.tracer: SqlTracer | None = None
+
+    def record_statement(self, sql: str, seconds: float) -> None:
+        self.query_stats.statements += 1
+        self.query_stats.seconds += seconds
+
+    def record_time(self, seconds: float) -> None:
+        self.query_stats.seconds += seconds
+
+    def take_query_stats(self) -> QueryStats:
+        stats, self.query_stats = self.query_stats, QueryStats()
+        return stats
+
+    def cursor(self, factory: Any = None) -> sqlite3.Cursor:
+        return super().cursor(factory or InstrumentedCursor)
 
-def get_db_connection(db_path: str | Path) -> DbConnection:
-    connection = sqlite3.connect(db_path)
+    # sqlite3.Connection.execute calls the C cursor code directly, so route
+    # the shortcuts through cursor() to pick up the timing.
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.record_time(time.perf_counter() - started)
+
+    def __exit__(self, *exc_info: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self.record_time(time.perf_counter() - started)
+
+
+def _apply_profile(
+    connection: DbConnection, profile: ConnectionProfile, read_only: bool
+) -> None:
+    connection.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+    if profile.journal_mode is not None and not read_only:
+        connection.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+    if profile.synchronous is not None:
+        connection.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    if profile.mmap_size is not None:
+        connection.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    if profile.cache_size is not None:
+        connection.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    if profile.temp_store is not None:
+        connection.execute(f"PRAGMA temp_store = {profile.temp_store}")
+
+
+def get_db_connection(
+    db_path: str | Path,
+    check_same_thread: bool = True,
+    profile: ConnectionProfile | None = None,
+    read_only: bool = False,
+    instrumented: bool = False,
+    tracer: SqlTracer | None = None,
+) -> DbConnection:
+    """Open a connection with foreign keys on and the optional profile applied.
+
+    instrumented (implied by a tracer) returns an InstrumentedConnection that
+    keeps per-connection QueryStats.
+    """
+    instrumented = instrumented or tracer is not None
+    factory = InstrumentedConnection if instrumented else sqlite3.Connection
+    if read_only:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        connection = sqlite3.connect(
+            uri, uri=True, check_same_thread=check_same_thread, factory=factory
+        )
+    else:
+        connection = sqlite3.connect(
+            db_path, check_same_thread=check_same_thread, factory=factory
+        )
     connection.execute("PRAGMA foreign_keys = ON")
+    if profile is not None:
+        _apply_profile(connection, profile, read_only)
+    if tracer is not None:
+        connection.tracer = tracer
     return connection
 
 
@@ -16,3 +233,215 @@ def verify_foreign_keys_enabled(db_path: str | Path) -> int:
     value = cursor.fetchone()[0]
     connection.close()
     return int(value)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    max_size: int
+    idle: int
+    in_use: int
+    checkouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections.
+
+    Connections are opened lazily up to max_size and handed out one thread at a
+    time, so they are created with check_same_thread disabled. Checking a
+    connection back in rolls back any transaction the caller left open.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        max_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_POOL_TIMEOUT_SECONDS,
+        profile: ConnectionProfile | None = None,
+        read_only: bool = False,
+        instrumented: bool = False,
+        tracer: SqlTracer | None = None,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.db_path = str(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.profile = profile
+        self.read_only = read_only
+        self.instrumented = instrumented
+        self.tracer = tracer
+        self._idle: queue.LifoQueue[DbConnection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._closed = False
+        self._drained = threading.Event()
+
+    def _open(self) -> DbConnection:
+        return get_db_connection(
+            self.db_path,
+            check_same_thread=False,
+            profile=self.profile,
+            read_only=self.read_only,
+            instrumented=self.instrumented,
+            tracer=self.tracer,
+        )
+
+    def acquire(self) -> DbConnection:
+        started = time.perf_counter()
+        connection = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("CONNECTION_POOL_CLOSED")
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                if self._size < self.max_size:
+                    self._size += 1
+                    try:
+                        connection = self._open()
+                    except Exception:
+                        self._size -= 1
+                        raise
+        if connection is None:
+            try:
+                connection = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError("CONNECTION_POOL_EXHAUSTED") from None
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return connection
+
+    def release(self, connection: DbConnection) -> None:
+        if connection.in_transaction:
+            connection.rollback()
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                connection.close()
+                if self._in_use == 0:
+                    self._drained.set()
+                return
+        self._idle.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[DbConnection]:
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                size=self._size,
+                max_size=self.max_size,
+                idle=self._idle.qsize(),
+                in_use=self._in_use,
+                checkouts=self._checkouts,
+                total_wait_seconds=self._total_wait,
+                max_wait_seconds=self._max_wait,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._size -= 1
+                connection.close()
+            if self._in_use == 0:
+                self._drained.set()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Close the pool and wait for checked-out connections to come back.
+
+        Returns False if some were still in use after timeout seconds; those
+        are closed whenever they are released.
+        """
+        self.close()
+        return self._drained.wait(timeout)
+
+
+class ReadWritePool:
+    """One serialized writer connection plus a pool of read-only readers.
+
+    Under WAL, readers see the last committed snapshot while the writer is
+    mid-transaction, so reads scale across threads without waiting on writes.
+    The journal mode is applied once up front so read-only connections never
+    have to change it.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        readers: int = DEFAULT_POOL_SIZE,
+        profile: ConnectionProfile = DEFAULT_PROFILE,
+        timeout: float = DEFAULT_POOL_TIMEOUT_SECONDS,
+        instrumented: bool = False,
+        tracer: SqlTracer | None = None,
+    ) -> None:
+        self.db_path = str(db_path)
+        self.profile = profile
+        self.tracer = tracer
+        self.writer = ConnectionPool(
+            db_path,
+            max_size=1,
+            timeout=timeout,
+            profile=profile,
+            instrumented=instrumented,
+            tracer=tracer,
+        )
+        with self.writer.connection():
+            pass
+        self.reader = ConnectionPool(
+            db_path,
+            max_size=readers,
+            timeout=timeout,
+            profile=profile,
+            read_only=True,
+            instrumented=instrumented,
+            tracer=tracer,
+        )
+
+    def pool_for(self, write: bool) -> ConnectionPool:
+        return self.writer if write else self.reader
+
+    @contextmanager
+    def connection(self, write: bool = False) -> Iterator[DbConnection]:
+        with self.pool_for(write).connection() as connection:
+            yield connection
+
+    def stats(self) -> dict[str, PoolStats]:
+        return {"writer": self.writer.stats(), "reader": self.reader.stats()}
+
+    def close(self) -> None:
+        self.writer.close()
+        self.reader.close()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Stop both pools, then give in-flight requests up to timeout seconds
+        in total to release their connections."""
+        self.writer.close()
+        self.reader.close()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        drained = True
+        for pool in (self.reader, self.writer):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            drained = pool.drain(remaining) and drained
+        return drained
@@ -0,0 +1,69 @@
+import re
+import sqlite3
+from pathlib import Path
+
+SCHEMA_DIR = Path(__file__).resolve().parent / "schema"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{3})_[a-z0-9_]+\.sql$")
+
+
+def discover_migrations(schema_dir: str | Path = SCHEMA_DIR) -> list[tuple[int, Path]]:
+    migrations: list[tuple[int, Path]] = []
+    for path in sorted(Path(schema_dir).iterdir()):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if match is None:
+            continue
+        migrations.append((int(match.group(1)), path))
+    versions = [version for version, _path in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError("DUPLICATE_MIGRATION_VERSION")
+    return migrations
+
+
+def _ensure_migrations_table(connection: sqlite3.Connection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    connection.commit()
+
+
+def fetch_applied_versions(connection: sqlite3.Connection) -> set[int]:
+    _ensure_migrations_table(connection)
+    cursor = connection.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(db_path: str | Path, schema_dir: str | Path = SCHEMA_DIR) -> list[str]:
+    """Apply every numbered schema file that has not been recorded yet.
+
+    Each file runs in its own transaction together with its
+    schema_migrations row, so a failed file leaves no partial state and is
+    retried on the next run. Returns the names of the files applied.
+    """
+    connection = sqlite3.connect(db_path)
+    applied_names: list[str] = []
+    try:
+        applied = fetch_applied_versions(connection)
+        for version, path in discover_migrations(schema_dir):
+            if version in applied:
+                continue
+            script = path.read_text(encoding="utf-8")
+            try:
+                connection.executescript(f"BEGIN;\n{script}")
+                connection.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                    (version, path.name),
+                )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            applied_names.append(path.name)
+    finally:
+        connection.close()
+    return applied_names
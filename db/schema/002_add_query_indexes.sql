@@ -0,0 +1,18 @@
+-- Secondary indexes for the hot read paths.
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_performed
+    ON workout_sessions (user_id, performed_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_set_logs_exercise_session
+    ON set_logs (exercise_id, session_id, set_number);
+
+CREATE INDEX IF NOT EXISTS idx_exercises_pattern_equipment
+    ON exercises (movement_pattern, equipment_id);
+
+CREATE INDEX IF NOT EXISTS idx_workout_session_plans_plan
+    ON workout_session_plans (plan_id, session_id);
+
+CREATE INDEX IF NOT EXISTS idx_questionnaire_responses_user
+    ON questionnaire_responses (user_id);
+
+CREATE INDEX IF NOT EXISTS idx_plans_user
+    ON plans (user_id);
@@ -0,0 +1,27 @@
+-- Per-user, per-exercise progression state, maintained by create_session.
+-- Mirrors evaluate_progression_state over the most recent sessions plus the
+-- all-time baseline flag and best set, so recommendations read one row.
+CREATE TABLE IF NOT EXISTS exercise_progression_state (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    exercise_id INTEGER NOT NULL REFERENCES exercises(id),
+    last_session_id INTEGER NOT NULL REFERENCES workout_sessions(id),
+    last_weight NUMERIC(7,2),
+    all_sets_completed INTEGER NOT NULL,
+    min_reps INTEGER NOT NULL,
+    first_set_reps INTEGER NOT NULL,
+    last_set_reps INTEGER NOT NULL,
+    eligible INTEGER NOT NULL,
+    increase_achieved INTEGER NOT NULL,
+    missed_minimum INTEGER NOT NULL,
+    manual_audit_flag INTEGER NOT NULL,
+    consecutive_misses INTEGER NOT NULL,
+    has_prior_session INTEGER NOT NULL,
+    baseline_established INTEGER NOT NULL,
+    best_session_id INTEGER REFERENCES workout_sessions(id),
+    best_set_number INTEGER,
+    best_weight NUMERIC(7,2),
+    best_reps INTEGER,
+    best_rpe NUMERIC(3,1),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, exercise_id)
+);
@@ -0,0 +1,6 @@
+-- Session history pages are keyed on (performed_at, id); carrying id in the
+-- index lets ties on performed_at come back in order without a sort step.
+DROP INDEX IF EXISTS idx_workout_sessions_user_performed;
+
+CREATE INDEX IF NOT EXISTS idx_workout_sessions_user_performed_id
+    ON workout_sessions (user_id, performed_at DESC, id DESC);
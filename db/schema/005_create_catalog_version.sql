@@ -0,0 +1,11 @@
+-- Single-row stamp identifying the current contents of the exercises table.
+-- seed_sqlite replaces it with a fresh random token whenever it reseeds, so
+-- in-process exercise caches can tell that they are stale.
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO catalog_version (id, version)
+VALUES (1, lower(hex(randomblob(16))));
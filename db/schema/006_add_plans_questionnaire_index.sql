@@ -0,0 +1,4 @@
+-- Batch regeneration looks up the newest plan generated from each
+-- questionnaire; without this index that is a scan of plans per chunk.
+CREATE INDEX IF NOT EXISTS idx_plans_questionnaire_id
+    ON plans (generated_from_questionnaire_id, id);
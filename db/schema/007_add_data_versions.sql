@@ -0,0 +1,5 @@
+-- Counters bumped by every write that changes what a plan or a user's
+-- history looks like over the API. The server builds ETags from them, so a
+-- conditional GET costs one primary-key lookup instead of a full payload.
+ALTER TABLE plans ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,4 @@
+-- The library's "Alternatives" column: comma-separated exercise names that
+-- swap suggestions rank first. Existing databases fill it in with
+-- scripts/init_db.py --update-alternatives (by exercise name).
+ALTER TABLE exercises ADD COLUMN alternatives TEXT NOT NULL DEFAULT '';
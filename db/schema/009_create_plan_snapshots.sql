@@ -0,0 +1,10 @@
+-- The GET /plans/<id> body, encoded once when the plan is written. A
+-- snapshot is only served while its data_version and catalog_version match
+-- the plan's and the catalog's, so a missed rewrite costs a rebuild and
+-- never serves a stale plan.
+CREATE TABLE IF NOT EXISTS plan_snapshots (
+    plan_id INTEGER PRIMARY KEY REFERENCES plans(id),
+    data_version INTEGER NOT NULL,
+    catalog_version TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
@@ -0,0 +1,41 @@
+-- Each user's three best sets per exercise (by weight, then reps, then rpe;
+-- ties go to the earlier set), maintained by create_session so the history
+-- screen and PR checks read a handful of rows instead of sorting every set
+-- the user has logged.
+CREATE TABLE IF NOT EXISTS personal_records (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    exercise_id INTEGER NOT NULL REFERENCES exercises(id),
+    record_rank INTEGER NOT NULL,
+    session_id INTEGER NOT NULL REFERENCES workout_sessions(id),
+    performed_at TIMESTAMP NOT NULL,
+    set_number INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    weight NUMERIC(7,2),
+    rpe NUMERIC(3,1),
+    rest_seconds INTEGER,
+    PRIMARY KEY (user_id, exercise_id, record_rank)
+);
+
+INSERT OR IGNORE INTO personal_records
+    (user_id, exercise_id, record_rank, session_id, performed_at, set_number, reps, weight,
+     rpe, rest_seconds)
+SELECT user_id, exercise_id, record_rank, session_id, performed_at, set_number, reps, weight,
+       rpe, rest_seconds
+FROM (
+    SELECT ws.user_id,
+           sl.exercise_id,
+           ROW_NUMBER() OVER (
+               PARTITION BY ws.user_id, sl.exercise_id
+               ORDER BY sl.weight DESC, sl.reps DESC, sl.rpe DESC, sl.session_id, sl.set_number
+           ) AS record_rank,
+           sl.session_id,
+           ws.performed_at,
+           sl.set_number,
+           sl.reps,
+           sl.weight,
+           sl.rpe,
+           sl.rest_seconds
+    FROM set_logs sl
+    JOIN workout_sessions ws ON ws.id = sl.session_id
+)
+WHERE record_rank <= 3;
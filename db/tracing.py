@@ -0,0 +1,156 @@
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+DEFAULT_SLOW_QUERY_SECONDS = 0.05
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+logger = logging.getLogger("db.slow_query")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Reduce a statement to its shape: literals become ?, placeholder lists
+    collapse to (?...), and comments and whitespace are squeezed out.
+
+    Queries that build IN (?, ?, ...) lists for a variable number of ids
+    therefore aggregate under one shape.
+    """
+    shape = _COMMENT.sub(" ", sql)
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass(frozen=True)
+class StatementStats:
+    statement: str
+    calls: int
+    total_seconds: float
+    max_seconds: float
+    slow_calls: int
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+@dataclass
+class _ShapeTotals:
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_calls: int = 0
+
+
+def explain_query_plan(
+    connection: sqlite3.Connection, sql: str, parameters: Any = ()
+) -> list[str]:
+    """Return EXPLAIN QUERY PLAN output as indented lines, one per plan step."""
+    # Call the base class so an instrumented connection does not trace this.
+    rows = sqlite3.Connection.execute(connection, f"EXPLAIN QUERY PLAN {sql}", parameters)
+    depth: dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent_id, _unused, detail in rows.fetchall():
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+class SqlTracer:
+    """Per-shape statement counts and latency, plus a slow-query log.
+
+    One tracer is shared by every connection it is handed to, so totals cover
+    the whole process. A statement's time runs from execute through its first
+    fetch; later fetches on the same cursor add time to the shape but not a
+    call. Executions at or above slow_threshold_seconds are logged to the
+    db.slow_query logger with their query plan.
+    """
+
+    def __init__(
+        self,
+        slow_threshold_seconds: float = DEFAULT_SLOW_QUERY_SECONDS,
+        explain: bool = True,
+        log: logging.Logger = logger,
+    ) -> None:
+        if slow_threshold_seconds < 0:
+            raise ValueError("slow_threshold_seconds must not be negative")
+        self.slow_threshold_seconds = slow_threshold_seconds
+        self.explain = explain
+        self.log = log
+        self._lock = threading.Lock()
+        self._shapes: dict[str, _ShapeTotals] = {}
+
+    def observe(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        parameters: Any,
+        seconds: float,
+    ) -> None:
+        """Record one execution. parameters is None when it is not worth
+        replaying (executemany), which skips the query plan."""
+        shape = normalize_sql(sql)
+        slow = seconds >= self.slow_threshold_seconds
+        with self._lock:
+            totals = self._shapes.setdefault(shape, _ShapeTotals())
+            totals.calls += 1
+            totals.total_seconds += seconds
+            totals.max_seconds = max(totals.max_seconds, seconds)
+            if slow:
+                totals.slow_calls += 1
+        if slow:
+            self._log_slow(connection, sql, shape, parameters, seconds)
+
+    def add_time(self, sql: str, seconds: float) -> None:
+        shape = normalize_sql(sql)
+        with self._lock:
+            self._shapes.setdefault(shape, _ShapeTotals()).total_seconds += seconds
+
+    def _log_slow(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        shape: str,
+        parameters: Any,
+        seconds: float,
+    ) -> None:
+        plan: list[str] = []
+        explainable = shape.upper().startswith(EXPLAINABLE_PREFIXES)
+        if self.explain and parameters is not None and explainable:
+            try:
+                plan = explain_query_plan(connection, sql, parameters)
+            except sqlite3.Error as exc:
+                plan = [f"(query plan unavailable: {exc})"]
+        plan_text = "".join(f"\n    {line}" for line in plan)
+        self.log.warning("slow query %.1f ms: %s%s", seconds * 1000, shape, plan_text)
+
+    def snapshot(self) -> list[StatementStats]:
+        """Per-shape totals, most total time first."""
+        with self._lock:
+            stats = [
+                StatementStats(
+                    statement=shape,
+                    calls=totals.calls,
+                    total_seconds=totals.total_seconds,
+                    max_seconds=totals.max_seconds,
+                    slow_calls=totals.slow_calls,
+                )
+                for shape, totals in self._shapes.items()
+            ]
+        return sorted(stats, key=lambda item: item.total_seconds, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
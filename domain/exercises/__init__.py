@@ -0,0 +1,15 @@
+from domain.exercises.candidates import CandidateIndex, ExerciseProfile, PatternCandidates
+from domain.exercises.catalog import (
+    ExerciseCatalog,
+    clear_exercise_catalog_cache,
+    get_exercise_catalog,
+)
+
+__all__ = [
+    "CandidateIndex",
+    "ExerciseCatalog",
+    "ExerciseProfile",
+    "PatternCandidates",
+    "clear_exercise_catalog_cache",
+    "get_exercise_catalog",
+]
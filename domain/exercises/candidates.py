@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from queries.plans import ExerciseRow
+
+def normalize_muscles(muscles: str) -> frozenset[str]:
+    return frozenset(muscle.strip().lower() for muscle in muscles.split(",") if muscle.strip())
+
+
+@dataclass(frozen=True)
+class ExerciseProfile:
+    """Normalized fields used by selection rules, parsed once per exercise."""
+
+    exercise: ExerciseRow
+    category: str
+    movement_pattern: str
+    muscles: frozenset[str]
+
+    @classmethod
+    def of(cls, exercise: ExerciseRow) -> ExerciseProfile:
+        return cls(
+            exercise=exercise,
+            category=exercise.category.strip().lower(),
+            movement_pattern=exercise.movement_pattern.strip().lower(),
+            muscles=normalize_muscles(exercise.primary_muscle),
+        )
+
+
+@dataclass(frozen=True)
+class PatternCandidates:
+    """One pattern's exercises, name-sorted and split by category."""
+
+    all: tuple[ExerciseRow, ...]
+    compound: tuple[ExerciseRow, ...]
+    accessory: tuple[ExerciseRow, ...]
+    by_experience: Mapping[str, tuple[ExerciseRow, ...]]
+
+    @classmethod
+    def build(cls, profiles: Iterable[ExerciseProfile]) -> PatternCandidates:
+        profiles = list(profiles)
+        compound = tuple(p.exercise for p in profiles if p.category == "compound")
+        accessory = tuple(p.exercise for p in profiles if p.category == "accessory")
+        # Beginners stay on compounds when any exist; everyone else gets
+        # compounds first with accessories appended.
+        return cls(
+            all=tuple(p.exercise for p in profiles),
+            compound=compound,
+            accessory=accessory,
+            by_experience=MappingProxyType(
+                {
+                    "beginner": compound or accessory,
+                    "intermediate": compound + accessory,
+                    "advanced": compound + accessory,
+                }
+            ),
+        )
+
+    def eligible(self, experience_level: str) -> tuple[ExerciseRow, ...]:
+        candidates = self.by_experience.get(experience_level)
+        if candidates is None:
+            raise ValueError("UNKNOWN_EXPERIENCE_LEVEL")
+        return candidates
+
+
+EMPTY_PATTERN = PatternCandidates.build([])
+
+
+@dataclass(frozen=True)
+class CandidateIndex:
+    """Selection-ready view of the catalog for one set of equipment ids.
+
+    Patterns are keyed on the raw movement_pattern, like the pool filter, so
+    lookups by a plan's pattern name are a single dict access.
+    """
+
+    equipment_ids: frozenset[str]
+    by_pattern: Mapping[str, PatternCandidates]
+    profiles: Mapping[int, ExerciseProfile]
+
+    @classmethod
+    def build(
+        cls, exercises: Iterable[ExerciseRow], equipment_ids: Iterable[str]
+    ) -> CandidateIndex:
+        equipment = frozenset(equipment_ids)
+        grouped: dict[str, list[ExerciseProfile]] = {}
+        profiles: dict[int, ExerciseProfile] = {}
+        ordered = sorted(exercises, key=lambda exercise: (exercise.name, exercise.id))
+        for exercise in ordered:
+            if exercise.equipment_id not in equipment:
+                continue
+            profile = ExerciseProfile.of(exercise)
+            profiles[exercise.id] = profile
+            grouped.setdefault(exercise.movement_pattern, []).append(profile)
+        return cls(
+            equipment_ids=equipment,
+            by_pattern=MappingProxyType(
+                {pattern: PatternCandidates.build(items) for pattern, items in grouped.items()}
+            ),
+            profiles=MappingProxyType(profiles),
+        )
+
+    def pattern(self, movement_pattern: str) -> PatternCandidates:
+        return self.by_pattern.get(movement_pattern, EMPTY_PATTERN)
+
+    def profile(self, exercise: ExerciseRow) -> ExerciseProfile:
+        profile = self.profiles.get(exercise.id)
+        return profile if profile is not None else ExerciseProfile.of(exercise)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from db.connection import DbConnection
+from domain.exercises.candidates import CandidateIndex, normalize_muscles
+from queries.catalog import fetch_all_exercises, fetch_catalog_version
+from queries.plans import ExerciseRow
+from queries.progression import ExerciseMetadata
+
+CATALOG_LOAD_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class ExerciseCatalog:
+    """Immutable snapshot of the exercises table with lookup indexes.
+
+    by_pattern_equipment is keyed on the raw (movement_pattern, equipment_id)
+    values, the filters plan selection applies; by_primary_muscle is keyed
+    on normalized muscle names. Index values are sorted by name. Candidate
+    indexes are built lazily, once per equipment set, and live as long as
+    the snapshot does.
+    """
+
+    version: str
+    by_id: Mapping[int, ExerciseRow]
+    by_pattern_equipment: Mapping[tuple[str, str], tuple[ExerciseRow, ...]]
+    by_primary_muscle: Mapping[str, tuple[ExerciseRow, ...]]
+    _candidate_indexes: dict[frozenset[str], CandidateIndex] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def build(cls, version: str, exercises: Iterable[ExerciseRow]) -> ExerciseCatalog:
+        ordered = sorted(exercises, key=lambda exercise: (exercise.name, exercise.id))
+        by_pattern_equipment: dict[tuple[str, str], list[ExerciseRow]] = {}
+        by_primary_muscle: dict[str, list[ExerciseRow]] = {}
+        for exercise in ordered:
+            by_pattern_equipment.setdefault(
+                (exercise.movement_pattern, exercise.equipment_id), []
+            ).append(exercise)
+            for muscle in normalize_muscles(exercise.primary_muscle):
+                by_primary_muscle.setdefault(muscle, []).append(exercise)
+        return cls(
+            version=version,
+            by_id=MappingProxyType({exercise.id: exercise for exercise in ordered}),
+            by_pattern_equipment=MappingProxyType(
+                {key: tuple(items) for key, items in by_pattern_equipment.items()}
+            ),
+            by_primary_muscle=MappingProxyType(
+                {key: tuple(items) for key, items in by_primary_muscle.items()}
+            ),
+        )
+
+    def get(self, exercise_id: int) -> ExerciseRow:
+        exercise = self.by_id.get(exercise_id)
+        if exercise is None:
+            raise ValueError("INVALID_EXERCISE_ID")
+        return exercise
+
+    def pool(
+        self, movement_patterns: Iterable[str], equipment_ids: Iterable[str]
+    ) -> list[ExerciseRow]:
+        """Exercises matching any of the patterns and equipment ids, by name."""
+        equipment = list(dict.fromkeys(equipment_ids))
+        matches = [
+            exercise
+            for pattern in dict.fromkeys(movement_patterns)
+            for equipment_id in equipment
+            for exercise in self.by_pattern_equipment.get((pattern, equipment_id), ())
+        ]
+        return sorted(matches, key=lambda exercise: (exercise.name, exercise.id))
+
+    def candidates(self, equipment_ids: Iterable[str]) -> CandidateIndex:
+        key = frozenset(equipment_ids)
+        index = self._candidate_indexes.get(key)
+        if index is None:
+            # A concurrent miss builds an identical index; last write wins.
+            index = CandidateIndex.build(self.by_id.values(), key)
+            self._candidate_indexes[key] = index
+        return index
+
+    def for_primary_muscle(self, muscle: str) -> tuple[ExerciseRow, ...]:
+        return self.by_primary_muscle.get(muscle.strip().lower(), ())
+
+    def metadata(self, exercise_id: int) -> ExerciseMetadata:
+        exercise = self.get(exercise_id)
+        return ExerciseMetadata(
+            category=exercise.category,
+            movement_pattern=exercise.movement_pattern,
+            primary_muscle=exercise.primary_muscle,
+            equipment_id=exercise.equipment_id,
+        )
+
+    def categories(self, exercise_ids: Iterable[int]) -> dict[int, str]:
+        """Map known ids to their category; unknown ids are left out."""
+        return {
+            exercise_id: self.by_id[exercise_id].category
+            for exercise_id in exercise_ids
+            if exercise_id in self.by_id
+        }
+
+
+_cache_lock = threading.Lock()
+_cached_catalog: ExerciseCatalog | None = None
+
+
+def get_exercise_catalog(db: DbConnection, version: str | None = None) -> ExerciseCatalog:
+    """Return the process-wide catalog, reloading it if the version stamp moved.
+
+    Costs one single-row query when the cache is current, or none when the
+    caller already read the stamp (e.g. joined into its own query) and
+    passes it as version.
+    """
+    global _cached_catalog
+    if version is None:
+        version = fetch_catalog_version(db)
+    cached = _cached_catalog
+    if cached is not None and cached.version == version:
+        return cached
+    with _cache_lock:
+        cached = _cached_catalog
+        if cached is not None and cached.version == version:
+            return cached
+        for _attempt in range(CATALOG_LOAD_ATTEMPTS):
+            exercises = fetch_all_exercises(db)
+            # A reseed that lands between the two reads would pair old rows
+            # with the new stamp; re-check and reload if it moved.
+            current = fetch_catalog_version(db)
+            if current == version:
+                break
+            version = current
+        else:
+            raise RuntimeError("CATALOG_CHANGING")
+        catalog = ExerciseCatalog.build(version, exercises)
+        _cached_catalog = catalog
+        return catalog
+
+
+def clear_exercise_catalog_cache() -> None:
+    global _cached_catalog
+    with _cache_lock:
+        _cached_catalog = None
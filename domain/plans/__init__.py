@@ -1,4 +1,16 @@
-from domain.plans.generator import PlanGenerator
-from domain.plans.swap import apply_swap, list_swap_options
+from domain.plans.generator import (
+    PlanGenerator,
+    clear_plan_skeleton_cache,
+    plan_skeleton_cache_stats,
+)
+from domain.plans.swap import SwapRequest, apply_swap, apply_swaps, list_swap_options
 
-__all__ = ["PlanGenerator", "apply_swap", "list_swap_options"]
+__all__ = [
+    "PlanGenerator",
+    "SwapRequest",
+    "apply_swap",
+    "apply_swaps",
+    "clear_plan_skeleton_cache",
+    "list_swap_options",
+    "plan_skeleton_cache_stats",
+]
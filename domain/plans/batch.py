@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from db.connection import DEFAULT_PROFILE, DbConnection, get_db_connection
+from domain.exercises.catalog import get_exercise_catalog
+from domain.plans.generator import PlanGenerator
+from domain.plans.snapshots import refresh_plan_snapshots, write_plan_snapshots
+from queries.plans import (
+    PlannedExerciseRow,
+    WorkoutPlanRow,
+    count_questionnaire_responses,
+    fetch_latest_generated_plan_ids,
+    fetch_planned_exercises,
+    insert_workout_plan,
+    iter_questionnaire_responses,
+)
+
+REGENERATE_CHUNK_SIZE = 100
+WRITE_BATCH_SIZE = 500
+COMPARED_FIELDS = (
+    "session_type",
+    "exercise_id",
+    "target_sets",
+    "target_reps_min",
+    "target_reps_max",
+    "starting_weight",
+    "is_initial_load",
+)
+
+
+@dataclass(frozen=True)
+class PlanChange:
+    """One planned-exercise field that differs; a missing slot has field "slot"."""
+
+    day_index: int
+    sequence: int
+    field: str
+    existing: Any
+    proposed: Any
+
+
+@dataclass(frozen=True)
+class RegeneratedPlan:
+    questionnaire_id: int
+    user_id: int
+    existing_plan_id: int | None
+    planned_exercises: tuple[PlannedExerciseRow, ...] = ()
+    changes: tuple[PlanChange, ...] = ()
+    error: str | None = None
+
+    @property
+    def changed(self) -> bool:
+        return self.error is None and (self.existing_plan_id is None or bool(self.changes))
+
+
+@dataclass
+class BatchProgress:
+    total: int
+    processed: int = 0
+    changed: int = 0
+    failed: int = 0
+    written: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+def diff_planned_exercises(
+    existing: Iterable[PlannedExerciseRow], proposed: Iterable[PlannedExerciseRow]
+) -> list[PlanChange]:
+    before = {(row.day_index, row.sequence): row for row in existing}
+    after = {(row.day_index, row.sequence): row for row in proposed}
+    changes: list[PlanChange] = []
+    for day_index, sequence in sorted(before.keys() | after.keys()):
+        old = before.get((day_index, sequence))
+        new = after.get((day_index, sequence))
+        if old is None or new is None:
+            changes.append(
+                PlanChange(
+                    day_index,
+                    sequence,
+                    "slot",
+                    old.exercise_id if old else None,
+                    new.exercise_id if new else None,
+                )
+            )
+            continue
+        for name in COMPARED_FIELDS:
+            if getattr(old, name) != getattr(new, name):
+                changes.append(
+                    PlanChange(day_index, sequence, name, getattr(old, name), getattr(new, name))
+                )
+    return changes
+
+
+def regenerate_chunk(
+    db: DbConnection,
+    questionnaires: list[dict[str, Any]],
+    generator: PlanGenerator | None = None,
+) -> list[RegeneratedPlan]:
+    """Build plans for a chunk of questionnaires and diff them against the
+    newest plan each one already produced. Reads only.
+    """
+    generator = generator or PlanGenerator()
+    plan_ids = fetch_latest_generated_plan_ids(db, [row["id"] for row in questionnaires])
+    existing = fetch_planned_exercises(db, plan_ids.values())
+    results: list[RegeneratedPlan] = []
+    for questionnaire in questionnaires:
+        plan_id = plan_ids.get(questionnaire["id"])
+        try:
+            proposed = generator.build_planned_exercises(db, questionnaire)
+        except ValueError as exc:
+            results.append(
+                RegeneratedPlan(questionnaire["id"], questionnaire["user_id"], plan_id, error=str(exc))
+            )
+            continue
+        changes = diff_planned_exercises(existing[plan_id], proposed) if plan_id is not None else []
+        results.append(
+            RegeneratedPlan(
+                questionnaire_id=questionnaire["id"],
+                user_id=questionnaire["user_id"],
+                existing_plan_id=plan_id,
+                planned_exercises=tuple(proposed),
+                changes=tuple(changes),
+            )
+        )
+    return results
+
+
+_worker_db: DbConnection | None = None
+
+
+def _init_worker(db_path: str) -> None:
+    global _worker_db
+    _worker_db = get_db_connection(db_path, profile=DEFAULT_PROFILE, read_only=True)
+    # Each worker loads the catalog once and keeps it for every chunk.
+    get_exercise_catalog(_worker_db)
+
+
+def _regenerate_in_worker(questionnaires: list[dict[str, Any]]) -> list[RegeneratedPlan]:
+    assert _worker_db is not None
+    return regenerate_chunk(_worker_db, questionnaires)
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _pooled_results(
+    db_path: str, chunks: Iterator[list[dict[str, Any]]], workers: int
+) -> Iterator[list[RegeneratedPlan]]:
+    # Pool.imap would drain the questionnaire stream up front; a bounded
+    # window of outstanding chunks keeps memory flat on large tables.
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_regenerate_in_worker, (chunk,)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def regenerate_all_plans(
+    db_path: str | Path,
+    dry_run: bool = False,
+    workers: int | None = None,
+    chunk_size: int = REGENERATE_CHUNK_SIZE,
+    write_batch_size: int = WRITE_BATCH_SIZE,
+    start_date: date | None = None,
+    weeks: int = 4,
+    name: str = "Generated Plan",
+    on_result: Callable[[RegeneratedPlan], None] | None = None,
+    on_progress: Callable[[BatchProgress], None] | None = None,
+) -> BatchProgress:
+    """Regenerate plans for every questionnaire_responses row.
+
+    Questionnaires are streamed in id order and fanned out in chunks to a
+    process pool; each worker holds a read-only connection and its own
+    catalog snapshot. A questionnaire whose new plan differs from its newest
+    existing plan (or that has none) gets a fresh plan, written in
+    transactions of write_batch_size plans. With dry_run nothing is written
+    and callers see the diffs through on_result. workers=1 runs in-process.
+    """
+    if chunk_size <= 0 or write_batch_size <= 0:
+        raise ValueError("chunk_size and write_batch_size must be positive")
+    workers = workers or os.cpu_count() or 1
+    plan_start = start_date or date.today()
+    db_path = str(db_path)
+    # The writer opens first so it can switch the file to WAL before any
+    # reader holds a lock; WAL is what lets the stream and the writes overlap.
+    writer = None if dry_run else get_db_connection(db_path, profile=DEFAULT_PROFILE)
+    reader = get_db_connection(db_path, profile=DEFAULT_PROFILE, read_only=True)
+    pending: list[WorkoutPlanRow] = []
+    progress = BatchProgress(total=count_questionnaire_responses(reader))
+
+    def flush() -> None:
+        if writer is not None and pending:
+            with writer:
+                plan_ids = [insert_workout_plan(writer, plan) for plan in pending]
+                write_plan_snapshots(writer, plan_ids)
+            progress.written += len(plan_ids)
+            pending.clear()
+
+    try:
+        chunks = _chunks(iter_questionnaire_responses(reader), chunk_size)
+        if workers == 1:
+            generator = PlanGenerator()
+            results = (regenerate_chunk(reader, chunk, generator) for chunk in chunks)
+        else:
+            results = _pooled_results(db_path, chunks, workers)
+        for chunk_results in results:
+            for result in chunk_results:
+                progress.processed += 1
+                if result.error is not None:
+                    progress.failed += 1
+                elif result.changed:
+                    progress.changed += 1
+                if result.changed and writer is not None:
+                    pending.append(
+                        WorkoutPlanRow(
+                            user_id=result.user_id,
+                            name=name,
+                            start_date=plan_start,
+                            weeks=weeks,
+                            questionnaire_id=result.questionnaire_id,
+                            planned_exercises=result.planned_exercises,
+                        )
+                    )
+                if on_result is not None:
+                    on_result(result)
+            if len(pending) >= write_batch_size:
+                flush()
+            if on_progress is not None:
+                on_progress(progress)
+        flush()
+        if writer is not None:
+            # Unchanged plans keep their rows; catch up snapshots left stale
+            # by a reseed since they were written.
+            refresh_plan_snapshots(writer)
+    finally:
+        reader.close()
+        if writer is not None:
+            writer.close()
+    return progress
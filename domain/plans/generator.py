@@ -2,19 +2,24 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Iterable
-
-from db.connection import get_db_connection
+from typing import Any, Sequence
+
+from db.connection import DbConnection
+from domain.exercises.candidates import CandidateIndex, PatternCandidates
+from domain.cache import CacheStats, LruCache
+from domain.exercises.catalog import ExerciseCatalog, get_exercise_catalog
+from domain.plans.skeleton_cache import DEFAULT_SKELETON_CACHE_SIZE, PlanFingerprint
+from domain.plans.snapshots import write_plan_snapshots
 from domain.progression.engine import EQUIPMENT_DEFAULTS
 from domain.validation.progression import round_down_to_increment
 from queries.plans import (
     ExerciseRow,
     PlannedExerciseRow,
-    create_workout_plan,
-    fetch_exercise_pool,
-    fetch_latest_performance,
+    WorkoutPlanRow,
+    fetch_latest_performances,
     fetch_questionnaire_response,
     fetch_user_smallest_increment,
+    insert_workout_plan,
 )
 
 
@@ -95,80 +100,111 @@ class PlanDay:
     exercises: list[ExerciseRow]
 
 
+_skeleton_cache: LruCache[tuple[PlanDay, ...]] = LruCache(DEFAULT_SKELETON_CACHE_SIZE)
+
+
+def plan_skeleton_cache_stats() -> CacheStats:
+    return _skeleton_cache.stats()
+
+
+def clear_plan_skeleton_cache() -> None:
+    _skeleton_cache.clear()
+
+
 class PlanGenerator:
     """Generate a workout plan from questionnaire inputs.
 
     SQL mapping (selection logic):
     - questionnaire: fetch_questionnaire_response
-    - exercise pool: fetch_exercise_pool (pattern + equipment_id filter)
-    - starting load: fetch_latest_performance
-    - persistence: create_workout_plan
+    - exercise pool: ExerciseCatalog.candidates (per-equipment candidate index, in memory)
+    - starting load: fetch_latest_performances (one query for every planned exercise)
+    - persistence: insert_workout_plan and write_plan_snapshots, one transaction
+
+    Selected days are memoized by PlanFingerprint (questionnaire answers plus
+    catalog version), so a repeat of the same answers skips selection and the
+    audit; starting loads are always resolved for the requesting user.
     """
 
+    def __init__(self, skeleton_cache: LruCache[tuple[PlanDay, ...]] | None = None) -> None:
+        self._skeleton_cache = skeleton_cache if skeleton_cache is not None else _skeleton_cache
+
     def generate(
         self,
-        db_path: str,
+        db: DbConnection,
         questionnaire_id: int,
         start_date: date | None = None,
         weeks: int = 4,
         name: str = "Generated Plan",
     ) -> int:
         plan_start = start_date or date.today()
-        db = get_db_connection(db_path)
-        try:
-            questionnaire = fetch_questionnaire_response(db, questionnaire_id)
-            smallest_increment = fetch_user_smallest_increment(
-                db, questionnaire["user_id"]
-            )
-            weekly_frequency = questionnaire["schedule_days"]
-            training_days = self._resolve_training_days(
-                weekly_frequency, questionnaire.get("training_days_of_week")
-            )
-            split = self._select_split(
-                questionnaire["goals"],
-                weekly_frequency,
-            )
-            week_structure = self._build_week_structure(
-                split, weekly_frequency, questionnaire.get("split_variant")
-            )
-            equipment_ids = self._equipment_ids_for(
-                questionnaire["equipment_available"]
-            )
-            exercise_pool = fetch_exercise_pool(
-                db, self._unique_patterns(week_structure), equipment_ids
-            )
-            exercises_by_pattern = self._group_by_pattern(exercise_pool)
-            plan_days = self._build_plan_days(
-                training_days,
-                week_structure,
-                exercises_by_pattern,
-                questionnaire["experience_level"],
-                questionnaire.get("session_duration_minutes"),
-                questionnaire.get("focus_areas") or [],
-            )
-            self._audit_plan(
-                plan_days,
-                equipment_ids,
-                questionnaire["experience_level"],
-            )
-            planned_exercises = self._build_planned_exercises(
-                db,
-                questionnaire["user_id"],
-                plan_days,
-                smallest_increment,
-            )
-        finally:
-            db.close()
+        questionnaire = fetch_questionnaire_response(db, questionnaire_id)
+        planned_exercises = self.build_planned_exercises(db, questionnaire)
 
-        return create_workout_plan(
-            db_path=db_path,
+        plan = WorkoutPlanRow(
             user_id=questionnaire["user_id"],
             name=name,
             start_date=plan_start,
             weeks=weeks,
             questionnaire_id=questionnaire_id,
-            planned_exercises=planned_exercises,
+            planned_exercises=tuple(planned_exercises),
+        )
+        with db:
+            plan_id = insert_workout_plan(db, plan)
+            write_plan_snapshots(db, [plan_id])
+        return plan_id
+
+    def build_planned_exercises(
+        self, db: DbConnection, questionnaire: dict[str, Any]
+    ) -> list[PlannedExerciseRow]:
+        """Select and load a plan for a questionnaire row without saving it."""
+        smallest_increment = fetch_user_smallest_increment(
+            db, questionnaire["user_id"]
+        )
+        catalog = get_exercise_catalog(db)
+        plan_days = self._skeleton_cache.get_or_build(
+            PlanFingerprint.of(questionnaire, catalog.version),
+            lambda: self._build_skeleton(catalog, questionnaire),
+        )
+        return self._build_planned_exercises(
+            db,
+            questionnaire["user_id"],
+            plan_days,
+            smallest_increment,
+        )
+
+    def _build_skeleton(
+        self, catalog: ExerciseCatalog, questionnaire: dict[str, Any]
+    ) -> tuple[PlanDay, ...]:
+        weekly_frequency = questionnaire["schedule_days"]
+        training_days = self._resolve_training_days(
+            weekly_frequency, questionnaire.get("training_days_of_week")
+        )
+        split = self._select_split(
+            questionnaire["goals"],
+            weekly_frequency,
+        )
+        week_structure = self._build_week_structure(
+            split, weekly_frequency, questionnaire.get("split_variant")
+        )
+        equipment_ids = self._equipment_ids_for(
+            questionnaire["equipment_available"]
+        )
+        candidates = catalog.candidates(equipment_ids)
+        plan_days = self._build_plan_days(
+            training_days,
+            week_structure,
+            candidates,
+            questionnaire["experience_level"],
+            questionnaire.get("session_duration_minutes"),
+            questionnaire.get("focus_areas") or [],
+        )
+        self._audit_plan(
+            plan_days,
+            candidates,
+            equipment_ids,
+            questionnaire["experience_level"],
         )
+        return tuple(plan_days)
 
     def _select_split(self, goal: str, weekly_frequency: int) -> str:
         if goal == "general_fitness":
@@ -230,32 +266,11 @@ class PlanGenerator:
             raise ValueError("UNKNOWN_EQUIPMENT")
         return allowed
 
-    def _unique_patterns(self, week_structure: Iterable[str]) -> list[str]:
-        patterns: list[str] = []
-        for session_type in week_structure:
-            for pattern in SESSION_PATTERNS.get(session_type, []):
-                if pattern not in patterns:
-                    patterns.append(pattern)
-        if "accessory" not in patterns:
-            patterns.append("accessory")
-        return patterns
-
-    def _group_by_pattern(
-        self, exercise_pool: Iterable[ExerciseRow]
-    ) -> dict[str, list[ExerciseRow]]:
-        grouped: dict[str, list[ExerciseRow]] = {}
-        for exercise in exercise_pool:
-            key = exercise.movement_pattern.strip().lower()
-            grouped.setdefault(key, []).append(exercise)
-        for items in grouped.values():
-            items.sort(key=lambda entry: entry.name)
-        return grouped
-
     def _build_plan_days(
         self,
         day_indices: list[int],
         week_structure: list[str],
-        exercises_by_pattern: dict[str, list[ExerciseRow]],
+        candidates: CandidateIndex,
         experience_level: str,
         session_duration_minutes: int | None,
         focus_areas: list[str],
@@ -271,8 +286,8 @@ class PlanGenerator:
             accessory_count: dict[str, int] = {}
             selected_exercises: list[ExerciseRow] = []
             for pattern_index, pattern in enumerate(patterns):
-                pool = exercises_by_pattern.get(pattern, [])
-                if not pool:
+                pool = candidates.pattern(pattern)
+                if not pool.all:
                     raise ValueError("MINIMUM_LIBRARY_REQUIREMENTS")
                 occurrence_index = pattern_usage.get(pattern, 0)
                 selected = self._select_exercise_for_pattern(
@@ -285,6 +300,7 @@ class PlanGenerator:
                 if experience_level == "beginner" and pattern != "core":
                     selected = self._apply_beginner_accessory_limit(
                         selected,
+                        candidates,
                         pool,
                         day_index,
                         pattern_index,
@@ -296,7 +312,7 @@ class PlanGenerator:
                 selected_exercises.append(selected)
             accessories = self._select_accessories(
                 selected_exercises,
-                exercises_by_pattern.get("accessory", []),
+                candidates,
                 session_type,
                 session_duration_minutes,
                 experience_level,
@@ -351,12 +367,13 @@ class PlanGenerator:
     def _select_accessories(
         self,
         selected_exercises: list[ExerciseRow],
-        accessory_pool: list[ExerciseRow],
+        candidates: CandidateIndex,
         session_type: str,
         session_duration_minutes: int | None,
         experience_level: str,
         focus_areas: list[str],
     ) -> list[ExerciseRow]:
+        accessory_pool = candidates.pattern("accessory").all
         if not accessory_pool:
             return []
         budget = self._session_exercise_budget(
@@ -377,24 +394,17 @@ class PlanGenerator:
         session_muscles = ACCESSORY_MUSCLES_BY_SESSION.get(session_type, set())
         primary_targets = focus_muscles or session_muscles
 
-        candidates = [
-            exercise
-            for exercise in accessory_pool
-            if exercise.id not in selected_ids
-            and self._targets_muscles(exercise, primary_targets)
-        ]
-        if focus_muscles:
-            fallback = [
-                exercise
-                for exercise in accessory_pool
-                if exercise.id not in selected_ids
-                and exercise not in candidates
-                and self._targets_muscles(exercise, session_muscles)
-            ]
-        else:
-            fallback = []
-
-        ordered = sorted(candidates + fallback, key=lambda entry: entry.name)
+        # accessory_pool is already name-sorted, so a single pass keeps the
+        # primary matches and the focus fallback in the same order as before.
+        ordered: list[ExerciseRow] = []
+        for exercise in accessory_pool:
+            if exercise.id in selected_ids:
+                continue
+            muscles = candidates.profile(exercise).muscles
+            if not muscles.isdisjoint(primary_targets) or (
+                focus_muscles and not muscles.isdisjoint(session_muscles)
+            ):
+                ordered.append(exercise)
         return ordered[:slots]
 
     def _focus_muscle_set(self, focus_areas: list[str]) -> set[str]:
@@ -403,12 +413,6 @@ class PlanGenerator:
             muscles.update(FOCUS_AREA_MUSCLES.get(area, set()))
         return muscles
 
-    def _targets_muscles(self, exercise: ExerciseRow, muscles: set[str]) -> bool:
-        if not muscles:
-            return False
-        exercise_muscles = self._normalize_muscles(exercise.primary_muscle)
-        return bool(muscles.intersection(exercise_muscles))
-
     def _build_five_day_split(
         self, split: str, split_variant: str | None
     ) -> list[str]:
@@ -477,20 +481,13 @@ class PlanGenerator:
 
     def _select_exercise_for_pattern(
         self,
-        pool: list[ExerciseRow],
+        pool: PatternCandidates,
         day_index: int,
         pattern_index: int,
         experience_level: str,
         occurrence_index: int = 0,
     ) -> ExerciseRow:
-        compound = [ex for ex in pool if ex.category.strip().lower() == "compound"]
-        accessory = [ex for ex in pool if ex.category.strip().lower() == "accessory"]
-        if experience_level == "beginner":
-            candidates = compound or accessory
-        elif experience_level in {"intermediate", "advanced"}:
-            candidates = compound + accessory if compound else accessory
-        else:
-            raise ValueError("UNKNOWN_EXPERIENCE_LEVEL")
+        candidates = pool.eligible(experience_level)
         if not candidates:
             raise ValueError("MINIMUM_LIBRARY_REQUIREMENTS")
         return candidates[occurrence_index % len(candidates)]
@@ -498,51 +495,44 @@ class PlanGenerator:
     def _apply_beginner_accessory_limit(
         self,
         selected: ExerciseRow,
-        pool: list[ExerciseRow],
+        candidates: CandidateIndex,
+        pool: PatternCandidates,
         day_index: int,
         pattern_index: int,
         accessory_count: dict[str, int],
         experience_level: str,
         occurrence_index: int = 0,
     ) -> ExerciseRow:
-        if selected.category.strip().lower() != "accessory":
+        profile = candidates.profile(selected)
+        if profile.category != "accessory":
             return selected
-        muscle_groups = self._normalize_muscles(selected.primary_muscle)
+        muscle_groups = profile.muscles
         if not muscle_groups:
             return selected
         if any(accessory_count.get(muscle, 0) >= MAX_BEGINNER_ACCESSORY_PER_SESSION for muscle in muscle_groups):
-            compound_pool = [
-                exercise
-                for exercise in pool
-                if exercise.category.strip().lower() == "compound"
-            ]
-            if not compound_pool:
+            if not pool.compound:
                 raise ValueError("MINIMUM_LIBRARY_REQUIREMENTS")
-            return self._select_exercise_for_pattern(
-                compound_pool,
-                day_index=day_index,
-                pattern_index=pattern_index,
-                experience_level=experience_level,
-                occurrence_index=occurrence_index,
-            )
+            return pool.compound[occurrence_index % len(pool.compound)]
         for muscle in muscle_groups:
             accessory_count[muscle] = accessory_count.get(muscle, 0) + 1
         return selected
 
-    def _normalize_muscles(self, muscles: str) -> list[str]:
-        return [muscle.strip().lower() for muscle in muscles.split(",") if muscle.strip()]
-
     def _build_planned_exercises(
         self,
-        db,
+        db: DbConnection,
         user_id: int,
-        plan_days: list[PlanDay],
+        plan_days: Sequence[PlanDay],
         smallest_increment: float,
     ) -> list[PlannedExerciseRow]:
         planned_exercises: list[PlannedExerciseRow] = []
+        latest_weights = fetch_latest_performances(
+            db,
+            user_id,
+            [exercise.id for day in plan_days for exercise in day.exercises],
+        )
         for day in plan_days:
             for sequence, exercise in enumerate(day.exercises, start=1):
-                latest_weight = fetch_latest_performance(db, user_id, exercise.id)
+                latest_weight = latest_weights.get(exercise.id)
                 starting_weight = self._resolve_starting_weight(
                     exercise, latest_weight, smallest_increment
                 )
@@ -565,6 +555,7 @@ class PlanGenerator:
     def _audit_plan(
         self,
         plan_days: list[PlanDay],
+        candidates: CandidateIndex,
         allowed_equipment_ids: set[str],
         experience_level: str,
     ) -> None:
@@ -576,11 +567,12 @@ class PlanGenerator:
             for pattern, exercise in zip(patterns, day.exercises):
                 if exercise.equipment_id not in allowed_equipment_ids:
                     raise ValueError("PLAN_EQUIPMENT_MISMATCH")
-                if exercise.movement_pattern.strip().lower() != pattern:
+                profile = candidates.profile(exercise)
+                if profile.movement_pattern != pattern:
                     raise ValueError("PLAN_PATTERN_MISMATCH")
                 if experience_level == "beginner" and pattern != "core":
-                    if exercise.category.strip().lower() == "accessory":
-                        for muscle in self._normalize_muscles(exercise.primary_muscle):
+                    if profile.category == "accessory":
+                        for muscle in profile.muscles:
                             accessory_count[muscle] = accessory_count.get(muscle, 0) + 1
             if experience_level == "beginner":
                 if any(
@@ -591,7 +583,7 @@ class PlanGenerator:
             for exercise in day.exercises[len(patterns) :]:
                 if exercise.equipment_id not in allowed_equipment_ids:
                     raise ValueError("PLAN_EQUIPMENT_MISMATCH")
-                if exercise.category.strip().lower() != "accessory":
+                if candidates.profile(exercise).category != "accessory":
                     raise ValueError("PLAN_ACCESSORY_MISMATCH")
 
     def _resolve_starting_weight(
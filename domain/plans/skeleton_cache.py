@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_SKELETON_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class PlanFingerprint:
+    """Every questionnaire input that plan selection reads, plus the catalog
+    version. Two questionnaires with equal fingerprints get the same days and
+    exercises; only starting weights differ between users.
+    """
+
+    catalog_version: str
+    goals: str
+    experience_level: str
+    schedule_days: int
+    training_days: tuple[int, ...] | None
+    equipment_available: str
+    session_duration_minutes: int | None
+    focus_areas: tuple[str, ...]
+    split_variant: str | None
+
+    @classmethod
+    def of(cls, questionnaire: dict[str, Any], catalog_version: str) -> PlanFingerprint:
+        training_days = questionnaire.get("training_days_of_week")
+        return cls(
+            catalog_version=catalog_version,
+            goals=questionnaire["goals"],
+            experience_level=questionnaire["experience_level"],
+            schedule_days=questionnaire["schedule_days"],
+            # Selection sorts training days and unions focus muscles, so
+            # order never changes the plan.
+            training_days=tuple(sorted(training_days)) if training_days is not None else None,
+            equipment_available=questionnaire["equipment_available"],
+            session_duration_minutes=questionnaire.get("session_duration_minutes"),
+            focus_areas=tuple(sorted(set(questionnaire.get("focus_areas") or []))),
+            split_variant=questionnaire.get("split_variant"),
+        )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from api.encoding import dumps
+from db.connection import DbConnection
+from domain.exercises.catalog import ExerciseCatalog, get_exercise_catalog
+from queries.plans import fetch_planned_exercises
+from queries.snapshots import fetch_plan_summary, fetch_stale_plan_ids, upsert_plan_snapshot
+
+SNAPSHOT_REFRESH_BATCH_SIZE = 500
+
+
+def _parse_training_days(value: str | None) -> list[int]:
+    if not value:
+        return []
+    return [int(day.strip()) for day in value.split(",") if day.strip()]
+
+
+def build_plan_payload(
+    db: DbConnection, plan_id: int, catalog: ExerciseCatalog | None = None
+) -> dict[str, Any]:
+    """The GET /plans/<id> body, built from the tables."""
+    plan = fetch_plan_summary(db, plan_id)
+    plan["training_days_of_week"] = _parse_training_days(plan["training_days_of_week"])
+    catalog = catalog or get_exercise_catalog(db)
+    workouts: dict[int, dict[str, Any]] = {}
+    for row in fetch_planned_exercises(db, [plan_id]).get(plan_id, []):
+        exercise = catalog.get(row.exercise_id)
+        if row.day_index not in workouts:
+            workouts[row.day_index] = {
+                "day_index": row.day_index,
+                "session_type": row.session_type,
+                "exercises": [],
+            }
+        workouts[row.day_index]["exercises"].append(
+            {
+                "sequence": row.sequence,
+                "exercise_id": row.exercise_id,
+                "target_sets": row.target_sets,
+                "target_reps_min": row.target_reps_min,
+                "target_reps_max": row.target_reps_max,
+                "starting_weight": row.starting_weight,
+                "is_initial_load": row.is_initial_load,
+                "name": exercise.name,
+                "category": exercise.category,
+            }
+        )
+    plan["workouts"] = [workouts[key] for key in sorted(workouts)]
+    return plan
+
+
+def encode_plan_payload(plan: dict[str, Any]) -> bytes:
+    """Encode with the selected API encoder, so snapshot bytes match what
+    jsonify would send for the same plan."""
+    return dumps(plan)
+
+
+def write_plan_snapshots(db: DbConnection, plan_ids: Iterable[int]) -> None:
+    """Rebuild and store the snapshots of plan_ids.
+
+    Call after the plans' rows and data_version are final, inside the same
+    transaction when there is one, so the snapshot is current on commit.
+    """
+    catalog = get_exercise_catalog(db)
+    for plan_id in dict.fromkeys(plan_ids):
+        payload = encode_plan_payload(build_plan_payload(db, plan_id, catalog))
+        upsert_plan_snapshot(db, plan_id, catalog.version, payload)
+
+
+def refresh_plan_snapshots(
+    db: DbConnection, batch_size: int = SNAPSHOT_REFRESH_BATCH_SIZE
+) -> int:
+    """Rewrite every missing or stale snapshot, batch_size plans per
+    transaction; returns the number of snapshots written.
+
+    Run after a catalog reseed, which leaves every snapshot stale, and after
+    migrating a database that has plans but no snapshots yet.
+    """
+    plan_ids = fetch_stale_plan_ids(db)
+    for index in range(0, len(plan_ids), batch_size):
+        with db:
+            write_plan_snapshots(db, plan_ids[index : index + batch_size])
+    return len(plan_ids)
@@ -1,33 +1,33 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Sequence
 
-from db.connection import get_db_connection
+from db.connection import DbConnection
+from domain.exercises.catalog import get_exercise_catalog
 from domain.plans.generator import EQUIPMENT_ALLOWED
+from domain.plans.snapshots import write_plan_snapshots
+from domain.plans.swap_graph import SwapGraph, SwapKey, SwapOption, get_swap_graph
 from domain.progression.engine import EQUIPMENT_DEFAULTS
 from domain.validation.progression import round_down_to_increment
 from queries.plans import (
     ExerciseRow,
-    fetch_exercise_pool,
-    fetch_latest_performance,
-    fetch_plan_context,
-    fetch_planned_exercise_detail,
-    fetch_questionnaire_response,
+    PlannedExerciseSwapRow,
+    SwapSlot,
+    apply_planned_exercise_swaps,
+    fetch_latest_performances,
+    fetch_swap_slot,
+    fetch_swap_slots,
     fetch_user_smallest_increment,
-    insert_planned_exercise_swap,
-    update_planned_exercise,
 )
+from queries.versions import bump_plan_data_version
 
 
 @dataclass(frozen=True)
-class SwapOption:
-    id: int
-    name: str
-    movement_pattern: str
-    category: str
-    equipment_id: str
-    primary_muscle: str
+class SwapRequest:
+    day_index: int
+    sequence: int
+    exercise_id: int
 
 
 def _parse_excluded_patterns(value: str | None) -> set[str]:
@@ -36,16 +36,19 @@ def _parse_excluded_patterns(value: str | None) -> set[str]:
     return {pattern.strip().lower() for pattern in value.split(",") if pattern.strip()}
 
 
-def _eligible_by_experience(
-    pool: list[ExerciseRow], experience_level: str
-) -> list[ExerciseRow]:
-    compound = [exercise for exercise in pool if exercise.category.strip().lower() == "compound"]
-    accessory = [exercise for exercise in pool if exercise.category.strip().lower() == "accessory"]
-    if experience_level == "beginner":
-        return compound or accessory
-    if experience_level in {"intermediate", "advanced"}:
-        return compound + accessory if compound else accessory
-    raise ValueError("UNKNOWN_EXPERIENCE_LEVEL")
+def _swap_key(graph: SwapGraph, slot: SwapSlot) -> SwapKey | None:
+    """The slot's graph key, or None when the questionnaire excludes the
+    slot's movement pattern."""
+    planned_exercise = graph.catalog.get(slot.planned.exercise_id)
+    excluded_patterns = _parse_excluded_patterns(slot.excluded_patterns)
+    if planned_exercise.movement_pattern.strip().lower() in excluded_patterns:
+        return None
+    equipment_ids = EQUIPMENT_ALLOWED.get(slot.equipment_available)
+    if equipment_ids is None:
+        raise ValueError("UNKNOWN_EQUIPMENT")
+    return SwapKey(
+        planned_exercise.movement_pattern, frozenset(equipment_ids), slot.experience_level
+    )
 
 
 def _resolve_starting_weight(
@@ -59,92 +62,80 @@ def _resolve_starting_weight(
 
 
 def list_swap_options(
-    db_path: str, plan_id: int, day_index: int, sequence: int
+    db: DbConnection, plan_id: int, day_index: int, sequence: int
 ) -> list[SwapOption]:
-    db = get_db_connection(db_path)
-    try:
-        planned = fetch_planned_exercise_detail(db, plan_id, day_index, sequence)
-        context = fetch_plan_context(db, plan_id)
-        questionnaire = fetch_questionnaire_response(db, context["questionnaire_id"])
-        excluded_patterns = _parse_excluded_patterns(questionnaire["excluded_patterns"])
-        if planned.movement_pattern.strip().lower() in excluded_patterns:
-            return []
-        equipment_ids = EQUIPMENT_ALLOWED.get(questionnaire["equipment_available"])
-        if equipment_ids is None:
-            raise ValueError("UNKNOWN_EQUIPMENT")
-        pool = fetch_exercise_pool(
-            db, [planned.movement_pattern], list(equipment_ids)
-        )
-        eligible = _eligible_by_experience(pool, questionnaire["experience_level"])
-        options = [
-            SwapOption(
-                id=exercise.id,
-                name=exercise.name,
-                movement_pattern=exercise.movement_pattern,
-                category=exercise.category,
-                equipment_id=exercise.equipment_id,
-                primary_muscle=exercise.primary_muscle,
-            )
-            for exercise in eligible
-            if exercise.id != planned.exercise_id
-        ]
-        return options
-    finally:
-        db.close()
+    """Swap options for one slot, library-suggested alternatives first.
+
+    One query when the catalog is current: the slot read carries the
+    questionnaire answers and catalog stamp, and the options come from the
+    precomputed swap graph.
+    """
+    slot = fetch_swap_slot(db, plan_id, day_index, sequence)
+    graph = get_swap_graph(get_exercise_catalog(db, version=slot.catalog_version))
+    key = _swap_key(graph, slot)
+    if key is None:
+        return []
+    return list(graph.options(slot.planned.exercise_id, key))
 
 
 def apply_swap(
-    db_path: str,
+    db: DbConnection,
     plan_id: int,
     day_index: int,
     sequence: int,
     new_exercise_id: int,
 ) -> None:
-    db = get_db_connection(db_path)
-    try:
-        planned = fetch_planned_exercise_detail(db, plan_id, day_index, sequence)
-        context = fetch_plan_context(db, plan_id)
-        questionnaire = fetch_questionnaire_response(db, context["questionnaire_id"])
-        excluded_patterns = _parse_excluded_patterns(questionnaire["excluded_patterns"])
-        if planned.movement_pattern.strip().lower() in excluded_patterns:
+    apply_swaps(db, plan_id, [SwapRequest(day_index, sequence, new_exercise_id)])
+
+
+def apply_swaps(db: DbConnection, plan_id: int, swaps: Sequence[SwapRequest]) -> None:
+    """Swap several slots of one plan, all or nothing.
+
+    Every slot is validated against the same swap graph before anything is
+    written; the updates, swap-log rows and plan version bump then commit in
+    one transaction, together with the rewritten plan snapshot.
+    """
+    if not swaps:
+        raise ValueError("NO_SWAPS")
+    slot_keys = [(swap.day_index, swap.sequence) for swap in swaps]
+    if len(set(slot_keys)) != len(slot_keys):
+        raise ValueError("DUPLICATE_SWAP_SLOT")
+    slots = fetch_swap_slots(db, plan_id, slot_keys)
+    # Slots of one plan share its questionnaire answers and catalog stamp.
+    first = slots[slot_keys[0]]
+    graph = get_swap_graph(get_exercise_catalog(db, version=first.catalog_version))
+    replacements: list[tuple[SwapSlot, ExerciseRow]] = []
+    for swap, slot_key in zip(swaps, slot_keys):
+        slot = slots[slot_key]
+        key = _swap_key(graph, slot)
+        if key is None:
             raise ValueError("EXCLUDED_PATTERN")
-        equipment_ids = EQUIPMENT_ALLOWED.get(questionnaire["equipment_available"])
-        if equipment_ids is None:
-            raise ValueError("UNKNOWN_EQUIPMENT")
-        pool = fetch_exercise_pool(
-            db, [planned.movement_pattern], list(equipment_ids)
-        )
-        eligible = _eligible_by_experience(pool, questionnaire["experience_level"])
-        replacement = next(
-            (exercise for exercise in eligible if exercise.id == new_exercise_id), None
-        )
-        if replacement is None:
+        # Validate against the whole pool, not the listed options: choosing
+        # the current exercise is allowed and resets its starting load.
+        if not any(exercise.id == swap.exercise_id for exercise in graph.pool(key)):
             raise ValueError("INVALID_SWAP_EXERCISE")
-        smallest_increment = fetch_user_smallest_increment(db, context["user_id"])
-        latest_weight = fetch_latest_performance(
-            db, context["user_id"], replacement.id
-        )
-        starting_weight = _resolve_starting_weight(
-            replacement, latest_weight, smallest_increment
-        )
-        is_initial_load = latest_weight is None
-        with db:
-            update_planned_exercise(
-                db,
-                plan_id=plan_id,
-                day_index=day_index,
-                sequence=sequence,
-                exercise_id=replacement.id,
-                starting_weight=starting_weight,
-                is_initial_load=is_initial_load,
-            )
-            insert_planned_exercise_swap(
-                db,
-                plan_id=plan_id,
-                day_index=day_index,
-                sequence=sequence,
-                previous_exercise_id=planned.exercise_id,
+        replacements.append((slot, graph.catalog.get(swap.exercise_id)))
+
+    smallest_increment = fetch_user_smallest_increment(db, first.user_id)
+    latest_weights = fetch_latest_performances(
+        db, first.user_id, [replacement.id for _slot, replacement in replacements]
+    )
+    rows = []
+    for slot, replacement in replacements:
+        latest_weight = latest_weights.get(replacement.id)
+        rows.append(
+            PlannedExerciseSwapRow(
+                day_index=slot.planned.day_index,
+                sequence=slot.planned.sequence,
+                previous_exercise_id=slot.planned.exercise_id,
                 new_exercise_id=replacement.id,
+                starting_weight=_resolve_starting_weight(
+                    replacement, latest_weight, smallest_increment
+                ),
+                is_initial_load=latest_weight is None,
             )
-    finally:
-        db.close()
+        )
+    with db:
+        apply_planned_exercise_swaps(db, plan_id, rows)
+        bump_plan_data_version(db, plan_id)
+        write_plan_snapshots(db, [plan_id])
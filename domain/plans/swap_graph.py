@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from domain.exercises.catalog import ExerciseCatalog
+from domain.plans.generator import EQUIPMENT_ALLOWED
+from queries.plans import ExerciseRow
+
+EXPERIENCE_LEVELS = ("beginner", "intermediate", "advanced")
+
+_VARIANT_SUFFIX = re.compile(r"\s*\([^)]*\)\s*$")
+
+
+@dataclass(frozen=True)
+class SwapOption:
+    id: int
+    name: str
+    movement_pattern: str
+    category: str
+    equipment_id: str
+    primary_muscle: str
+    # Listed in the swapped-out exercise's library Alternatives column.
+    suggested: bool = False
+
+
+@dataclass(frozen=True)
+class SwapKey:
+    movement_pattern: str
+    equipment_ids: frozenset[str]
+    experience_level: str
+
+
+def _base_name(name: str) -> str:
+    """"Front Squat (dumbbell)" -> "front squat", the form Alternatives use."""
+    return _VARIANT_SUFFIX.sub("", name).strip().lower()
+
+
+def _suggested_ids(catalog: ExerciseCatalog) -> Mapping[int, frozenset[int]]:
+    by_base: dict[str, list[int]] = {}
+    for exercise in catalog.by_id.values():
+        by_base.setdefault(_base_name(exercise.name), []).append(exercise.id)
+    suggested = {}
+    for exercise in catalog.by_id.values():
+        names = {name.strip().lower() for name in exercise.alternatives.split(",") if name.strip()}
+        ids = {exercise_id for name in names for exercise_id in by_base.get(name, ())}
+        ids.discard(exercise.id)
+        suggested[exercise.id] = frozenset(ids)
+    return MappingProxyType(suggested)
+
+
+class SwapGraph:
+    """Swap candidates for every (movement pattern, equipment set, experience
+    level), precomputed from one catalog snapshot.
+
+    Edges from an exercise to the exercises named in its Alternatives
+    column mark those options as suggested. Suggested options sort first,
+    and everything else keeps the candidate index's order. The ordered
+    option list for a given exercise under a given key is built once, then
+    served from memory.
+    """
+
+    def __init__(self, catalog: ExerciseCatalog) -> None:
+        self.catalog = catalog
+        self.version = catalog.version
+        self.suggested = _suggested_ids(catalog)
+        pools: dict[SwapKey, tuple[ExerciseRow, ...]] = {}
+        for equipment_ids in EQUIPMENT_ALLOWED.values():
+            candidates = catalog.candidates(equipment_ids)
+            for movement_pattern, pattern in candidates.by_pattern.items():
+                for level in EXPERIENCE_LEVELS:
+                    key = SwapKey(movement_pattern, frozenset(equipment_ids), level)
+                    pools[key] = pattern.eligible(level)
+        self.pools: Mapping[SwapKey, tuple[ExerciseRow, ...]] = MappingProxyType(pools)
+        self._options: dict[tuple[SwapKey, int], tuple[SwapOption, ...]] = {}
+
+    def pool(self, key: SwapKey) -> tuple[ExerciseRow, ...]:
+        if key.experience_level not in EXPERIENCE_LEVELS:
+            raise ValueError("UNKNOWN_EXPERIENCE_LEVEL")
+        return self.pools.get(key, ())
+
+    def options(self, exercise_id: int, key: SwapKey) -> tuple[SwapOption, ...]:
+        """Options to replace exercise_id, suggested ones first."""
+        cached = self._options.get((key, exercise_id))
+        if cached is not None:
+            return cached
+        suggested = self.suggested.get(exercise_id, frozenset())
+        options = tuple(
+            SwapOption(
+                id=exercise.id,
+                name=exercise.name,
+                movement_pattern=exercise.movement_pattern,
+                category=exercise.category,
+                equipment_id=exercise.equipment_id,
+                primary_muscle=exercise.primary_muscle,
+                suggested=exercise.id in suggested,
+            )
+            for exercise in self.pool(key)
+            if exercise.id != exercise_id
+        )
+        options = tuple(sorted(options, key=lambda option: not option.suggested))
+        # A concurrent miss builds an identical tuple; last write wins.
+        self._options[(key, exercise_id)] = options
+        return options
+
+
+_graph_lock = threading.Lock()
+_cached_graph: SwapGraph | None = None
+
+
+def get_swap_graph(catalog: ExerciseCatalog) -> SwapGraph:
+    """Return the graph for this catalog snapshot, rebuilding after a reseed."""
+    global _cached_graph
+    cached = _cached_graph
+    if cached is not None and cached.catalog is catalog:
+        return cached
+    with _graph_lock:
+        cached = _cached_graph
+        if cached is None or cached.catalog is not catalog:
+            cached = SwapGraph(catalog)
+            _cached_graph = cached
+        return cached
@@ -1,3 +1,21 @@
-from domain.progression.engine import ProgressionRecommendation, recommend_next_load, recommend_progression
+from domain.progression.engine import (
+    ProgressionRecommendation,
+    recommend_next_load,
+    recommend_next_loads,
+    recommend_progression,
+)
+from domain.progression.state import (
+    check_progression_state,
+    rebuild_progression_state,
+    record_session_progression,
+)
 
-__all__ = ["ProgressionRecommendation", "recommend_next_load", "recommend_progression"]
+__all__ = [
+    "ProgressionRecommendation",
+    "check_progression_state",
+    "rebuild_progression_state",
+    "recommend_next_load",
+    "recommend_next_loads",
+    "recommend_progression",
+    "record_session_progression",
+]
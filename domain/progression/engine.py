@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 from typing import Iterable
 
+from db.connection import DbConnection
+from domain.exercises.catalog import get_exercise_catalog
 from domain.validation.progression import round_down_to_increment
-from queries.exercise_history import fetch_exercise_history
-from queries.progression import ExerciseMetadata, fetch_exercise_metadata, fetch_user_smallest_increment
+from queries.exercise_history import fetch_recent_sessions_for_exercises
+from queries.progression import ExerciseMetadata, fetch_user_smallest_increment
+from queries.progression_state import ProgressionStateRow, fetch_progression_states
 
 
+RECENT_SESSION_LIMIT = 3
 REPS_MIN = 6
 FIRST_SET_TARGET = 12
 LAST_SET_TARGET = 10
@@ -163,12 +167,38 @@ def _default_starting_weight(metadata: ExerciseMetadata, smallest_increment: flo
     return round_down_to_increment(base_weight, smallest_increment)
 
 
+def state_from_row(row: ProgressionStateRow) -> ProgressionState:
+    return ProgressionState(
+        last_session=SessionPerformance(
+            all_sets_completed=row.all_sets_completed,
+            min_reps=row.min_reps,
+            first_set_reps=row.first_set_reps,
+            last_set_reps=row.last_set_reps,
+            weight=row.last_weight,
+            eligible=row.eligible,
+            increase_achieved=row.increase_achieved,
+            missed_minimum=row.missed_minimum,
+            manual_audit_flag=row.manual_audit_flag,
+        ),
+        consecutive_misses=row.consecutive_misses,
+        has_prior_session=row.has_prior_session,
+    )
+
+
 def recommend_progression(
     history: dict,
     smallest_increment: float,
     metadata: ExerciseMetadata,
 ) -> ProgressionRecommendation:
     state = evaluate_progression_state(history.get("recent_sessions", []))
+    return recommend_from_state(state, smallest_increment, metadata)
+
+
+def recommend_from_state(
+    state: ProgressionState,
+    smallest_increment: float,
+    metadata: ExerciseMetadata,
+) -> ProgressionRecommendation:
     last_session = state.last_session
 
     if last_session is None:
@@ -261,8 +291,56 @@ def recommend_progression(
     )
 
 
-def recommend_next_load(db_path: str, user_id: int, exercise_id: int) -> ProgressionRecommendation:
-    history = fetch_exercise_history(db_path, user_id, exercise_id, limit_sessions=3)
-    smallest_increment = fetch_user_smallest_increment(db_path, user_id)
-    metadata = fetch_exercise_metadata(db_path, exercise_id)
-    return recommend_progression(history, smallest_increment, metadata)
+def _fetch_progression_states(
+    db: DbConnection, user_id: int, exercise_ids: list[int]
+) -> dict[int, ProgressionState]:
+    """Read materialized state, deriving it from history only for pairs without a row."""
+    states = {
+        exercise_id: state_from_row(row)
+        for exercise_id, row in fetch_progression_states(db, user_id, exercise_ids).items()
+    }
+    missing_ids = [exercise_id for exercise_id in exercise_ids if exercise_id not in states]
+    if missing_ids:
+        sessions_by_id = fetch_recent_sessions_for_exercises(
+            db, user_id, missing_ids, limit_sessions=RECENT_SESSION_LIMIT
+        )
+        for exercise_id in missing_ids:
+            states[exercise_id] = evaluate_progression_state(sessions_by_id[exercise_id])
+    return states
+
+
+def recommend_next_load(db: DbConnection, user_id: int, exercise_id: int) -> ProgressionRecommendation:
+    state = _fetch_progression_states(db, user_id, [exercise_id])[exercise_id]
+    smallest_increment = fetch_user_smallest_increment(db, user_id)
+    metadata = get_exercise_catalog(db).metadata(exercise_id)
+    return recommend_from_state(state, smallest_increment, metadata)
+
+
+def recommend_next_loads(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, ProgressionRecommendation]:
+    """Recommend next loads for every exercise of a workout day.
+
+    Uses a fixed number of queries (increment, catalog version, progression state)
+    however many exercises are requested, plus one history query when some
+    exercises have no materialized state yet. Ids missing from the catalog
+    are left out of the result, so one bad id does not fail the others.
+    """
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    smallest_increment = fetch_user_smallest_increment(db, user_id)
+    catalog = get_exercise_catalog(db)
+    unique_ids = [exercise_id for exercise_id in unique_ids if exercise_id in catalog.by_id]
+    if not unique_ids:
+        return {}
+    metadata_by_id = {exercise_id: catalog.metadata(exercise_id) for exercise_id in unique_ids}
+    states = _fetch_progression_states(db, user_id, unique_ids)
+    return {
+        exercise_id: recommend_from_state(
+            states[exercise_id],
+            smallest_increment,
+            metadata_by_id[exercise_id],
+        )
+        for exercise_id in unique_ids
+    }
@@ -0,0 +1,95 @@
+from typing import Iterable
+
+from db.connection import DbConnection
+from domain.workouts.logging import SetLogInput
+from queries.personal_records import (
+    PersonalRecordRow,
+    fetch_personal_records,
+    fetch_top_sets_for_exercises,
+    replace_personal_records,
+)
+
+# Rows kept per (user, exercise); migration 010 backfills the same number.
+PERSONAL_RECORD_LIMIT = 3
+
+
+def best_set_key(weight: float | None, reps: int | None, rpe: float | None) -> tuple:
+    # Mirrors ORDER BY weight DESC, reps DESC, rpe DESC where NULLs sort last.
+    return (
+        weight is not None,
+        weight if weight is not None else 0.0,
+        reps if reps is not None else 0,
+        rpe is not None,
+        rpe if rpe is not None else 0.0,
+    )
+
+
+def _record_key(record: PersonalRecordRow) -> tuple:
+    # Higher is better; between equal sets the earlier one keeps its place.
+    return (
+        best_set_key(record.weight, record.reps, record.rpe),
+        -record.session_id,
+        -record.set_number,
+    )
+
+
+def merge_personal_records(
+    current: Iterable[PersonalRecordRow], candidates: Iterable[PersonalRecordRow]
+) -> list[PersonalRecordRow]:
+    """The top PERSONAL_RECORD_LIMIT of current plus candidates, best first."""
+    merged = sorted([*current, *candidates], key=_record_key, reverse=True)
+    return merged[:PERSONAL_RECORD_LIMIT]
+
+
+def record_personal_records(
+    db: DbConnection,
+    user_id: int,
+    session_id: int,
+    performed_at: str,
+    set_logs: Iterable[SetLogInput],
+) -> dict[int, list[PersonalRecordRow]]:
+    """Merge a just-inserted session's sets into the stored records.
+
+    Call inside the transaction that inserted the session. Costs one read
+    of at most PERSONAL_RECORD_LIMIT rows per exercise, however long the
+    user's history is, and rewrites only exercises whose records changed.
+    Returns, per exercise, the sets from this session that are now records.
+    """
+    candidates: dict[int, list[PersonalRecordRow]] = {}
+    for set_log in set_logs:
+        candidates.setdefault(set_log.exercise_id, []).append(
+            PersonalRecordRow(
+                exercise_id=set_log.exercise_id,
+                session_id=session_id,
+                performed_at=performed_at,
+                set_number=set_log.set_number,
+                reps=set_log.reps,
+                weight=float(set_log.weight) if set_log.weight is not None else None,
+                rpe=float(set_log.rpe) if set_log.rpe is not None else None,
+                rest_seconds=set_log.rest_seconds,
+            )
+        )
+    current = fetch_personal_records(db, user_id, candidates)
+    changed: dict[int, list[PersonalRecordRow]] = {}
+    new_records: dict[int, list[PersonalRecordRow]] = {}
+    for exercise_id, new_sets in candidates.items():
+        merged = merge_personal_records(current[exercise_id], new_sets)
+        if merged != current[exercise_id]:
+            changed[exercise_id] = merged
+            new_records[exercise_id] = [
+                record for record in merged if record.session_id == session_id
+            ]
+    replace_personal_records(db, user_id, changed)
+    return new_records
+
+
+def compute_personal_records(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, list[PersonalRecordRow]]:
+    """Derive records from raw history."""
+    return fetch_top_sets_for_exercises(db, user_id, exercise_ids, PERSONAL_RECORD_LIMIT)
+
+
+def refresh_personal_records(db: DbConnection, user_id: int, exercise_ids: Iterable[int]) -> None:
+    """Recompute and store records for the given exercises (after bulk inserts)."""
+    replace_personal_records(db, user_id, compute_personal_records(db, user_id, exercise_ids))
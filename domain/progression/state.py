@@ -0,0 +1,262 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+from db.connection import DbConnection
+from domain.progression.engine import RECENT_SESSION_LIMIT, ProgressionState, evaluate_progression_state
+from domain.progression.records import (
+    best_set_key,
+    compute_personal_records,
+    refresh_personal_records,
+)
+from domain.workouts.logging import SetLogInput
+from queries.exercise_history import fetch_recent_sessions_for_exercises
+from queries.personal_records import (
+    PersonalRecordRow,
+    delete_personal_records,
+    fetch_personal_records,
+)
+from queries.progression_state import (
+    ProgressionStateRow,
+    delete_progression_states,
+    fetch_baseline_exercise_ids,
+    fetch_best_sets_for_exercises,
+    fetch_logged_exercise_ids,
+    fetch_progression_states,
+    fetch_user_ids_with_sessions,
+    fetch_user_progression_states,
+    upsert_progression_states,
+)
+from queries.versions import bump_user_data_versions
+
+REBUILD_CHUNK_SIZE = 200
+# Columns that only identify which set holds the record; ties between equal
+# sets are broken arbitrarily by SQLite, so they are not compared.
+TIE_BREAK_COLUMNS = {"best_session_id", "best_set_number"}
+
+
+@dataclass(frozen=True)
+class StateMismatch:
+    user_id: int
+    exercise_id: int
+    column: str
+    stored: object
+    expected: object
+
+
+def _build_state_row(
+    user_id: int,
+    exercise_id: int,
+    last_session_id: int,
+    state: ProgressionState,
+    baseline_established: bool,
+    best_set: tuple | None,
+) -> ProgressionStateRow:
+    last = state.last_session
+    best_session_id, best_set_number, best_weight, best_reps, best_rpe = best_set or (
+        None,
+        None,
+        None,
+        None,
+        None,
+    )
+    return ProgressionStateRow(
+        user_id=user_id,
+        exercise_id=exercise_id,
+        last_session_id=last_session_id,
+        last_weight=float(last.weight) if last.weight is not None else None,
+        all_sets_completed=last.all_sets_completed,
+        min_reps=last.min_reps,
+        first_set_reps=last.first_set_reps,
+        last_set_reps=last.last_set_reps,
+        eligible=last.eligible,
+        increase_achieved=last.increase_achieved,
+        missed_minimum=last.missed_minimum,
+        manual_audit_flag=last.manual_audit_flag,
+        consecutive_misses=state.consecutive_misses,
+        has_prior_session=state.has_prior_session,
+        baseline_established=baseline_established,
+        best_session_id=best_session_id,
+        best_set_number=best_set_number,
+        best_weight=best_weight,
+        best_reps=best_reps,
+        best_rpe=best_rpe,
+    )
+
+
+def compute_progression_states(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, ProgressionStateRow]:
+    """Derive state rows from raw history, the way the engine does on the fly."""
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    sessions_by_id = fetch_recent_sessions_for_exercises(
+        db, user_id, unique_ids, limit_sessions=RECENT_SESSION_LIMIT
+    )
+    best_sets = fetch_best_sets_for_exercises(db, user_id, unique_ids)
+    baseline_ids = fetch_baseline_exercise_ids(db, user_id, unique_ids)
+    rows: dict[int, ProgressionStateRow] = {}
+    for exercise_id in unique_ids:
+        sessions = sessions_by_id[exercise_id]
+        if not sessions:
+            continue
+        rows[exercise_id] = _build_state_row(
+            user_id,
+            exercise_id,
+            sessions[0]["session_id"],
+            evaluate_progression_state(sessions),
+            exercise_id in baseline_ids,
+            best_sets.get(exercise_id),
+        )
+    return rows
+
+
+def record_session_progression(
+    db: DbConnection, user_id: int, session_id: int, set_logs: Iterable[SetLogInput]
+) -> None:
+    """Update state rows for the exercises in a just-inserted session.
+
+    Call inside the transaction that inserted the session. The recent-session
+    window is re-read (bounded by RECENT_SESSION_LIMIT, so backdated sessions
+    are handled); baseline and best set are merged from the new sets without
+    touching older history. Pairs without a row yet are derived in full once.
+    """
+    sets_by_exercise: dict[int, list[SetLogInput]] = {}
+    for set_log in set_logs:
+        sets_by_exercise.setdefault(set_log.exercise_id, []).append(set_log)
+    if not sets_by_exercise:
+        return
+    exercise_ids = list(sets_by_exercise)
+    existing = fetch_progression_states(db, user_id, exercise_ids)
+    missing_ids = [exercise_id for exercise_id in exercise_ids if exercise_id not in existing]
+    rows = list(compute_progression_states(db, user_id, missing_ids).values())
+    if existing:
+        sessions_by_id = fetch_recent_sessions_for_exercises(
+            db, user_id, list(existing), limit_sessions=RECENT_SESSION_LIMIT
+        )
+        for exercise_id, prior in existing.items():
+            sessions = sessions_by_id[exercise_id]
+            new_sets = sets_by_exercise[exercise_id]
+            best_set = None
+            if prior.best_session_id is not None:
+                best_set = (
+                    prior.best_session_id,
+                    prior.best_set_number,
+                    prior.best_weight,
+                    prior.best_reps,
+                    prior.best_rpe,
+                )
+            for set_log in new_sets:
+                candidate = (
+                    session_id,
+                    set_log.set_number,
+                    float(set_log.weight) if set_log.weight is not None else None,
+                    set_log.reps,
+                    float(set_log.rpe) if set_log.rpe is not None else None,
+                )
+                if best_set is None or best_set_key(*candidate[2:]) > best_set_key(*best_set[2:]):
+                    best_set = candidate
+            rows.append(
+                _build_state_row(
+                    user_id,
+                    exercise_id,
+                    sessions[0]["session_id"],
+                    evaluate_progression_state(sessions),
+                    prior.baseline_established
+                    or any(set_log.is_initial_load for set_log in new_sets),
+                    best_set,
+                )
+            )
+    upsert_progression_states(db, rows)
+
+
+def refresh_progression_states(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> int:
+    """Recompute and store state rows for the given exercises; returns rows written.
+
+    Used after bulk inserts, where backdated history makes incremental merging
+    pointless; costs a fixed number of queries per call.
+    """
+    rows = compute_progression_states(db, user_id, exercise_ids)
+    upsert_progression_states(db, rows.values())
+    return len(rows)
+
+
+def rebuild_progression_state(db: DbConnection, user_id: int | None = None) -> int:
+    """Recompute state rows and personal records from history; returns the
+    number of state rows written."""
+    user_ids = [user_id] if user_id is not None else fetch_user_ids_with_sessions(db)
+    written = 0
+    for current_user_id in user_ids:
+        exercise_ids = fetch_logged_exercise_ids(db, current_user_id)
+        with db:
+            delete_progression_states(db, current_user_id)
+            delete_personal_records(db, current_user_id)
+            for index in range(0, len(exercise_ids), REBUILD_CHUNK_SIZE):
+                chunk = exercise_ids[index : index + REBUILD_CHUNK_SIZE]
+                rows = compute_progression_states(db, current_user_id, chunk)
+                upsert_progression_states(db, rows.values())
+                refresh_personal_records(db, current_user_id, chunk)
+                written += len(rows)
+            # History bodies read these tables; retire their ETags and
+            # cache entries along with the rewrite.
+            bump_user_data_versions(db, [current_user_id])
+    return written
+
+
+def check_progression_state(db: DbConnection, user_id: int | None = None) -> list[StateMismatch]:
+    """Compare stored state rows with an on-the-fly recomputation."""
+    user_ids = [user_id] if user_id is not None else fetch_user_ids_with_sessions(db)
+    mismatches: list[StateMismatch] = []
+    for current_user_id in user_ids:
+        stored = fetch_user_progression_states(db, current_user_id)
+        exercise_ids = list(dict.fromkeys([*fetch_logged_exercise_ids(db, current_user_id), *stored]))
+        expected: dict[int, ProgressionStateRow] = {}
+        stored_records: dict[int, list[PersonalRecordRow]] = {}
+        expected_records: dict[int, list[PersonalRecordRow]] = {}
+        for index in range(0, len(exercise_ids), REBUILD_CHUNK_SIZE):
+            chunk = exercise_ids[index : index + REBUILD_CHUNK_SIZE]
+            expected.update(compute_progression_states(db, current_user_id, chunk))
+            stored_records.update(fetch_personal_records(db, current_user_id, chunk))
+            expected_records.update(compute_personal_records(db, current_user_id, chunk))
+        for exercise_id in exercise_ids:
+            if stored_records.get(exercise_id) != expected_records.get(exercise_id):
+                mismatches.append(
+                    StateMismatch(
+                        user_id=current_user_id,
+                        exercise_id=exercise_id,
+                        column="personal_records",
+                        stored=stored_records.get(exercise_id),
+                        expected=expected_records.get(exercise_id),
+                    )
+                )
+            stored_row = stored.get(exercise_id)
+            expected_row = expected.get(exercise_id)
+            if stored_row is None or expected_row is None:
+                mismatches.append(
+                    StateMismatch(
+                        user_id=current_user_id,
+                        exercise_id=exercise_id,
+                        column="row",
+                        stored=stored_row is not None,
+                        expected=expected_row is not None,
+                    )
+                )
+                continue
+            for column in ProgressionStateRow.__dataclass_fields__:
+                if column in TIE_BREAK_COLUMNS:
+                    continue
+                stored_value = getattr(stored_row, column)
+                expected_value = getattr(expected_row, column)
+                if stored_value != expected_value:
+                    mismatches.append(
+                        StateMismatch(
+                            user_id=current_user_id,
+                            exercise_id=exercise_id,
+                            column=column,
+                            stored=stored_value,
+                            expected=expected_value,
+                        )
+                    )
+    return mismatches
@@ -1,13 +1,14 @@
 from typing import Iterable
 
+from db.connection import DbConnection
 from domain.workouts.logging import SetLogInput, auto_fill_from_last_session
 from queries.exercise_history import fetch_exercise_history
 
 
 def auto_fill_for_exercise(
-    db_path: str, user_id: int, exercise_id: int
+    db: DbConnection, user_id: int, exercise_id: int
 ) -> list[SetLogInput]:
-    history = fetch_exercise_history(db_path, user_id, exercise_id, limit_sessions=1)
+    history = fetch_exercise_history(db, user_id, exercise_id, limit_sessions=1)
     if not history["recent_sessions"]:
         return []
     last_sets = history["recent_sessions"][0]["sets"]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any
+
+from db.connection import DbConnection
+from domain.cache import CacheStats, LruCache
+from queries.exercise_history import fetch_exercise_history
+from queries.versions import fetch_user_data_version
+
+HISTORY_CACHE_SIZE = 2048
+
+# Keyed on (catalog version, user_id, user data_version, exercise_id). Every
+# session write bumps the user's data_version in the same transaction, so a
+# write from any process or worker makes the old entries unreachable and
+# they age out of the LRU. The catalog stamp is random per seeded database,
+# so one process serving several databases (tests, tools) never mixes their
+# histories, and a reseed starts afresh.
+_history_cache: LruCache[dict[str, Any]] = LruCache(HISTORY_CACHE_SIZE)
+
+
+def get_exercise_history(
+    db: DbConnection,
+    user_id: int,
+    exercise_id: int,
+    version: tuple[int, str] | None = None,
+) -> dict[str, Any]:
+    """fetch_exercise_history with the default window, cached per (user,
+    exercise) and user data version. A hit costs the version lookup, or
+    nothing when the caller passes the (data_version, catalog_version) it
+    already read for its ETag. The returned dict is shared between callers;
+    do not mutate it.
+    """
+    if version is None:
+        version = fetch_user_data_version(db, user_id)
+        if version is None:
+            return fetch_exercise_history(db, user_id, exercise_id)
+    data_version, catalog_version = version
+    return _history_cache.get_or_build(
+        (catalog_version, user_id, data_version, exercise_id),
+        lambda: fetch_exercise_history(db, user_id, exercise_id),
+    )
+
+
+def exercise_history_cache_stats() -> CacheStats:
+    return _history_cache.stats()
+
+
+def clear_exercise_history_cache() -> None:
+    _history_cache.clear()
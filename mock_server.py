@@ -86,6 +86,15 @@ def build_exercises_for_session(session_index, count=4):
     return exercises
 
 
+def build_recommendation(exercise_id):
+    base = DEFAULT_EXERCISES[exercise_id % len(DEFAULT_EXERCISES)]
+    return {
+        "exercise_id": exercise_id,
+        "rep_range": [base["target_reps_min"], base["target_reps_max"]],
+        "next_weight": 95,
+    }
+
+
 def get_session_types(schedule_days):
     if schedule_days <= 2:
         return ["Full Body A", "Full Body B"]
@@ -222,13 +231,17 @@ class MockHandler(SimpleHTTPRequestHandler):
                 exercise_id = int(query.get("exercise_id", [0])[0])
             except ValueError:
                 exercise_id = 0
-            base = DEFAULT_EXERCISES[exercise_id % len(DEFAULT_EXERCISES)]
-            payload = {
-                "exercise_id": exercise_id,
-                "rep_range": [base["target_reps_min"], base["target_reps_max"]],
-                "next_weight": 95,
-            }
-            self._send_json(200, payload)
+            self._send_json(200, build_recommendation(exercise_id))
+            return
+        if parsed.path == "/progression/recommendations/batch":
+            query = parse_qs(parsed.query)
+            raw_ids = query.get("exercise_ids", [""])[0]
+            try:
+                exercise_ids = [int(item) for item in raw_ids.split(",") if item.strip()]
+            except ValueError:
+                self._send_json(400, {"error": "Invalid exercise_ids"})
+                return
+            self._send_json(200, [build_recommendation(item) for item in exercise_ids])
             return
         if parsed.path.startswith("/plans/"):
             parts = parsed.path.strip("/").split("/")
@@ -0,0 +1,43 @@
+from db.connection import DbConnection
+from queries.plans import ExerciseRow
+
+
+def fetch_catalog_version(db: DbConnection) -> str:
+    row = db.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+    if row is None:
+        raise ValueError("CATALOG_VERSION_MISSING")
+    return row[0]
+
+
+def fetch_all_exercises(db: DbConnection) -> list[ExerciseRow]:
+    cursor = db.execute(
+        """
+        SELECT id, name, movement_pattern, category, equipment_id, primary_muscle, alternatives
+        FROM exercises
+        ORDER BY id
+        """
+    )
+    return [
+        ExerciseRow(
+            id=row[0],
+            name=row[1],
+            movement_pattern=row[2],
+            category=row[3],
+            equipment_id=row[4],
+            primary_muscle=row[5],
+            alternatives=row[6],
+        )
+        for row in cursor.fetchall()
+    ]
+
+
+def bump_catalog_version(db: DbConnection) -> None:
+    db.execute(
+        """
+        INSERT INTO catalog_version (id, version)
+        VALUES (1, lower(hex(randomblob(16))))
+        ON CONFLICT (id) DO UPDATE SET
+            version = excluded.version,
+            updated_at = CURRENT_TIMESTAMP
+        """
+    )
@@ -1,7 +1,7 @@
 from collections import defaultdict
 from typing import Any
 
-from db.connection import DbConnection, get_db_connection
+from db.connection import DbConnection
 
 
 def _fetch_recent_session_rows(
@@ -43,13 +43,14 @@ def _fetch_set_logs_for_sessions(
 def _fetch_best_sets(
     db: DbConnection, user_id: int, exercise_id: int, limit_sets: int
 ) -> list[tuple]:
+    # personal_records holds the top sets already ranked, so this reads at
+    # most limit_sets rows however many sets the user has logged.
     cursor = db.execute(
         """
-        SELECT ws.id AS session_id, ws.performed_at, sl.set_number, sl.reps, sl.weight, sl.rpe, sl.rest_seconds
-        FROM set_logs sl
-        JOIN workout_sessions ws ON ws.id = sl.session_id
-        WHERE ws.user_id = ? AND sl.exercise_id = ?
-        ORDER BY sl.weight DESC, sl.reps DESC, sl.rpe DESC
+        SELECT session_id, performed_at, set_number, reps, weight, rpe, rest_seconds
+        FROM personal_records
+        WHERE user_id = ? AND exercise_id = ?
+        ORDER BY record_rank
         LIMIT ?
         """,
         (user_id, exercise_id, limit_sets),
@@ -58,76 +59,148 @@ def _fetch_best_sets(
 
 
 def _fetch_baseline_established(db: DbConnection, user_id: int, exercise_id: int) -> bool:
+    # The progression state row already carries the flag; the set log scan
+    # only runs for exercises that have no state row yet (COALESCE stops at
+    # the first non-NULL argument).
     cursor = db.execute(
         """
-        SELECT 1
-        FROM set_logs sl
-        JOIN workout_sessions ws ON ws.id = sl.session_id
-        WHERE ws.user_id = ? AND sl.exercise_id = ? AND sl.is_initial_load = 1
-        LIMIT 1
+        SELECT COALESCE(
+            (
+                SELECT baseline_established
+                FROM exercise_progression_state
+                WHERE user_id = ? AND exercise_id = ?
+            ),
+            EXISTS (
+                SELECT 1
+                FROM set_logs sl
+                JOIN workout_sessions ws ON ws.id = sl.session_id
+                WHERE ws.user_id = ? AND sl.exercise_id = ? AND sl.is_initial_load = 1
+            )
+        )
         """,
-        (user_id, exercise_id),
+        (user_id, exercise_id, user_id, exercise_id),
     )
-    return cursor.fetchone() is not None
+    return bool(cursor.fetchone()[0])
+
+
+def _build_set_entry(row: tuple) -> dict[str, Any]:
+    return {
+        "session_id": row[0],
+        "exercise_id": row[1],
+        "set_number": row[2],
+        "reps": row[3],
+        "weight": float(row[4]) if row[4] is not None else None,
+        "rpe": float(row[5]) if row[5] is not None else None,
+        "rest_seconds": row[6],
+        "is_initial_load": bool(row[7]),
+    }
 
 
 def fetch_exercise_history(
-    db_path: str, user_id: int, exercise_id: int, limit_sessions: int = 5
+    db: DbConnection, user_id: int, exercise_id: int, limit_sessions: int = 5
 ) -> dict[str, Any]:
-    db = get_db_connection(db_path)
-    try:
-        recent_rows = _fetch_recent_session_rows(db, user_id, exercise_id, limit_sessions)
-        session_ids = [row[0] for row in recent_rows]
-        set_rows = _fetch_set_logs_for_sessions(db, session_ids, exercise_id)
-
-        sets_by_session: dict[int, list[dict[str, Any]]] = defaultdict(list)
-        for row in set_rows:
-            sets_by_session[row[0]].append(
-                {
-                    "session_id": row[0],
-                    "exercise_id": row[1],
-                    "set_number": row[2],
-                    "reps": row[3],
-                    "weight": float(row[4]) if row[4] is not None else None,
-                    "rpe": float(row[5]) if row[5] is not None else None,
-                    "rest_seconds": row[6],
-                    "is_initial_load": bool(row[7]),
-                }
-            )
+    recent_rows = _fetch_recent_session_rows(db, user_id, exercise_id, limit_sessions)
+    session_ids = [row[0] for row in recent_rows]
+    set_rows = _fetch_set_logs_for_sessions(db, session_ids, exercise_id)
 
-        sessions = []
-        for row in recent_rows:
-            sessions.append(
-                {
-                    "session_id": row[0],
-                    "performed_at": row[1],
-                    "duration_minutes": row[2],
-                    "notes": row[3],
-                    "completion_status": row[4],
-                    "manual_audit_flag": bool(row[5]),
-                    "sets": sets_by_session.get(row[0], []),
-                }
-            )
+    sets_by_session: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for row in set_rows:
+        sets_by_session[row[0]].append(_build_set_entry(row))
 
-        best_rows = _fetch_best_sets(db, user_id, exercise_id, limit_sets=3)
-        best_sets = [
+    sessions = []
+    for row in recent_rows:
+        sessions.append(
             {
                 "session_id": row[0],
                 "performed_at": row[1],
-                "set_number": row[2],
-                "reps": row[3],
-                "weight": float(row[4]) if row[4] is not None else None,
-                "rpe": float(row[5]) if row[5] is not None else None,
-                "rest_seconds": row[6],
+                "duration_minutes": row[2],
+                "notes": row[3],
+                "completion_status": row[4],
+                "manual_audit_flag": bool(row[5]),
+                "sets": sets_by_session.get(row[0], []),
             }
-            for row in best_rows
-        ]
-        baseline_established = _fetch_baseline_established(db, user_id, exercise_id)
-        return {
-            "recent_sessions": sessions,
-            "best_sets": best_sets,
-            "baseline_established": baseline_established,
-            "baseline_status": "Baseline established" if baseline_established else None,
+        )
+
+    best_rows = _fetch_best_sets(db, user_id, exercise_id, limit_sets=3)
+    best_sets = [
+        {
+            "session_id": row[0],
+            "performed_at": row[1],
+            "set_number": row[2],
+            "reps": row[3],
+            "weight": float(row[4]) if row[4] is not None else None,
+            "rpe": float(row[5]) if row[5] is not None else None,
+            "rest_seconds": row[6],
         }
-    finally:
-        db.close()
+        for row in best_rows
+    ]
+    baseline_established = _fetch_baseline_established(db, user_id, exercise_id)
+    return {
+        "recent_sessions": sessions,
+        "best_sets": best_sets,
+        "baseline_established": baseline_established,
+        "baseline_status": "Baseline established" if baseline_established else None,
+    }
+
+
+def fetch_recent_sessions_for_exercises(
+    db: DbConnection, user_id: int, exercise_ids: list[int], limit_sessions: int
+) -> dict[int, list[dict[str, Any]]]:
+    """Return the most recent sessions with sets for several exercises at once.
+
+    Sessions are ranked per exercise with a window function, so the result for
+    each exercise matches fetch_exercise_history's recent_sessions in a single
+    statement regardless of how many exercises are requested.
+    """
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    sessions_by_exercise: dict[int, list[dict[str, Any]]] = {
+        exercise_id: [] for exercise_id in unique_ids
+    }
+    if not unique_ids:
+        return sessions_by_exercise
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        WITH exercise_sessions AS (
+            SELECT DISTINCT sl.exercise_id, ws.id AS session_id, ws.performed_at
+            FROM set_logs sl
+            JOIN workout_sessions ws ON ws.id = sl.session_id
+            WHERE ws.user_id = ? AND sl.exercise_id IN ({placeholders})
+        ),
+        ranked AS (
+            SELECT exercise_id,
+                   session_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY exercise_id
+                       ORDER BY performed_at DESC, session_id DESC
+                   ) AS session_rank
+            FROM exercise_sessions
+        )
+        SELECT sl.session_id, sl.exercise_id, sl.set_number, sl.reps, sl.weight, sl.rpe,
+               sl.rest_seconds, sl.is_initial_load,
+               ws.performed_at, ws.duration_minutes, ws.notes, ws.completion_status,
+               ws.manual_audit_flag
+        FROM ranked r
+        JOIN workout_sessions ws ON ws.id = r.session_id
+        JOIN set_logs sl ON sl.session_id = r.session_id AND sl.exercise_id = r.exercise_id
+        WHERE r.session_rank <= ?
+        ORDER BY r.exercise_id, r.session_rank, sl.set_number ASC
+        """,
+        (user_id, *unique_ids, limit_sessions),
+    )
+    for row in cursor.fetchall():
+        sessions = sessions_by_exercise[row[1]]
+        if not sessions or sessions[-1]["session_id"] != row[0]:
+            sessions.append(
+                {
+                    "session_id": row[0],
+                    "performed_at": row[8],
+                    "duration_minutes": row[9],
+                    "notes": row[10],
+                    "completion_status": row[11],
+                    "manual_audit_flag": bool(row[12]),
+                    "sets": [],
+                }
+            )
+        sessions[-1]["sets"].append(_build_set_entry(row))
+    return sessions_by_exercise
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from db.connection import DbConnection
+
+
+@dataclass(frozen=True)
+class PersonalRecordRow:
+    exercise_id: int
+    session_id: int
+    performed_at: str
+    set_number: int
+    reps: int
+    weight: float | None
+    rpe: float | None
+    rest_seconds: int | None
+
+
+RECORD_COLUMNS = """
+    exercise_id, session_id, performed_at, set_number, reps, weight, rpe, rest_seconds
+"""
+
+
+def _record_from_row(row: tuple) -> PersonalRecordRow:
+    return PersonalRecordRow(
+        exercise_id=row[0],
+        session_id=row[1],
+        performed_at=row[2],
+        set_number=row[3],
+        reps=row[4],
+        weight=float(row[5]) if row[5] is not None else None,
+        rpe=float(row[6]) if row[6] is not None else None,
+        rest_seconds=row[7],
+    )
+
+
+def _group(rows: Iterable[tuple], exercise_ids: list[int]) -> dict[int, list[PersonalRecordRow]]:
+    records: dict[int, list[PersonalRecordRow]] = {exercise_id: [] for exercise_id in exercise_ids}
+    for row in rows:
+        records[row[0]].append(_record_from_row(row))
+    return records
+
+
+def fetch_personal_records(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, list[PersonalRecordRow]]:
+    """Stored records per exercise, best first (every id is a key)."""
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        SELECT {RECORD_COLUMNS}
+        FROM personal_records
+        WHERE user_id = ?
+          AND exercise_id IN ({placeholders})
+        ORDER BY exercise_id, record_rank
+        """,
+        (user_id, *unique_ids),
+    )
+    return _group(cursor.fetchall(), unique_ids)
+
+
+def fetch_top_sets_for_exercises(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int], limit: int
+) -> dict[int, list[PersonalRecordRow]]:
+    """Derive personal records from set_logs, in personal_records order."""
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        WITH ranked AS (
+            SELECT sl.exercise_id,
+                   sl.session_id,
+                   ws.performed_at,
+                   sl.set_number,
+                   sl.reps,
+                   sl.weight,
+                   sl.rpe,
+                   sl.rest_seconds,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY sl.exercise_id
+                       ORDER BY sl.weight DESC, sl.reps DESC, sl.rpe DESC,
+                                sl.session_id, sl.set_number
+                   ) AS record_rank
+            FROM set_logs sl
+            JOIN workout_sessions ws ON ws.id = sl.session_id
+            WHERE ws.user_id = ? AND sl.exercise_id IN ({placeholders})
+        )
+        SELECT {RECORD_COLUMNS}
+        FROM ranked
+        WHERE record_rank <= ?
+        ORDER BY exercise_id, record_rank
+        """,
+        (user_id, *unique_ids, limit),
+    )
+    return _group(cursor.fetchall(), unique_ids)
+
+
+def replace_personal_records(
+    db: DbConnection, user_id: int, records: Mapping[int, Iterable[PersonalRecordRow]]
+) -> None:
+    """Overwrite the stored records of each exercise in records."""
+    if not records:
+        return
+    db.executemany(
+        "DELETE FROM personal_records WHERE user_id = ? AND exercise_id = ?",
+        [(user_id, exercise_id) for exercise_id in records],
+    )
+    db.executemany(
+        """
+        INSERT INTO personal_records
+            (user_id, exercise_id, record_rank, session_id, performed_at, set_number, reps,
+             weight, rpe, rest_seconds)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                user_id,
+                exercise_id,
+                rank,
+                record.session_id,
+                record.performed_at,
+                record.set_number,
+                record.reps,
+                record.weight,
+                record.rpe,
+                record.rest_seconds,
+            )
+            for exercise_id, rows in records.items()
+            for rank, record in enumerate(rows, start=1)
+        ],
+    )
+
+
+def delete_personal_records(db: DbConnection, user_id: int) -> None:
+    db.execute("DELETE FROM personal_records WHERE user_id = ?", (user_id,))
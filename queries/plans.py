@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 from datetime import date
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
-from db.connection import DbConnection, get_db_connection
+from db.connection import DbConnection
 
 
 @dataclass(frozen=True)
@@ -13,6 +13,21 @@ class ExerciseRow:
     category: str
     equipment_id: str
     primary_muscle: str
+    # Comma-separated names from the library's Alternatives column.
+    alternatives: str = ""
+
+
+QUESTIONNAIRE_FETCH_SIZE = 500
+
+QUESTIONNAIRE_COLUMNS = """
+    id, user_id, goals, experience_level, schedule_days, equipment_available,
+    session_duration_minutes, injuries_constraints, excluded_patterns,
+    training_days_of_week, focus_areas, split_variant
+"""
+PLANNED_EXERCISE_COLUMNS = """
+    day_index, session_type, sequence, exercise_id, target_sets,
+    target_reps_min, target_reps_max, starting_weight, is_initial_load
+"""
 
 
 @dataclass(frozen=True)
@@ -29,21 +44,49 @@ class PlannedExerciseRow:
 
 
 @dataclass(frozen=True)
-class PlannedExerciseDetail:
-    plan_id: int
+class SwapSlot:
+    """A planned exercise plus everything needed to list or validate swaps."""
+
+    planned: PlannedExerciseRow
+    user_id: int
+    experience_level: str
+    equipment_available: str
+    excluded_patterns: str | None
+    catalog_version: str
+
+
+@dataclass(frozen=True)
+class PlannedExerciseSwapRow:
     day_index: int
     sequence: int
-    exercise_id: int
-    session_type: str
-    target_sets: int
-    target_reps_min: int
-    target_reps_max: int
+    previous_exercise_id: int
+    new_exercise_id: int
     starting_weight: float | None
     is_initial_load: bool
-    movement_pattern: str
-    category: str
-    equipment_id: str
-    primary_muscle: str
+
+
+@dataclass(frozen=True)
+class WorkoutPlanRow:
+    user_id: int
+    name: str
+    start_date: date
+    weeks: int
+    questionnaire_id: int
+    planned_exercises: tuple[PlannedExerciseRow, ...]
+
+
+def _planned_exercise_from_row(row: tuple) -> PlannedExerciseRow:
+    return PlannedExerciseRow(
+        day_index=row[0],
+        session_type=row[1],
+        sequence=row[2],
+        exercise_id=row[3],
+        target_sets=row[4],
+        target_reps_min=row[5],
+        target_reps_max=row[6],
+        starting_weight=float(row[7]) if row[7] is not None else None,
+        is_initial_load=bool(row[8]),
+    )
 
 
 def _parse_training_days(value: str | None) -> list[int] | None:
@@ -61,20 +104,7 @@ def _parse_focus_areas(value: str | None) -> list[str] | None:
     return areas or None
 
 
-def fetch_questionnaire_response(db: DbConnection, questionnaire_id: int) -> dict[str, Any]:
-    cursor = db.execute(
-        """
-        SELECT id, user_id, goals, experience_level, schedule_days, equipment_available,
-               session_duration_minutes, injuries_constraints, excluded_patterns,
-               training_days_of_week, focus_areas, split_variant
-        FROM questionnaire_responses
-        WHERE id = ?
-        """,
-        (questionnaire_id,),
-    )
-    row = cursor.fetchone()
-    if row is None:
-        raise ValueError("QUESTIONNAIRE_NOT_FOUND")
+def _questionnaire_from_row(row: tuple) -> dict[str, Any]:
     return {
         "id": row[0],
         "user_id": row[1],
@@ -91,124 +121,192 @@ def fetch_questionnaire_response(db: DbConnection, questionnaire_id: int) -> dic
     }
 
 
-def fetch_exercise_pool(
-    db: DbConnection,
-    movement_patterns: Iterable[str],
-    equipment_ids: Iterable[str],
-) -> list[ExerciseRow]:
-    patterns = list(dict.fromkeys(movement_patterns))
-    equipment = list(dict.fromkeys(equipment_ids))
-    if not patterns or not equipment:
-        return []
-    pattern_placeholders = ",".join("?" for _ in patterns)
-    equipment_placeholders = ",".join("?" for _ in equipment)
+def fetch_questionnaire_response(db: DbConnection, questionnaire_id: int) -> dict[str, Any]:
     cursor = db.execute(
         f"""
-        SELECT id, name, movement_pattern, category, equipment_id, primary_muscle
-        FROM exercises
-        WHERE movement_pattern IN ({pattern_placeholders})
-          AND equipment_id IN ({equipment_placeholders})
-        ORDER BY name ASC
+        SELECT {QUESTIONNAIRE_COLUMNS}
+        FROM questionnaire_responses
+        WHERE id = ?
         """,
-        (*patterns, *equipment),
+        (questionnaire_id,),
     )
-    return [
-        ExerciseRow(
-            id=row[0],
-            name=row[1],
-            movement_pattern=row[2],
-            category=row[3],
-            equipment_id=row[4],
-            primary_muscle=row[5],
-        )
-        for row in cursor.fetchall()
-    ]
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError("QUESTIONNAIRE_NOT_FOUND")
+    return _questionnaire_from_row(row)
+
 
+def count_questionnaire_responses(db: DbConnection) -> int:
+    return int(db.execute("SELECT COUNT(*) FROM questionnaire_responses").fetchone()[0])
 
-def fetch_plan_context(db: DbConnection, plan_id: int) -> dict[str, Any]:
+
+def iter_questionnaire_responses(
+    db: DbConnection, fetch_size: int = QUESTIONNAIRE_FETCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Stream every questionnaire in id order without loading them all at once."""
     cursor = db.execute(
+        f"""
+        SELECT {QUESTIONNAIRE_COLUMNS}
+        FROM questionnaire_responses
+        ORDER BY id
         """
-        SELECT user_id, generated_from_questionnaire_id
-        FROM plans
-        WHERE id = ?
-        """,
-        (plan_id,),
     )
-    row = cursor.fetchone()
-    if row is None:
-        raise ValueError("PLAN_NOT_FOUND")
-    return {"user_id": row[0], "questionnaire_id": row[1]}
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield _questionnaire_from_row(row)
+
+
+SWAP_SLOT_SELECT = f"""
+    SELECT {PLANNED_EXERCISE_COLUMNS},
+           p.user_id, q.experience_level, q.equipment_available, q.excluded_patterns,
+           q.id, c.version
+    FROM planned_exercises pe
+    JOIN plans p ON p.id = pe.plan_id
+    LEFT JOIN questionnaire_responses q ON q.id = p.generated_from_questionnaire_id
+    LEFT JOIN catalog_version c ON c.id = 1
+"""
+
+
+def _swap_slot_from_row(row: tuple) -> SwapSlot:
+    if row[13] is None:
+        raise ValueError("QUESTIONNAIRE_NOT_FOUND")
+    if row[14] is None:
+        raise ValueError("CATALOG_VERSION_MISSING")
+    return SwapSlot(
+        planned=_planned_exercise_from_row(row[:9]),
+        user_id=row[9],
+        experience_level=row[10],
+        equipment_available=row[11],
+        excluded_patterns=row[12],
+        catalog_version=row[14],
+    )
 
 
-def fetch_planned_exercise_detail(
+def fetch_swap_slot(
     db: DbConnection, plan_id: int, day_index: int, sequence: int
-) -> PlannedExerciseDetail:
-    cursor = db.execute(
-        """
-        SELECT pe.plan_id,
-               pe.day_index,
-               pe.sequence,
-               pe.exercise_id,
-               pe.session_type,
-               pe.target_sets,
-               pe.target_reps_min,
-               pe.target_reps_max,
-               pe.starting_weight,
-               pe.is_initial_load,
-               ex.movement_pattern,
-               ex.category,
-               ex.equipment_id,
-               ex.primary_muscle
-        FROM planned_exercises pe
-        JOIN exercises ex ON ex.id = pe.exercise_id
+) -> SwapSlot:
+    """One read for a swap: the slot, its plan's questionnaire answers and
+    the catalog stamp, so the caller can use a cached catalog without
+    another query."""
+    row = db.execute(
+        f"""
+        {SWAP_SLOT_SELECT}
         WHERE pe.plan_id = ?
           AND pe.day_index = ?
           AND pe.sequence = ?
         """,
         (plan_id, day_index, sequence),
-    )
-    row = cursor.fetchone()
+    ).fetchone()
     if row is None:
         raise ValueError("PLANNED_EXERCISE_NOT_FOUND")
-    return PlannedExerciseDetail(
-        plan_id=row[0],
-        day_index=row[1],
-        sequence=row[2],
-        exercise_id=row[3],
-        session_type=row[4],
-        target_sets=row[5],
-        target_reps_min=row[6],
-        target_reps_max=row[7],
-        starting_weight=float(row[8]) if row[8] is not None else None,
-        is_initial_load=bool(row[9]),
-        movement_pattern=row[10],
-        category=row[11],
-        equipment_id=row[12],
-        primary_muscle=row[13],
+    return _swap_slot_from_row(row)
+
+
+def fetch_swap_slots(
+    db: DbConnection, plan_id: int, slots: Iterable[tuple[int, int]]
+) -> dict[tuple[int, int], SwapSlot]:
+    """fetch_swap_slot for many (day_index, sequence) slots of one plan in a
+    single statement. Every slot must exist."""
+    unique_slots = list(dict.fromkeys(slots))
+    if not unique_slots:
+        return {}
+    values = ",".join("(?, ?)" for _ in unique_slots)
+    cursor = db.execute(
+        f"""
+        {SWAP_SLOT_SELECT}
+        WHERE pe.plan_id = ?
+          AND (pe.day_index, pe.sequence) IN (VALUES {values})
+        """,
+        (plan_id, *(value for slot in unique_slots for value in slot)),
     )
+    found = {(row[0], row[2]): _swap_slot_from_row(row) for row in cursor.fetchall()}
+    if len(found) != len(unique_slots):
+        raise ValueError("PLANNED_EXERCISE_NOT_FOUND")
+    return found
 
 
-def fetch_latest_performance(
-    db: DbConnection, user_id: int, exercise_id: int
-) -> float | None:
+def fetch_latest_generated_plan_ids(
+    db: DbConnection, questionnaire_ids: Iterable[int]
+) -> dict[int, int]:
+    """Map each questionnaire id to the newest plan generated from it."""
+    unique_ids = list(dict.fromkeys(questionnaire_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
     cursor = db.execute(
-        """
-        SELECT sl.weight
-        FROM set_logs sl
-        JOIN workout_sessions ws ON ws.id = sl.session_id
-        WHERE ws.user_id = ?
-          AND sl.exercise_id = ?
-          AND ws.completion_status != 'skipped'
-          AND sl.weight IS NOT NULL
-        ORDER BY ws.performed_at DESC, sl.set_number ASC
-        LIMIT 1
+        f"""
+        SELECT generated_from_questionnaire_id, MAX(id)
+        FROM plans
+        WHERE generated_from_questionnaire_id IN ({placeholders})
+        GROUP BY generated_from_questionnaire_id
         """,
-        (user_id, exercise_id),
+        tuple(unique_ids),
     )
-    row = cursor.fetchone()
-    if row is None:
-        return None
-    return float(row[0]) if row[0] is not None else None
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def fetch_planned_exercises(
+    db: DbConnection, plan_ids: Iterable[int]
+) -> dict[int, list[PlannedExerciseRow]]:
+    """Return each plan's planned exercises in (day_index, sequence) order."""
+    unique_ids = list(dict.fromkeys(plan_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        SELECT plan_id, {PLANNED_EXERCISE_COLUMNS}
+        FROM planned_exercises
+        WHERE plan_id IN ({placeholders})
+        ORDER BY plan_id, day_index, sequence
+        """,
+        tuple(unique_ids),
+    )
+    planned: dict[int, list[PlannedExerciseRow]] = {plan_id: [] for plan_id in unique_ids}
+    for row in cursor.fetchall():
+        planned[row[0]].append(_planned_exercise_from_row(row[1:]))
+    return planned
+
+
+def fetch_latest_performances(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, float]:
+    """Return the most recent logged weight per exercise for a user.
+
+    The weight comes from the latest non-skipped session, lowest set number
+    with a weight; all ids resolve in one statement. Exercises the user has
+    never loaded are omitted.
+    """
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        WITH ranked AS (
+            SELECT sl.exercise_id,
+                   sl.weight,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY sl.exercise_id
+                       ORDER BY ws.performed_at DESC, sl.set_number ASC
+                   ) AS weight_rank
+            FROM set_logs sl
+            JOIN workout_sessions ws ON ws.id = sl.session_id
+            WHERE ws.user_id = ?
+              AND sl.exercise_id IN ({placeholders})
+              AND ws.completion_status != 'skipped'
+              AND sl.weight IS NOT NULL
+        )
+        SELECT exercise_id, weight
+        FROM ranked
+        WHERE weight_rank = 1
+        """,
+        (user_id, *unique_ids),
+    )
+    return {row[0]: float(row[1]) for row in cursor.fetchall()}
 
 
 def fetch_user_smallest_increment(db: DbConnection, user_id: int) -> float:
@@ -219,86 +317,72 @@ def fetch_user_smallest_increment(db: DbConnection, user_id: int) -> float:
     return float(row[0])
 
 
-def create_workout_plan(
-    db_path: str,
-    user_id: int,
-    name: str,
-    start_date: date,
-    weeks: int,
-    questionnaire_id: int,
-    planned_exercises: Iterable[PlannedExerciseRow],
-) -> int:
-    db = get_db_connection(db_path)
-    try:
-        with db:
-            cursor = db.execute(
-                """
-                INSERT INTO plans
-                    (user_id, name, start_date, weeks, generated_from_questionnaire_id)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    user_id,
-                    name,
-                    start_date.isoformat(),
-                    weeks,
-                    questionnaire_id,
-                ),
-            )
-            plan_id = int(cursor.lastrowid)
-            unique_days = sorted({exercise.day_index for exercise in planned_exercises})
-            db.executemany(
-                """
-                INSERT INTO plan_workouts
-                    (plan_id, day_index, template_id)
-                VALUES (?, ?, NULL)
-                """,
-                [
-                    (
-                        plan_id,
-                        day_index,
-                    )
-                    for day_index in unique_days
-                ],
+def insert_workout_plan(db: DbConnection, plan: WorkoutPlanRow) -> int:
+    """Insert a plan with its workouts and planned exercises. The caller owns
+    the transaction, so the plan can commit together with its snapshot."""
+    cursor = db.execute(
+        """
+        INSERT INTO plans
+            (user_id, name, start_date, weeks, generated_from_questionnaire_id)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (
+            plan.user_id,
+            plan.name,
+            plan.start_date.isoformat(),
+            plan.weeks,
+            plan.questionnaire_id,
+        ),
+    )
+    plan_id = int(cursor.lastrowid)
+    unique_days = sorted({exercise.day_index for exercise in plan.planned_exercises})
+    db.executemany(
+        """
+        INSERT INTO plan_workouts
+            (plan_id, day_index, template_id)
+        VALUES (?, ?, NULL)
+        """,
+        [
+            (
+                plan_id,
+                day_index,
             )
-            db.executemany(
-                """
-                INSERT INTO planned_exercises
-                    (plan_id, day_index, session_type, sequence, exercise_id,
-                     target_sets, target_reps_min, target_reps_max, starting_weight, is_initial_load)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        plan_id,
-                        exercise.day_index,
-                        exercise.session_type,
-                        exercise.sequence,
-                        exercise.exercise_id,
-                        exercise.target_sets,
-                        exercise.target_reps_min,
-                        exercise.target_reps_max,
-                        exercise.starting_weight,
-                        1 if exercise.is_initial_load else 0,
-                    )
-                    for exercise in planned_exercises
-                ],
+            for day_index in unique_days
+        ],
+    )
+    db.executemany(
+        """
+        INSERT INTO planned_exercises
+            (plan_id, day_index, session_type, sequence, exercise_id,
+             target_sets, target_reps_min, target_reps_max, starting_weight, is_initial_load)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                plan_id,
+                exercise.day_index,
+                exercise.session_type,
+                exercise.sequence,
+                exercise.exercise_id,
+                exercise.target_sets,
+                exercise.target_reps_min,
+                exercise.target_reps_max,
+                exercise.starting_weight,
+                1 if exercise.is_initial_load else 0,
             )
-    finally:
-        db.close()
+            for exercise in plan.planned_exercises
+        ],
+    )
     return plan_id
 
 
-def update_planned_exercise(
-    db: DbConnection,
-    plan_id: int,
-    day_index: int,
-    sequence: int,
-    exercise_id: int,
-    starting_weight: float | None,
-    is_initial_load: bool,
+def apply_planned_exercise_swaps(
+    db: DbConnection, plan_id: int, swaps: Iterable[PlannedExerciseSwapRow]
 ) -> None:
-    db.execute(
+    """Point each slot at its new exercise and log the swap, as two
+    executemany calls. The caller owns the transaction."""
+    swaps = list(swaps)
+    db.executemany(
         """
         UPDATE planned_exercises
         SET exercise_id = ?,
@@ -308,30 +392,32 @@ def update_planned_exercise(
           AND day_index = ?
           AND sequence = ?
         """,
-        (
-            exercise_id,
-            starting_weight,
-            1 if is_initial_load else 0,
-            plan_id,
-            day_index,
-            sequence,
-        ),
+        [
+            (
+                swap.new_exercise_id,
+                swap.starting_weight,
+                1 if swap.is_initial_load else 0,
+                plan_id,
+                swap.day_index,
+                swap.sequence,
+            )
+            for swap in swaps
+        ],
     )
-
-
-def insert_planned_exercise_swap(
-    db: DbConnection,
-    plan_id: int,
-    day_index: int,
-    sequence: int,
-    previous_exercise_id: int,
-    new_exercise_id: int,
-) -> None:
-    db.execute(
+    db.executemany(
         """
         INSERT INTO planned_exercise_swaps
             (plan_id, day_index, sequence, previous_exercise_id, new_exercise_id)
         VALUES (?, ?, ?, ?, ?)
         """,
-        (plan_id, day_index, sequence, previous_exercise_id, new_exercise_id),
+        [
+            (
+                plan_id,
+                swap.day_index,
+                swap.sequence,
+                swap.previous_exercise_id,
+                swap.new_exercise_id,
+            )
+            for swap in swaps
+        ],
     )
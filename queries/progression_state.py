@@ -0,0 +1,198 @@
+from dataclasses import dataclass, fields
+from typing import Iterable
+
+from db.connection import DbConnection
+
+
+@dataclass(frozen=True)
+class ProgressionStateRow:
+    user_id: int
+    exercise_id: int
+    last_session_id: int
+    last_weight: float | None
+    all_sets_completed: bool
+    min_reps: int
+    first_set_reps: int
+    last_set_reps: int
+    eligible: bool
+    increase_achieved: bool
+    missed_minimum: bool
+    manual_audit_flag: bool
+    consecutive_misses: int
+    has_prior_session: bool
+    baseline_established: bool
+    best_session_id: int | None
+    best_set_number: int | None
+    best_weight: float | None
+    best_reps: int | None
+    best_rpe: float | None
+
+
+STATE_COLUMNS = tuple(field.name for field in fields(ProgressionStateRow))
+BOOLEAN_COLUMNS = {
+    "all_sets_completed",
+    "eligible",
+    "increase_achieved",
+    "missed_minimum",
+    "manual_audit_flag",
+    "has_prior_session",
+    "baseline_established",
+}
+FLOAT_COLUMNS = {"last_weight", "best_weight", "best_rpe"}
+
+
+def _row_from_tuple(row: tuple) -> ProgressionStateRow:
+    values = {}
+    for column, value in zip(STATE_COLUMNS, row):
+        if column in BOOLEAN_COLUMNS:
+            value = bool(value)
+        elif column in FLOAT_COLUMNS and value is not None:
+            value = float(value)
+        values[column] = value
+    return ProgressionStateRow(**values)
+
+
+def _row_to_tuple(row: ProgressionStateRow) -> tuple:
+    values = []
+    for column in STATE_COLUMNS:
+        value = getattr(row, column)
+        if column in BOOLEAN_COLUMNS:
+            value = 1 if value else 0
+        values.append(value)
+    return tuple(values)
+
+
+def fetch_progression_states(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, ProgressionStateRow]:
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        SELECT {", ".join(STATE_COLUMNS)}
+        FROM exercise_progression_state
+        WHERE user_id = ? AND exercise_id IN ({placeholders})
+        """,
+        (user_id, *unique_ids),
+    )
+    return {row[1]: _row_from_tuple(row) for row in cursor.fetchall()}
+
+
+def fetch_user_progression_states(db: DbConnection, user_id: int) -> dict[int, ProgressionStateRow]:
+    cursor = db.execute(
+        f"""
+        SELECT {", ".join(STATE_COLUMNS)}
+        FROM exercise_progression_state
+        WHERE user_id = ?
+        """,
+        (user_id,),
+    )
+    return {row[1]: _row_from_tuple(row) for row in cursor.fetchall()}
+
+
+def fetch_logged_exercise_ids(db: DbConnection, user_id: int) -> list[int]:
+    cursor = db.execute(
+        """
+        SELECT DISTINCT sl.exercise_id
+        FROM workout_sessions ws
+        JOIN set_logs sl ON sl.session_id = ws.id
+        WHERE ws.user_id = ?
+        ORDER BY sl.exercise_id
+        """,
+        (user_id,),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def fetch_best_sets_for_exercises(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> dict[int, tuple]:
+    """Return each exercise's best set as (session_id, set_number, weight, reps, rpe).
+
+    Uses the same ordering as the history screen's best sets.
+    """
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return {}
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        WITH ranked AS (
+            SELECT sl.exercise_id,
+                   sl.session_id,
+                   sl.set_number,
+                   sl.weight,
+                   sl.reps,
+                   sl.rpe,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY sl.exercise_id
+                       ORDER BY sl.weight DESC, sl.reps DESC, sl.rpe DESC
+                   ) AS best_rank
+            FROM set_logs sl
+            JOIN workout_sessions ws ON ws.id = sl.session_id
+            WHERE ws.user_id = ? AND sl.exercise_id IN ({placeholders})
+        )
+        SELECT exercise_id, session_id, set_number, weight, reps, rpe
+        FROM ranked
+        WHERE best_rank = 1
+        """,
+        (user_id, *unique_ids),
+    )
+    return {
+        row[0]: (
+            row[1],
+            row[2],
+            float(row[3]) if row[3] is not None else None,
+            row[4],
+            float(row[5]) if row[5] is not None else None,
+        )
+        for row in cursor.fetchall()
+    }
+
+
+def fetch_baseline_exercise_ids(
+    db: DbConnection, user_id: int, exercise_ids: Iterable[int]
+) -> set[int]:
+    unique_ids = list(dict.fromkeys(exercise_ids))
+    if not unique_ids:
+        return set()
+    placeholders = ",".join("?" for _ in unique_ids)
+    cursor = db.execute(
+        f"""
+        SELECT DISTINCT sl.exercise_id
+        FROM set_logs sl
+        JOIN workout_sessions ws ON ws.id = sl.session_id
+        WHERE ws.user_id = ? AND sl.exercise_id IN ({placeholders}) AND sl.is_initial_load = 1
+        """,
+        (user_id, *unique_ids),
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upsert_progression_states(db: DbConnection, rows: Iterable[ProgressionStateRow]) -> None:
+    assignments = ", ".join(
+        f"{column} = excluded.{column}"
+        for column in STATE_COLUMNS
+        if column not in {"user_id", "exercise_id"}
+    )
+    db.executemany(
+        f"""
+        INSERT INTO exercise_progression_state ({", ".join(STATE_COLUMNS)})
+        VALUES ({", ".join("?" for _ in STATE_COLUMNS)})
+        ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+            {assignments},
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        [_row_to_tuple(row) for row in rows],
+    )
+
+
+def delete_progression_states(db: DbConnection, user_id: int) -> None:
+    db.execute("DELETE FROM exercise_progression_state WHERE user_id = ?", (user_id,))
+
+
+def fetch_user_ids_with_sessions(db: DbConnection) -> list[int]:
+    cursor = db.execute("SELECT DISTINCT user_id FROM workout_sessions ORDER BY user_id")
+    return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,254 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from db.connection import DbConnection
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_FETCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class SessionCursor:
+    performed_at: str
+    session_id: int
+
+
+@dataclass(frozen=True)
+class SessionPage:
+    sessions: list[dict[str, Any]]
+    next_cursor: str | None
+
+
+def encode_cursor(cursor: SessionCursor) -> str:
+    raw = json.dumps([cursor.performed_at, cursor.session_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> SessionCursor:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        performed_at, session_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("INVALID_CURSOR") from None
+    if not isinstance(performed_at, str) or not isinstance(session_id, int):
+        raise ValueError("INVALID_CURSOR")
+    return SessionCursor(performed_at=performed_at, session_id=session_id)
+
+
+def fetch_session_page(
+    db: DbConnection,
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: SessionCursor | None = None,
+    after: SessionCursor | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> SessionPage:
+    """Return one page of a user's sessions, newest first, with their set logs.
+
+    Pages are keyed on (performed_at, id): `before` continues towards older
+    sessions (pass the previous page's next_cursor), `after` returns the
+    sessions newer than a cursor. since/until bound performed_at as a
+    half-open range [since, until). next_cursor is None on the last page.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError("INVALID_LIMIT")
+    if before is not None and after is not None:
+        raise ValueError("CONFLICTING_CURSORS")
+
+    conditions = ["user_id = ?"]
+    parameters: list[Any] = [user_id]
+    if since is not None:
+        conditions.append("performed_at >= ?")
+        parameters.append(since)
+    if until is not None:
+        conditions.append("performed_at < ?")
+        parameters.append(until)
+    if before is not None:
+        conditions.append("(performed_at, id) < (?, ?)")
+        parameters.extend([before.performed_at, before.session_id])
+    if after is not None:
+        conditions.append("(performed_at, id) > (?, ?)")
+        parameters.extend([after.performed_at, after.session_id])
+    # Walking forward from an `after` cursor reads oldest-first so the page
+    # starts right next to the cursor; it is flipped back to newest-first below.
+    direction = "ASC" if after is not None else "DESC"
+    session_rows = db.execute(
+        f"""
+        SELECT id, performed_at, duration_minutes, notes, completion_status, manual_audit_flag
+        FROM workout_sessions
+        WHERE {" AND ".join(conditions)}
+        ORDER BY performed_at {direction}, id {direction}
+        LIMIT ?
+        """,
+        (*parameters, limit + 1),
+    ).fetchall()
+
+    has_more = len(session_rows) > limit
+    session_rows = session_rows[:limit]
+    if after is not None:
+        session_rows.reverse()
+        # Everything up to the cursor is still older than this page.
+        has_more = bool(session_rows)
+    set_logs = _fetch_set_logs_for_sessions(db, [row[0] for row in session_rows])
+
+    sessions = [
+        {
+            "id": row[0],
+            "performed_at": row[1],
+            "duration_minutes": row[2],
+            "notes": row[3],
+            "completion_status": row[4],
+            "manual_audit_flag": bool(row[5]),
+            "set_logs": set_logs.get(row[0], []),
+        }
+        for row in session_rows
+    ]
+    next_cursor = None
+    if has_more and session_rows:
+        oldest = session_rows[-1]
+        next_cursor = encode_cursor(SessionCursor(performed_at=oldest[1], session_id=oldest[0]))
+    return SessionPage(sessions=sessions, next_cursor=next_cursor)
+
+
+def _fetch_set_logs_for_sessions(
+    db: DbConnection, session_ids: list[int]
+) -> dict[int, list[dict[str, Any]]]:
+    set_logs: dict[int, list[dict[str, Any]]] = {session_id: [] for session_id in session_ids}
+    if not session_ids:
+        return set_logs
+    placeholders = ",".join("?" for _ in session_ids)
+    rows = db.execute(
+        f"""
+        SELECT sl.session_id,
+               sl.exercise_id,
+               ex.name,
+               sl.set_number,
+               sl.reps,
+               sl.weight,
+               sl.rpe,
+               sl.rest_seconds,
+               sl.is_initial_load
+        FROM set_logs sl
+        JOIN exercises ex ON ex.id = sl.exercise_id
+        WHERE sl.session_id IN ({placeholders})
+        ORDER BY sl.session_id DESC, sl.set_number ASC
+        """,
+        session_ids,
+    ).fetchall()
+    for row in rows:
+        set_logs[row[0]].append(
+            {
+                "exercise_id": row[1],
+                "exercise_name": row[2],
+                "set_number": row[3],
+                "reps": row[4],
+                "weight": row[5],
+                "rpe": row[6],
+                "rest_seconds": row[7],
+                "is_initial_load": bool(row[8]),
+            }
+        )
+    return set_logs
+
+
+def iter_session_history(
+    db: DbConnection,
+    user_id: int,
+    since: str | None = None,
+    until: str | None = None,
+    fetch_size: int = EXPORT_FETCH_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Yield a user's sessions oldest first, each with its set logs.
+
+    One query walks sessions and set logs together and rows are pulled from
+    the cursor fetch_size at a time, so at most one session is held in memory
+    however long the history is. Sessions use the create_session payload
+    shape so an export can be imported again.
+    """
+    conditions = ["ws.user_id = ?"]
+    parameters: list[Any] = [user_id]
+    if since is not None:
+        conditions.append("ws.performed_at >= ?")
+        parameters.append(since)
+    if until is not None:
+        conditions.append("ws.performed_at < ?")
+        parameters.append(until)
+    cursor = db.execute(
+        f"""
+        SELECT ws.id,
+               ws.performed_at,
+               ws.duration_minutes,
+               ws.notes,
+               ws.completion_status,
+               ws.manual_audit_flag,
+               ws.template_id,
+               wsp.plan_id,
+               wsp.day_index,
+               sl.exercise_id,
+               ex.name,
+               sl.set_number,
+               sl.reps,
+               sl.weight,
+               sl.rpe,
+               sl.rest_seconds,
+               sl.is_initial_load
+        FROM workout_sessions ws
+        -- The session's lowest plan link, found by primary key once per
+        -- session rather than once per set row.
+        LEFT JOIN workout_session_plans wsp
+          ON wsp.session_id = ws.id
+         AND wsp.plan_id = (
+             SELECT MIN(plan_id) FROM workout_session_plans WHERE session_id = ws.id
+         )
+        LEFT JOIN set_logs sl ON sl.session_id = ws.id
+        LEFT JOIN exercises ex ON ex.id = sl.exercise_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY ws.performed_at, ws.id, sl.exercise_id, sl.set_number
+        """,
+        parameters,
+    )
+    session: dict[str, Any] | None = None
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                if session is None or session["id"] != row[0]:
+                    if session is not None:
+                        yield session
+                    session = {
+                        "id": row[0],
+                        "user_id": user_id,
+                        "performed_at": row[1],
+                        "duration_minutes": row[2],
+                        "notes": row[3],
+                        "completion_status": row[4],
+                        "manual_audit_flag": bool(row[5]),
+                        "template_id": row[6],
+                        "plan_id": row[7],
+                        "day_index": row[8],
+                        "set_logs": [],
+                    }
+                if row[9] is not None:
+                    session["set_logs"].append(
+                        {
+                            "exercise_id": row[9],
+                            "exercise_name": row[10],
+                            "set_number": row[11],
+                            "reps": row[12],
+                            "weight": row[13],
+                            "rpe": row[14],
+                            "rest_seconds": row[15],
+                            "is_initial_load": bool(row[16]),
+                        }
+                    )
+        if session is not None:
+            yield session
+    finally:
+        cursor.close()
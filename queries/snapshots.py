@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Any
+
+from db.connection import DbConnection
+
+
+@dataclass(frozen=True)
+class PlanSnapshotRow:
+    data_version: int
+    catalog_version: str
+    # None when there is no snapshot for the current versions.
+    payload: bytes | None
+
+
+def fetch_plan_summary(db: DbConnection, plan_id: int) -> dict[str, Any]:
+    """The plan-level fields of GET /plans/<id> (everything but workouts)."""
+    row = db.execute(
+        """
+        SELECT p.id,
+               p.name,
+               p.start_date,
+               p.weeks,
+               q.goals,
+               q.experience_level,
+               q.schedule_days,
+               q.training_days_of_week
+        FROM plans p
+        JOIN questionnaire_responses q
+          ON q.id = p.generated_from_questionnaire_id
+        WHERE p.id = ?
+        """,
+        (plan_id,),
+    ).fetchone()
+    if row is None:
+        raise ValueError("PLAN_NOT_FOUND")
+    return {
+        "id": row[0],
+        "name": row[1],
+        "start_date": row[2],
+        "weeks": row[3],
+        "goals": row[4],
+        "experience_level": row[5],
+        "schedule_days": row[6],
+        "training_days_of_week": row[7],
+    }
+
+
+def fetch_plan_snapshot(db: DbConnection, plan_id: int) -> PlanSnapshotRow | None:
+    """Return the plan's versions and, if it is current, its snapshot; None
+    if there is no such plan. One primary-key lookup either way."""
+    row = db.execute(
+        """
+        SELECT p.data_version, c.version, s.payload
+        FROM plans p
+        JOIN catalog_version c ON c.id = 1
+        LEFT JOIN plan_snapshots s
+          ON s.plan_id = p.id
+         AND s.data_version = p.data_version
+         AND s.catalog_version = c.version
+        WHERE p.id = ?
+        """,
+        (plan_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    return PlanSnapshotRow(data_version=row[0], catalog_version=row[1], payload=row[2])
+
+
+def fetch_stale_plan_ids(db: DbConnection) -> list[int]:
+    """Plans with no snapshot for their current data and catalog versions."""
+    cursor = db.execute(
+        """
+        SELECT p.id
+        FROM plans p
+        JOIN catalog_version c ON c.id = 1
+        LEFT JOIN plan_snapshots s
+          ON s.plan_id = p.id
+         AND s.data_version = p.data_version
+         AND s.catalog_version = c.version
+        WHERE s.plan_id IS NULL
+        ORDER BY p.id
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def upsert_plan_snapshot(
+    db: DbConnection, plan_id: int, catalog_version: str, payload: bytes
+) -> None:
+    """Store payload as the plan's snapshot at its current data_version."""
+    db.execute(
+        """
+        INSERT OR REPLACE INTO plan_snapshots
+            (plan_id, data_version, catalog_version, payload)
+        SELECT id, data_version, ?, ?
+        FROM plans
+        WHERE id = ?
+        """,
+        (catalog_version, payload, plan_id),
+    )
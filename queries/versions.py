@@ -0,0 +1,28 @@
+from typing import Iterable
+
+from db.connection import DbConnection
+
+
+def fetch_user_data_version(db: DbConnection, user_id: int) -> tuple[int, str] | None:
+    """Return (user data_version, catalog version), or None if there is no such user."""
+    row = db.execute(
+        """
+        SELECT u.data_version, c.version
+        FROM users u, catalog_version c
+        WHERE u.id = ?
+          AND c.id = 1
+        """,
+        (user_id,),
+    ).fetchone()
+    return (row[0], row[1]) if row is not None else None
+
+
+def bump_plan_data_version(db: DbConnection, plan_id: int) -> None:
+    db.execute("UPDATE plans SET data_version = data_version + 1 WHERE id = ?", (plan_id,))
+
+
+def bump_user_data_versions(db: DbConnection, user_ids: Iterable[int]) -> None:
+    db.executemany(
+        "UPDATE users SET data_version = data_version + 1 WHERE id = ?",
+        [(user_id,) for user_id in sorted(set(user_ids))],
+    )
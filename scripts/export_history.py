@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import sys
+
+from api.export import EXPORT_FORMATS, export_history
+from db.connection import get_db_connection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream one user's training history as NDJSON or CSV."
+    )
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=pathlib.Path("local.db"),
+        help="Path to the SQLite database file.",
+    )
+    parser.add_argument("--user-id", type=int, default=1, help="User to export.")
+    parser.add_argument(
+        "--format",
+        choices=sorted(EXPORT_FORMATS),
+        default="ndjson",
+        help="ndjson writes one session per line; csv writes one set per row.",
+    )
+    parser.add_argument("--since", type=str, default=None, help="Earliest performed_at (inclusive).")
+    parser.add_argument("--until", type=str, default=None, help="Latest performed_at (exclusive).")
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=None,
+        help="File to write (default: stdout).",
+    )
+    args = parser.parse_args()
+
+    connection = get_db_connection(args.db, read_only=True)
+    output = (
+        args.output.open("w", encoding="utf-8", newline="")
+        if args.output is not None
+        else sys.stdout
+    )
+    try:
+        for chunk in export_history(
+            connection, args.user_id, export_format=args.format, since=args.since, until=args.until
+        ):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
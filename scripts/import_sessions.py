@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import pathlib
+import sys
+from typing import Any, Iterable
+
+from api.workouts import IMPORT_CHUNK_SIZE, import_sessions, iter_ndjson_payloads
+from db.connection import DEFAULT_PROFILE, get_db_connection
+
+
+def _with_user_id(payloads: Iterable[Any], user_id: int) -> Iterable[Any]:
+    for payload in payloads:
+        if isinstance(payload, dict):
+            # Plans belong to the original user, so links to them are dropped.
+            payload = {**payload, "user_id": user_id, "plan_id": None, "day_index": None}
+        yield payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk import workout sessions from NDJSON or a JSON list."
+    )
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=pathlib.Path("local.db"),
+        help="Path to the SQLite database file.",
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default="-",
+        help="NDJSON (one session per line) or .json list file; '-' reads NDJSON from stdin.",
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        default=None,
+        help="Assign every imported session to this user instead of the user_id in each record.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=IMPORT_CHUNK_SIZE,
+        help="Sessions inserted per transaction.",
+    )
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    connection = get_db_connection(args.db, profile=DEFAULT_PROFILE)
+    try:
+        if args.input.endswith(".json"):
+            payloads: Iterable[Any] = json.load(source)
+        else:
+            payloads = iter_ndjson_payloads(source)
+        if args.user_id is not None:
+            payloads = _with_user_id(payloads, args.user_id)
+        result = import_sessions(connection, payloads, chunk_size=args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        connection.close()
+
+    for error in result.errors:
+        print(f"record {error.index}: {error.error}", file=sys.stderr)
+    print(f"imported {result.imported} sessions, {len(result.errors)} errors")
+    if result.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,14 @@ import argparse
 import pathlib
 import sqlite3
 
-from data.exercises.seed_exercises import parse_exercise_rows, seed_sqlite
-
-
-def apply_schema(db_path: pathlib.Path, schema_path: pathlib.Path) -> None:
-    schema_sql = schema_path.read_text(encoding="utf-8")
-    connection = sqlite3.connect(db_path)
-    try:
-        connection.executescript(schema_sql)
-        connection.commit()
-    finally:
-        connection.close()
+from data.exercises.seed_exercises import (
+    parse_exercise_rows,
+    seed_sqlite,
+    update_exercise_alternatives,
+)
+from db.connection import get_db_connection
+from db.migrations import SCHEMA_DIR, apply_migrations
+from domain.plans.snapshots import refresh_plan_snapshots
 
 
 def ensure_default_user(db_path: pathlib.Path, email: str, smallest_increment: float) -> None:
@@ -39,10 +36,10 @@ def main() -> None:
         help="Path to the SQLite database file.",
     )
     parser.add_argument(
-        "--schema",
+        "--schema-dir",
         type=pathlib.Path,
-        default=pathlib.Path("db/schema/001_create_core_tables.sql"),
-        help="Path to the schema SQL file.",
+        default=SCHEMA_DIR,
+        help="Directory of numbered NNN_name.sql migration files.",
     )
     parser.add_argument(
         "--library",
@@ -62,16 +59,38 @@ def main() -> None:
         default=2.5,
         help="Default smallest increment for the user.",
     )
+    parser.add_argument(
+        "--update-alternatives",
+        action="store_true",
+        help=(
+            "Backfill the Alternatives column by exercise name instead of reseeding; "
+            "for databases that already have plans or sessions."
+        ),
+    )
     args = parser.parse_args()
 
-    apply_schema(args.db, args.schema)
+    for name in apply_migrations(args.db, args.schema_dir):
+        print(f"applied {name}")
 
     lines = args.library.read_text(encoding="utf-8").splitlines()
     rows = parse_exercise_rows(lines)
-    seed_sqlite(args.db, rows, batch_size=50)
+    if args.update_alternatives:
+        updated = update_exercise_alternatives(args.db, rows)
+        print(f"updated alternatives for {updated} exercises")
+    else:
+        seed_sqlite(args.db, rows, batch_size=50)
 
     ensure_default_user(args.db, args.email, args.smallest_increment)
 
+    # Seeding bumps the catalog stamp, which leaves stored plan bodies stale.
+    connection = get_db_connection(args.db)
+    try:
+        refreshed = refresh_plan_snapshots(connection)
+    finally:
+        connection.close()
+    if refreshed:
+        print(f"refreshed {refreshed} plan snapshots")
+
 
 if __name__ == "__main__":
     main()
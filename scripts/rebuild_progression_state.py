@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import sys
+
+from db.connection import get_db_connection
+from domain.progression.state import check_progression_state, rebuild_progression_state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild or verify the materialized exercise_progression_state table."
+    )
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=pathlib.Path("local.db"),
+        help="Path to the SQLite database file.",
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        default=None,
+        help="Only process this user (default: every user with sessions).",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Compare stored state with history instead of rebuilding; exit 1 on mismatch.",
+    )
+    args = parser.parse_args()
+
+    connection = get_db_connection(args.db)
+    try:
+        if args.check:
+            mismatches = check_progression_state(connection, args.user_id)
+            for mismatch in mismatches:
+                print(
+                    f"user {mismatch.user_id} exercise {mismatch.exercise_id} "
+                    f"{mismatch.column}: stored={mismatch.stored!r} expected={mismatch.expected!r}"
+                )
+            print(f"{len(mismatches)} mismatches")
+            if mismatches:
+                sys.exit(1)
+        else:
+            written = rebuild_progression_state(connection, args.user_id)
+            print(f"rebuilt {written} progression state rows")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import argparse
+import pathlib
+import sys
+from datetime import date
+
+from domain.plans.batch import (
+    REGENERATE_CHUNK_SIZE,
+    WRITE_BATCH_SIZE,
+    BatchProgress,
+    RegeneratedPlan,
+    regenerate_all_plans,
+)
+
+
+def _print_result(result: RegeneratedPlan, show_unchanged: bool) -> None:
+    if result.error is not None:
+        print(f"questionnaire {result.questionnaire_id}: error {result.error}", file=sys.stderr)
+        return
+    if result.existing_plan_id is None:
+        print(
+            f"questionnaire {result.questionnaire_id}: no existing plan, "
+            f"{len(result.planned_exercises)} planned exercises"
+        )
+        return
+    if not result.changes:
+        if show_unchanged:
+            print(f"questionnaire {result.questionnaire_id} (plan {result.existing_plan_id}): unchanged")
+        return
+    print(
+        f"questionnaire {result.questionnaire_id} (plan {result.existing_plan_id}): "
+        f"{len(result.changes)} changes"
+    )
+    for change in result.changes:
+        print(
+            f"  day {change.day_index} seq {change.sequence} {change.field}: "
+            f"{change.existing!r} -> {change.proposed!r}"
+        )
+
+
+def _print_progress(progress: BatchProgress) -> None:
+    print(
+        f"\r{progress.processed}/{progress.total} questionnaires, "
+        f"{progress.changed} changed, {progress.failed} failed, "
+        f"{progress.written} written, {progress.rate:.1f}/s",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Regenerate plans for every questionnaire, or report what would change."
+    )
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=pathlib.Path("local.db"),
+        help="Path to the SQLite database file.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print diffs against each questionnaire's newest plan without writing.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count; 1 runs in-process).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=REGENERATE_CHUNK_SIZE,
+        help="Questionnaires handed to a worker at a time.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=WRITE_BATCH_SIZE,
+        help="Plans inserted per transaction.",
+    )
+    parser.add_argument("--start-date", type=str, default=None, help="Start date for new plans.")
+    parser.add_argument("--weeks", type=int, default=4, help="Length of new plans in weeks.")
+    parser.add_argument("--name", type=str, default="Generated Plan", help="Name for new plans.")
+    parser.add_argument(
+        "--show-unchanged",
+        action="store_true",
+        help="Also list questionnaires whose plan would not change.",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Suppress progress output.")
+    args = parser.parse_args()
+    if args.weeks <= 0:
+        raise SystemExit("--weeks must be positive")
+
+    progress = regenerate_all_plans(
+        args.db,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        write_batch_size=args.batch_size,
+        start_date=date.fromisoformat(args.start_date) if args.start_date else None,
+        weeks=args.weeks,
+        name=args.name,
+        on_result=lambda result: _print_result(result, args.show_unchanged),
+        on_progress=None if args.quiet else _print_progress,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    action = "would write" if args.dry_run else "wrote"
+    print(
+        f"{progress.processed} questionnaires in {progress.elapsed_seconds:.1f}s "
+        f"({progress.rate:.1f}/s): {progress.changed} changed, {progress.failed} failed, "
+        f"{action} {progress.changed if args.dry_run else progress.written} plans"
+    )
+    if progress.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
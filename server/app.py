@@ -3,29 +3,102 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
 import pathlib
-import sqlite3
 import time
-from dataclasses import asdict
-from typing import Any
-
-from flask import Flask, jsonify, redirect, request, send_from_directory
-
-from api.plans import generate_plan, get_swap_options, swap_plan_exercise
+from dataclasses import asdict, replace
+from typing import Any, Iterator
+
+from flask import (
+    Flask,
+    Response,
+    current_app,
+    g,
+    jsonify,
+    redirect,
+    request,
+    send_from_directory,
+)
+
+from api.export import EXPORT_FORMATS, export_history
+from api.plans import (
+    generate_plan,
+    get_swap_options,
+    swap_plan_exercise,
+    swap_plan_exercises,
+)
 from api.questionnaire import create_questionnaire
-from api.workouts import create_session
-from domain.progression.engine import recommend_next_load
-from queries.exercise_history import fetch_exercise_history
+from api.workouts import create_session, import_sessions, iter_ndjson_payloads
+from db.connection import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PROFILE,
+    READ_ONLY_METHODS,
+    ConnectionProfile,
+    DbConnection,
+    InstrumentedConnection,
+    ReadWritePool,
+)
+from db.tracing import SqlTracer
+from domain.plans.generator import plan_skeleton_cache_stats
+from domain.progression.engine import recommend_next_load, recommend_next_loads
+from domain.workouts.history import exercise_history_cache_stats
+from queries.sessions import DEFAULT_PAGE_SIZE, decode_cursor, fetch_session_page
+from server.metrics import Sample, init_request_metrics
+from server.responses import init_compression, init_json_encoder
+from server.payloads import (
+    CACHE_CONTROL,
+    batch_recommendation_payload,
+    ensure_session_plan_table,
+    etag_matches,
+    fetch_exercise_history_body,
+    fetch_last_completed_day_index,
+    fetch_plan_body,
+    parse_id_list,
+    recommendation_payload,
+    user_etag,
+)
 
 
 BASE_DIR = pathlib.Path(__file__).resolve().parents[1]
 UI_DIR = BASE_DIR / "ui"
+MAX_BATCH_EXERCISE_IDS = 50
 
 
-def create_app(db_path: pathlib.Path) -> Flask:
+def create_app(
+    db_path: pathlib.Path,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    profile: ConnectionProfile = DEFAULT_PROFILE,
+    instrument_sql: bool = True,
+    sql_tracer: SqlTracer | None = None,
+    json_encoder: str | None = None,
+) -> Flask:
     app = Flask(__name__)
     app.config["DB_PATH"] = str(db_path)
     ensure_session_plan_table(db_path)
+    app.extensions["db_pool"] = ReadWritePool(
+        db_path,
+        readers=pool_size,
+        profile=profile,
+        instrumented=instrument_sql,
+        tracer=sql_tracer,
+    )
+    init_json_encoder(app, json_encoder)
+    metrics = init_request_metrics(app)
+    # after_request hooks run in reverse order of registration, so this
+    # compresses before the metrics hook reads the response size.
+    init_compression(app)
+    metrics.add_collector(lambda: _pool_samples(app.extensions["db_pool"]))
+    metrics.add_collector(_plan_cache_samples)
+    metrics.add_collector(_history_cache_samples)
+    if sql_tracer is not None:
+        metrics.add_collector(lambda: _statement_samples(sql_tracer))
+
+    @app.teardown_appcontext
+    def release_db(_exc: BaseException | None) -> None:
+        db = g.pop("db", None)
+        pool = g.pop("db_pool", None)
+        if db is not None and pool is not None:
+            pool.release(db)
 
     @app.get("/")
     def index() -> Any:
@@ -42,11 +115,10 @@ def create_app(db_path: pathlib.Path) -> Flask:
     @app.post("/questionnaire")
     def questionnaire() -> Any:
         payload = request.get_json(silent=True) or {}
-        db_path_local = app.config["DB_PATH"]
         try:
-            questionnaire_id = create_questionnaire(db_path_local, payload)
+            questionnaire_id = create_questionnaire(_request_db(), payload)
             plan_id = generate_plan(
-                db_path_local, {"questionnaire_id": questionnaire_id}
+                _request_db(), {"questionnaire_id": questionnaire_id}
             )
         except Exception as exc:
             return _error(str(exc), 400)
@@ -55,41 +127,41 @@ def create_app(db_path: pathlib.Path) -> Flask:
     @app.post("/plans/generate")
     def plans_generate() -> Any:
         payload = request.get_json(silent=True) or {}
-        db_path_local = app.config["DB_PATH"]
         try:
-            plan_id = generate_plan(db_path_local, payload)
+            plan_id = generate_plan(_request_db(), payload)
         except Exception as exc:
             return _error(str(exc), 400)
         return jsonify({"plan_id": plan_id})
 
     @app.get("/plans/<int:plan_id>")
     def plans_get(plan_id: int) -> Any:
-        db_path_local = app.config["DB_PATH"]
         try:
-            plan = _fetch_plan_payload(db_path_local, plan_id)
+            etag, body = fetch_plan_body(
+                _request_db(), plan_id, request.headers.get("If-None-Match")
+            )
         except Exception as exc:
             return _error(str(exc), 404)
-        return jsonify(plan)
+        if body is None:
+            return _not_modified(etag)
+        return _cacheable(Response(body, mimetype="application/json"), etag)
 
     @app.get("/plans/<int:plan_id>/last-completed")
     def plans_last_completed(plan_id: int) -> Any:
-        db_path_local = app.config["DB_PATH"]
         user_id = request.args.get("user_id", type=int, default=1)
         try:
-            result = _fetch_last_completed_day_index(db_path_local, plan_id, user_id)
+            result = fetch_last_completed_day_index(_request_db(), plan_id, user_id)
         except Exception as exc:
             return _error(str(exc), 400)
         return jsonify(result)
 
     @app.get("/plans/<int:plan_id>/swap-options")
     def plans_swap_options(plan_id: int) -> Any:
-        db_path_local = app.config["DB_PATH"]
         day_index = request.args.get("day_index", type=int)
         sequence = request.args.get("sequence", type=int)
         if day_index is None or sequence is None:
             return _error("day_index and sequence are required", 400)
         try:
-            options = get_swap_options(db_path_local, plan_id, day_index, sequence)
+            options = get_swap_options(_request_db(), plan_id, day_index, sequence)
         except Exception as exc:
             return _error(str(exc), 400)
         return jsonify(options)
@@ -98,20 +170,28 @@ def create_app(db_path: pathlib.Path) -> Flask:
     def plans_swap(plan_id: int) -> Any:
         payload = request.get_json(silent=True) or {}
         payload["plan_id"] = plan_id
-        db_path_local = app.config["DB_PATH"]
         try:
-            swap_plan_exercise(db_path_local, payload)
+            swap_plan_exercise(_request_db(), payload)
         except Exception as exc:
             return _error(str(exc), 400)
         return jsonify({"status": "ok"})
 
+    @app.patch("/plans/<int:plan_id>/swaps")
+    def plans_swap_many(plan_id: int) -> Any:
+        payload = request.get_json(silent=True) or {}
+        payload["plan_id"] = plan_id
+        try:
+            swapped = swap_plan_exercises(_request_db(), payload)
+        except Exception as exc:
+            return _error(str(exc), 400)
+        return jsonify({"status": "ok", "swapped": swapped})
+
     @app.post("/workouts/sessions")
     def workouts_start_session() -> Any:
         payload = request.get_json(silent=True) or {}
         if payload.get("set_logs"):
-            db_path_local = app.config["DB_PATH"]
             try:
-                session_id = create_session(db_path_local, payload)
+                session_id = create_session(_request_db(), payload)
             except Exception as exc:
                 return _error(str(exc), 400)
             return jsonify({"session_id": session_id})
@@ -121,255 +201,231 @@ def create_app(db_path: pathlib.Path) -> Flask:
     @app.post("/workouts")
     def workouts_save_session() -> Any:
         payload = request.get_json(silent=True) or {}
-        db_path_local = app.config["DB_PATH"]
         try:
-            session_id = create_session(db_path_local, payload)
+            session_id = create_session(_request_db(), payload)
         except Exception as exc:
             return _error(str(exc), 400)
         return jsonify({"session_id": session_id})
 
+    @app.post("/workouts/import")
+    def workouts_import() -> Any:
+        if request.mimetype == "application/x-ndjson":
+            payloads = iter_ndjson_payloads(request.stream)
+        else:
+            body = request.get_json(silent=True)
+            if isinstance(body, dict):
+                body = body.get("sessions")
+            if not isinstance(body, list):
+                return _error("expected a JSON list of sessions or an NDJSON body", 400)
+            payloads = body
+        try:
+            result = import_sessions(_request_db(), payloads)
+        except Exception as exc:
+            return _error(str(exc), 400)
+        return jsonify(
+            {
+                "imported": result.imported,
+                "session_ids": result.session_ids,
+                "errors": [asdict(error) for error in result.errors],
+            }
+        )
+
     @app.get("/workouts/sessions")
     def workouts_list_sessions() -> Any:
-        db_path_local = app.config["DB_PATH"]
         user_id = request.args.get("user_id", type=int, default=1)
+        limit = request.args.get("limit", type=int, default=DEFAULT_PAGE_SIZE)
+        before = request.args.get("before")
+        after = request.args.get("after")
         try:
-            sessions = _fetch_sessions_with_sets(db_path_local, user_id)
+            etag = user_etag(_request_db(), user_id)
+            if etag is not None and etag_matches(request.headers.get("If-None-Match"), etag):
+                return _not_modified(etag)
+            page = fetch_session_page(
+                _request_db(),
+                user_id,
+                limit=limit,
+                before=decode_cursor(before) if before else None,
+                after=decode_cursor(after) if after else None,
+                since=request.args.get("since") or None,
+                until=request.args.get("until") or None,
+            )
         except Exception as exc:
             return _error(str(exc), 400)
-        return jsonify(sessions)
+        return _cacheable(
+            jsonify({"sessions": page.sessions, "next_cursor": page.next_cursor}), etag
+        )
+
+    @app.get("/workouts/export")
+    def workouts_export() -> Any:
+        user_id = request.args.get("user_id", type=int, default=1)
+        export_format = request.args.get("format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            return _error("INVALID_EXPORT_FORMAT", 400)
+        since = request.args.get("since") or None
+        until = request.args.get("until") or None
+        pool = current_app.extensions["db_pool"].reader
+
+        # The response body outlives the request context (and its teardown),
+        # so the stream checks out and returns its own reader connection.
+        def generate() -> Iterator[str]:
+            with pool.connection() as db:
+                yield from export_history(
+                    db, user_id, export_format=export_format, since=since, until=until
+                )
+
+        return Response(
+            generate(),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="history-user-{user_id}.{export_format}"'
+                )
+            },
+        )
 
     @app.get("/exercises/<int:exercise_id>/history")
     def exercises_history(exercise_id: int) -> Any:
-        db_path_local = app.config["DB_PATH"]
         user_id = request.args.get("user_id", type=int, default=1)
         try:
-            history = fetch_exercise_history(db_path_local, user_id, exercise_id)
+            etag, history = fetch_exercise_history_body(
+                _request_db(), user_id, exercise_id, request.headers.get("If-None-Match")
+            )
         except Exception as exc:
             return _error(str(exc), 400)
-        return jsonify(history)
+        if history is None:
+            return _not_modified(etag)
+        return _cacheable(jsonify(history), etag)
 
     @app.get("/progression/recommendations")
     def progression_recommendations() -> Any:
-        db_path_local = app.config["DB_PATH"]
         user_id = request.args.get("user_id", type=int)
         exercise_id = request.args.get("exercise_id", type=int)
         if user_id is None or exercise_id is None:
             return _error("user_id and exercise_id are required", 400)
         try:
-            recommendation = recommend_next_load(db_path_local, user_id, exercise_id)
+            recommendation = recommend_next_load(_request_db(), user_id, exercise_id)
         except Exception as exc:
             return _error(str(exc), 400)
-        payload = asdict(recommendation)
-        payload["rep_range"] = list(payload.get("rep_range", []))
-        return jsonify(payload)
+        return jsonify(recommendation_payload(recommendation))
+
+    @app.get("/progression/recommendations/batch")
+    def progression_recommendations_batch() -> Any:
+        user_id = request.args.get("user_id", type=int)
+        try:
+            exercise_ids = parse_id_list(request.args.get("exercise_ids"))
+        except ValueError:
+            return _error("exercise_ids must be comma-separated integers", 400)
+        if user_id is None or not exercise_ids:
+            return _error("user_id and exercise_ids are required", 400)
+        if len(exercise_ids) > MAX_BATCH_EXERCISE_IDS:
+            return _error(f"exercise_ids must contain {MAX_BATCH_EXERCISE_IDS} or fewer ids", 400)
+        try:
+            recommendations = recommend_next_loads(_request_db(), user_id, exercise_ids)
+        except Exception as exc:
+            return _error(str(exc), 400)
+        return jsonify(batch_recommendation_payload(exercise_ids, recommendations))
 
     return app
 
 
-def ensure_session_plan_table(db_path: pathlib.Path) -> None:
-    connection = sqlite3.connect(db_path)
-    try:
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS workout_session_plans (
-                session_id INTEGER NOT NULL REFERENCES workout_sessions(id),
-                plan_id INTEGER NOT NULL REFERENCES plans(id),
-                day_index INTEGER NOT NULL,
-                PRIMARY KEY (session_id, plan_id)
-            )
-            """
+def _request_db() -> DbConnection:
+    if "db" not in g:
+        write = request.method not in READ_ONLY_METHODS
+        g.db_pool = current_app.extensions["db_pool"].pool_for(write)
+        g.db = g.db_pool.acquire()
+        if isinstance(g.db, InstrumentedConnection):
+            # Drop anything a previous holder left so totals are per request.
+            g.db.take_query_stats()
+    return g.db
+
+
+def _pool_samples(pools: ReadWritePool) -> Iterator[Sample]:
+    for name, stats in pools.stats().items():
+        labels = {"pool": name}
+        yield Sample(
+            "db_pool_connections", "gauge", "Open pooled connections.", labels, stats.size
+        )
+        yield Sample(
+            "db_pool_connections_in_use",
+            "gauge",
+            "Pooled connections checked out.",
+            labels,
+            stats.in_use,
+        )
+        yield Sample(
+            "db_pool_checkouts_total", "counter", "Connections handed out.", labels, stats.checkouts
+        )
+        yield Sample(
+            "db_pool_wait_seconds_total",
+            "counter",
+            "Time spent waiting for a pooled connection.",
+            labels,
+            stats.total_wait_seconds,
         )
-        connection.commit()
-    finally:
-        connection.close()
 
 
-def _error(message: str, status: int) -> Any:
-    return jsonify({"error": message}), status
+def _statement_samples(tracer: SqlTracer) -> Iterator[Sample]:
+    for stats in tracer.snapshot():
+        labels = {"statement": stats.statement}
+        yield Sample(
+            "db_statement_calls_total", "counter", "Statements run, by shape.", labels, stats.calls
+        )
+        yield Sample(
+            "db_statement_seconds_total",
+            "counter",
+            "Time spent in statements, by shape.",
+            labels,
+            stats.total_seconds,
+        )
+        yield Sample(
+            "db_statement_slow_total",
+            "counter",
+            "Statements over the slow-query threshold.",
+            labels,
+            stats.slow_calls,
+        )
 
 
-def _parse_training_days(value: str | None) -> list[int]:
-    if not value:
-        return []
-    return [int(day.strip()) for day in value.split(",") if day.strip()]
-
-
-def _fetch_plan_payload(db_path: str, plan_id: int) -> dict[str, Any]:
-    connection = sqlite3.connect(db_path)
-    try:
-        cursor = connection.execute(
-            """
-            SELECT p.id,
-                   p.name,
-                   p.start_date,
-                   p.weeks,
-                   q.goals,
-                   q.experience_level,
-                   q.schedule_days,
-                   q.training_days_of_week
-            FROM plans p
-            JOIN questionnaire_responses q
-              ON q.id = p.generated_from_questionnaire_id
-            WHERE p.id = ?
-            """,
-            (plan_id,),
+def _plan_cache_samples() -> Iterator[Sample]:
+    stats = plan_skeleton_cache_stats()
+    help_text = "Plan skeleton cache lookups by result."
+    for result, count in (("hit", stats.hits), ("miss", stats.misses)):
+        yield Sample(
+            "plan_skeleton_cache_lookups_total", "counter", help_text, {"result": result}, count
         )
-        row = cursor.fetchone()
-        if row is None:
-            raise ValueError("PLAN_NOT_FOUND")
-
-        plan = {
-            "id": row[0],
-            "name": row[1],
-            "start_date": row[2],
-            "weeks": row[3],
-            "goals": row[4],
-            "experience_level": row[5],
-            "schedule_days": row[6],
-            "training_days_of_week": _parse_training_days(row[7]),
-        }
-
-        exercise_cursor = connection.execute(
-            """
-            SELECT pe.day_index,
-                   pe.session_type,
-                   pe.sequence,
-                   pe.exercise_id,
-                   pe.target_sets,
-                   pe.target_reps_min,
-                   pe.target_reps_max,
-                   pe.starting_weight,
-                   pe.is_initial_load,
-                   ex.name,
-                   ex.category
-            FROM planned_exercises pe
-            JOIN exercises ex ON ex.id = pe.exercise_id
-            WHERE pe.plan_id = ?
-            ORDER BY pe.day_index, pe.sequence
-            """,
-            (plan_id,),
+
+
+def _history_cache_samples() -> Iterator[Sample]:
+    stats = exercise_history_cache_stats()
+    help_text = "Exercise history cache lookups by result."
+    for result, count in (("hit", stats.hits), ("miss", stats.misses)):
+        yield Sample(
+            "exercise_history_cache_lookups_total", "counter", help_text, {"result": result}, count
         )
-        workouts: dict[int, dict[str, Any]] = {}
-        for row in exercise_cursor.fetchall():
-            day_index = int(row[0])
-            if day_index not in workouts:
-                workouts[day_index] = {
-                    "day_index": day_index,
-                    "session_type": row[1],
-                    "exercises": [],
-                }
-            workouts[day_index]["exercises"].append(
-                {
-                    "sequence": row[2],
-                    "exercise_id": row[3],
-                    "target_sets": row[4],
-                    "target_reps_min": row[5],
-                    "target_reps_max": row[6],
-                    "starting_weight": row[7],
-                    "is_initial_load": bool(row[8]),
-                    "name": row[9],
-                    "category": row[10],
-                }
-            )
-    finally:
-        connection.close()
-
-    plan["workouts"] = [
-        workouts[key] for key in sorted(workouts.keys())
-    ]
-    return plan
-
-
-def _fetch_last_completed_day_index(
-    db_path: str, plan_id: int, user_id: int
-) -> dict[str, Any]:
-    connection = sqlite3.connect(db_path)
-    connection.row_factory = sqlite3.Row
-    try:
-        row = connection.execute(
-            """
-            SELECT wsp.day_index, ws.performed_at
-            FROM workout_session_plans wsp
-            JOIN workout_sessions ws ON ws.id = wsp.session_id
-            WHERE wsp.plan_id = ?
-              AND ws.user_id = ?
-            ORDER BY ws.performed_at DESC
-            LIMIT 1
-            """,
-            (plan_id, user_id),
-        ).fetchone()
-        if row is None:
-            return {"day_index": None, "performed_at": None}
-        return {"day_index": row["day_index"], "performed_at": row["performed_at"]}
-    finally:
-        connection.close()
-
-
-def _fetch_sessions_with_sets(db_path: str, user_id: int) -> list[dict[str, Any]]:
-    connection = sqlite3.connect(db_path)
-    connection.row_factory = sqlite3.Row
-    try:
-        session_rows = connection.execute(
-            """
-            SELECT id, performed_at, duration_minutes, notes, completion_status, manual_audit_flag
-            FROM workout_sessions
-            WHERE user_id = ?
-            ORDER BY performed_at DESC
-            """,
-            (user_id,),
-        ).fetchall()
-        session_ids = [row["id"] for row in session_rows]
-        set_logs: dict[int, list[dict[str, Any]]] = {sid: [] for sid in session_ids}
-        if session_ids:
-            placeholders = ",".join("?" for _ in session_ids)
-            rows = connection.execute(
-                f"""
-                SELECT sl.session_id,
-                       sl.exercise_id,
-                       ex.name,
-                       sl.set_number,
-                       sl.reps,
-                       sl.weight,
-                       sl.rpe,
-                       sl.rest_seconds,
-                       sl.is_initial_load
-                FROM set_logs sl
-                JOIN exercises ex ON ex.id = sl.exercise_id
-                WHERE sl.session_id IN ({placeholders})
-                ORDER BY sl.session_id DESC, sl.set_number ASC
-                """,
-                session_ids,
-            ).fetchall()
-            for row in rows:
-                set_logs[row["session_id"]].append(
-                    {
-                        "exercise_id": row["exercise_id"],
-                        "exercise_name": row["name"],
-                        "set_number": row["set_number"],
-                        "reps": row["reps"],
-                        "weight": row["weight"],
-                        "rpe": row["rpe"],
-                        "rest_seconds": row["rest_seconds"],
-                        "is_initial_load": bool(row["is_initial_load"]),
-                    }
-                )
+    yield Sample(
+        "exercise_history_cache_entries",
+        "gauge",
+        "Cached exercise histories.",
+        {},
+        stats.size,
+    )
 
-        sessions = []
-        for row in session_rows:
-            sessions.append(
-                {
-                    "id": row["id"],
-                    "performed_at": row["performed_at"],
-                    "duration_minutes": row["duration_minutes"],
-                    "notes": row["notes"],
-                    "completion_status": row["completion_status"],
-                    "manual_audit_flag": bool(row["manual_audit_flag"]),
-                    "set_logs": set_logs.get(row["id"], []),
-                }
-            )
-        return sessions
-    finally:
-        connection.close()
+
+def _error(message: str, status: int) -> Any:
+    return jsonify({"error": message}), status
+
+
+# The version is read before the payload is built, so a write landing in
+# between only makes the ETag older than the body and costs a refetch later.
+def _cacheable(response: Response, etag: str | None) -> Response:
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def _not_modified(etag: str) -> Response:
+    return _cacheable(Response(status=304), etag)
 
 
 def main() -> None:
@@ -382,10 +438,46 @@ def main() -> None:
     )
     parser.add_argument("--host", type=str, default="127.0.0.1")
     parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help="Maximum number of pooled read-only SQLite connections.",
+    )
+    parser.add_argument(
+        "--journal-mode",
+        type=str,
+        default=DEFAULT_PROFILE.journal_mode,
+        help="SQLite journal_mode for the writer connection.",
+    )
+    parser.add_argument(
+        "--synchronous",
+        type=str,
+        default=DEFAULT_PROFILE.synchronous,
+        help="SQLite synchronous level for all connections.",
+    )
+    parser.add_argument(
+        "--slow-query-ms",
+        type=float,
+        default=None,
+        help="Trace SQL by statement shape and log statements slower than this with their plan.",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Run Flask's reloader and debugger (development only; see server/wsgi.py).",
+    )
     args = parser.parse_args()
 
-    app = create_app(args.db)
-    app.run(host=args.host, port=args.port, debug=True)
+    profile = replace(
+        DEFAULT_PROFILE, journal_mode=args.journal_mode, synchronous=args.synchronous
+    )
+    sql_tracer = None
+    if args.slow_query_ms is not None:
+        logging.basicConfig(level=logging.INFO)
+        sql_tracer = SqlTracer(slow_threshold_seconds=args.slow_query_ms / 1000)
+    app = create_app(args.db, pool_size=args.pool_size, profile=profile, sql_tracer=sql_tracer)
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""asyncio variant of the JSON API, for many mostly-idle clients per process.
+
+    uvicorn "server.asgi:create_async_app" --factory --port 8000
+
+Routes and responses match server/app.py. Handlers call the same api/,
+queries/ and domain/ functions, offloaded to a DbExecutor. Settings are read
+from the same WORKOUT_* environment variables as server/wsgi.py.
+"""
+from __future__ import annotations
+
+import contextlib
+import pathlib
+import time
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.responses import RedirectResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from api.encoding import dumps
+from api.export import EXPORT_FORMATS, export_history
+from api.plans import (
+    generate_plan,
+    get_swap_options,
+    swap_plan_exercise,
+    swap_plan_exercises,
+)
+from api.questionnaire import create_questionnaire
+from api.workouts import create_session, import_sessions, iter_ndjson_payloads
+from db.connection import DEFAULT_PROFILE, ConnectionProfile, ReadWritePool
+from domain.progression.engine import recommend_next_load, recommend_next_loads
+from queries.sessions import DEFAULT_PAGE_SIZE, decode_cursor, fetch_session_page
+from server.config import BASE_DIR, COMPRESS_MIN_BYTES, ServerConfig, warm_catalog
+from server.executor import DbExecutor
+from server.payloads import (
+    CACHE_CONTROL,
+    batch_recommendation_payload,
+    ensure_session_plan_table,
+    etag_matches,
+    fetch_exercise_history_body,
+    fetch_last_completed_day_index,
+    fetch_plan_body,
+    parse_id_list,
+    recommendation_payload,
+    user_etag,
+)
+
+UI_DIR = BASE_DIR / "ui"
+MAX_BATCH_EXERCISE_IDS = 50
+
+
+class JSONResponse(StarletteJSONResponse):
+    """Encode with the same encoder as the Flask app (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _error(message: str, status: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def _int_arg(request: Request, name: str, default: int | None = None) -> int | None:
+    # Same leniency as Flask's request.args.get(..., type=int).
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def _json_body(request: Request) -> dict[str, Any]:
+    try:
+        payload = await request.json()
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _conditional(
+    db: Any,
+    if_none_match: str | None,
+    etag_for: Callable[[Any], str | None],
+    build: Callable[[Any], Any],
+) -> tuple[str | None, Any]:
+    """Look up the ETag and build the body in one executor call. The body is
+    None when the client's If-None-Match is still current."""
+    etag = etag_for(db)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, build(db)
+
+
+def _cacheable(body: Any, etag: str | None) -> Response:
+    if body is None:
+        response = Response(status_code=304)
+    elif isinstance(body, bytes):
+        # Already encoded, e.g. a stored plan snapshot.
+        response = Response(body, media_type="application/json")
+    else:
+        response = JSONResponse(body)
+    if etag is not None:
+        response.headers["ETag"] = f'"{etag}"'
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def _db(request: Request) -> DbExecutor:
+    return request.app.state.db
+
+
+async def index(request: Request) -> Response:
+    return RedirectResponse("/ui/")
+
+
+async def questionnaire(request: Request) -> Response:
+    payload = await _json_body(request)
+
+    def create(db: Any) -> dict[str, int]:
+        questionnaire_id = create_questionnaire(db, payload)
+        plan_id = generate_plan(db, {"questionnaire_id": questionnaire_id})
+        return {"questionnaire_id": questionnaire_id, "plan_id": plan_id}
+
+    try:
+        result = await _db(request).write(create)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(result)
+
+
+async def plans_generate(request: Request) -> Response:
+    payload = await _json_body(request)
+    try:
+        plan_id = await _db(request).write(generate_plan, payload)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse({"plan_id": plan_id})
+
+
+async def plans_get(request: Request) -> Response:
+    plan_id = request.path_params["plan_id"]
+    try:
+        etag, body = await _db(request).read(
+            fetch_plan_body, plan_id, request.headers.get("if-none-match")
+        )
+    except Exception as exc:
+        return _error(str(exc), 404)
+    return _cacheable(body, etag)
+
+
+async def plans_last_completed(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id", default=1)
+    try:
+        result = await _db(request).read(
+            fetch_last_completed_day_index, request.path_params["plan_id"], user_id
+        )
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(result)
+
+
+async def plans_swap_options(request: Request) -> Response:
+    day_index = _int_arg(request, "day_index")
+    sequence = _int_arg(request, "sequence")
+    if day_index is None or sequence is None:
+        return _error("day_index and sequence are required", 400)
+    try:
+        options = await _db(request).read(
+            get_swap_options, request.path_params["plan_id"], day_index, sequence
+        )
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(options)
+
+
+async def plans_swap(request: Request) -> Response:
+    payload = await _json_body(request)
+    payload["plan_id"] = request.path_params["plan_id"]
+    try:
+        await _db(request).write(swap_plan_exercise, payload)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse({"status": "ok"})
+
+
+async def plans_swap_many(request: Request) -> Response:
+    payload = await _json_body(request)
+    payload["plan_id"] = request.path_params["plan_id"]
+    try:
+        swapped = await _db(request).write(swap_plan_exercises, payload)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse({"status": "ok", "swapped": swapped})
+
+
+async def workouts_start_session(request: Request) -> Response:
+    payload = await _json_body(request)
+    if payload.get("set_logs"):
+        try:
+            session_id = await _db(request).write(create_session, payload)
+        except Exception as exc:
+            return _error(str(exc), 400)
+        return JSONResponse({"session_id": session_id})
+    payload.setdefault("id", int(time.time()))
+    return JSONResponse(payload)
+
+
+async def workouts_save_session(request: Request) -> Response:
+    payload = await _json_body(request)
+    try:
+        session_id = await _db(request).write(create_session, payload)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse({"session_id": session_id})
+
+
+async def workouts_import(request: Request) -> Response:
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        body = await request.body()
+        payloads: Any = iter_ndjson_payloads(body.splitlines())
+    else:
+        try:
+            payloads = await request.json()
+        except ValueError:
+            payloads = None
+        if isinstance(payloads, dict):
+            payloads = payloads.get("sessions")
+        if not isinstance(payloads, list):
+            return _error("expected a JSON list of sessions or an NDJSON body", 400)
+    try:
+        result = await _db(request).write(import_sessions, payloads)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(
+        {
+            "imported": result.imported,
+            "session_ids": result.session_ids,
+            "errors": [asdict(error) for error in result.errors],
+        }
+    )
+
+
+async def workouts_list_sessions(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id", default=1)
+    limit = _int_arg(request, "limit", default=DEFAULT_PAGE_SIZE)
+    before = request.query_params.get("before")
+    after = request.query_params.get("after")
+    since = request.query_params.get("since") or None
+    until = request.query_params.get("until") or None
+
+    def fetch(db: Any) -> dict[str, Any]:
+        page = fetch_session_page(
+            db,
+            user_id,
+            limit=limit,
+            before=decode_cursor(before) if before else None,
+            after=decode_cursor(after) if after else None,
+            since=since,
+            until=until,
+        )
+        return {"sessions": page.sessions, "next_cursor": page.next_cursor}
+
+    try:
+        etag, body = await _db(request).read(
+            _conditional,
+            request.headers.get("if-none-match"),
+            lambda db: user_etag(db, user_id),
+            fetch,
+        )
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return _cacheable(body, etag)
+
+
+async def workouts_export(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id", default=1)
+    export_format = request.query_params.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return _error("INVALID_EXPORT_FORMAT", 400)
+    since = request.query_params.get("since") or None
+    until = request.query_params.get("until") or None
+    pool = _db(request).pools.reader
+
+    # Starlette steps a sync iterator on its own worker threads, and the
+    # stream holds its reader connection until the last row is sent.
+    def generate() -> Iterator[str]:
+        with pool.connection() as db:
+            yield from export_history(
+                db, user_id, export_format=export_format, since=since, until=until
+            )
+
+    return StreamingResponse(
+        generate(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="history-user-{user_id}.{export_format}"'
+            )
+        },
+    )
+
+
+async def exercises_history(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id", default=1)
+    exercise_id = request.path_params["exercise_id"]
+    try:
+        etag, history = await _db(request).read(
+            fetch_exercise_history_body,
+            user_id,
+            exercise_id,
+            request.headers.get("if-none-match"),
+        )
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return _cacheable(history, etag)
+
+
+async def progression_recommendations(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id")
+    exercise_id = _int_arg(request, "exercise_id")
+    if user_id is None or exercise_id is None:
+        return _error("user_id and exercise_id are required", 400)
+    try:
+        recommendation = await _db(request).read(recommend_next_load, user_id, exercise_id)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(recommendation_payload(recommendation))
+
+
+async def progression_recommendations_batch(request: Request) -> Response:
+    user_id = _int_arg(request, "user_id")
+    try:
+        exercise_ids = parse_id_list(request.query_params.get("exercise_ids"))
+    except ValueError:
+        return _error("exercise_ids must be comma-separated integers", 400)
+    if user_id is None or not exercise_ids:
+        return _error("user_id and exercise_ids are required", 400)
+    if len(exercise_ids) > MAX_BATCH_EXERCISE_IDS:
+        return _error(f"exercise_ids must contain {MAX_BATCH_EXERCISE_IDS} or fewer ids", 400)
+    try:
+        recommendations = await _db(request).read(recommend_next_loads, user_id, exercise_ids)
+    except Exception as exc:
+        return _error(str(exc), 400)
+    return JSONResponse(batch_recommendation_payload(exercise_ids, recommendations))
+
+
+ROUTES = [
+    Route("/", index),
+    Route("/questionnaire", questionnaire, methods=["POST"]),
+    Route("/plans/generate", plans_generate, methods=["POST"]),
+    Route("/plans/{plan_id:int}", plans_get, methods=["GET"]),
+    Route("/plans/{plan_id:int}/last-completed", plans_last_completed, methods=["GET"]),
+    Route("/plans/{plan_id:int}/swap-options", plans_swap_options, methods=["GET"]),
+    Route("/plans/{plan_id:int}/swap", plans_swap, methods=["PATCH"]),
+    Route("/plans/{plan_id:int}/swaps", plans_swap_many, methods=["PATCH"]),
+    Route("/workouts/sessions", workouts_start_session, methods=["POST"]),
+    Route("/workouts/sessions", workouts_list_sessions, methods=["GET"]),
+    Route("/workouts", workouts_save_session, methods=["POST"]),
+    Route("/workouts/import", workouts_import, methods=["POST"]),
+    Route("/workouts/export", workouts_export, methods=["GET"]),
+    Route("/exercises/{exercise_id:int}/history", exercises_history, methods=["GET"]),
+    Route("/progression/recommendations", progression_recommendations, methods=["GET"]),
+    Route(
+        "/progression/recommendations/batch",
+        progression_recommendations_batch,
+        methods=["GET"],
+    ),
+    Mount("/ui", StaticFiles(directory=UI_DIR, html=True)),
+]
+
+
+def create_async_app(
+    db_path: pathlib.Path | None = None,
+    pool_size: int | None = None,
+    profile: ConnectionProfile = DEFAULT_PROFILE,
+) -> Starlette:
+    config = ServerConfig.from_env()
+    db_path = db_path or config.db_path
+    pool_size = pool_size or config.threads
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        ensure_session_plan_table(db_path)
+        app.state.db = DbExecutor(ReadWritePool(db_path, readers=pool_size, profile=profile))
+        await app.state.db.read(warm_catalog)
+        try:
+            yield
+        finally:
+            app.state.db.close(config.drain_timeout_seconds)
+
+    return Starlette(
+        routes=ROUTES,
+        middleware=[Middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)],
+        lifespan=lifespan,
+    )
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from dataclasses import dataclass, replace
+from typing import Mapping
+
+from db.connection import DEFAULT_POOL_SIZE, DbConnection
+from domain.exercises.catalog import ExerciseCatalog, get_exercise_catalog
+from domain.plans.generator import EQUIPMENT_ALLOWED
+
+BASE_DIR = pathlib.Path(__file__).resolve().parents[1]
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 30.0
+# Below this, compression overhead outweighs the bytes saved.
+COMPRESS_MIN_BYTES = 512
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Deployment settings shared by the WSGI and ASGI entry points."""
+
+    db_path: pathlib.Path = BASE_DIR / "sandbox.db"
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 2
+    # Each request holds one pooled connection, so threads and readers match.
+    threads: int = DEFAULT_POOL_SIZE
+    slow_query_ms: float | None = None
+    drain_timeout_seconds: float = DEFAULT_DRAIN_TIMEOUT_SECONDS
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> ServerConfig:
+        config = cls()
+        slow_query_ms = environ.get("WORKOUT_SLOW_QUERY_MS")
+        return replace(
+            config,
+            db_path=pathlib.Path(environ.get("WORKOUT_DB_PATH", config.db_path)),
+            host=environ.get("WORKOUT_HOST", config.host),
+            port=int(environ.get("WORKOUT_PORT", config.port)),
+            workers=int(environ.get("WORKOUT_WORKERS", config.workers)),
+            threads=int(environ.get("WORKOUT_THREADS", config.threads)),
+            slow_query_ms=float(slow_query_ms) if slow_query_ms else None,
+            drain_timeout_seconds=float(
+                environ.get("WORKOUT_DRAIN_TIMEOUT", config.drain_timeout_seconds)
+            ),
+        )
+
+
+def warm_catalog(db: DbConnection) -> ExerciseCatalog:
+    """Load the exercise catalog and its per-equipment candidate indexes so
+    the first requests do not pay for them."""
+    catalog = get_exercise_catalog(db)
+    for equipment_ids in EQUIPMENT_ALLOWED.values():
+        catalog.candidates(equipment_ids)
+    return catalog
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from db.connection import ReadWritePool
+
+T = TypeVar("T")
+
+
+class DbExecutor:
+    """Run blocking `fn(db, ...)` calls from asyncio on a bounded thread pool.
+
+    There is one thread per pooled connection (the readers plus the writer).
+    Callers past that limit wait on a semaphore in the event loop, not on a
+    thread. This way thousands of idle or queued clients cost coroutines,
+    not threads. Writes are serialized the same way on a separate semaphore,
+    so a burst of writes never starves the readers of threads.
+    """
+
+    def __init__(self, pools: ReadWritePool) -> None:
+        self.pools = pools
+        readers = pools.reader.max_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=readers + 1, thread_name_prefix="db"
+        )
+        self._read_slots = asyncio.Semaphore(readers)
+        self._write_slots = asyncio.Semaphore(1)
+
+    def _call(self, write: bool, fn: Callable[..., T], args: tuple[Any, ...]) -> T:
+        with self.pools.connection(write=write) as db:
+            return fn(db, *args)
+
+    async def run(self, fn: Callable[..., T], *args: Any, write: bool = False) -> T:
+        slots = self._write_slots if write else self._read_slots
+        async with slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, write, fn, args)
+
+    async def read(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self.run(fn, *args)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self.run(fn, *args, write=True)
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Finish queued calls, then drain the connection pools."""
+        self._executor.shutdown(wait=True)
+        return self.pools.drain(timeout)
+
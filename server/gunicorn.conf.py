@@ -0,0 +1,28 @@
+"""gunicorn settings for server.wsgi:create_production_app().
+
+    gunicorn -c server/gunicorn.conf.py "server.wsgi:create_production_app()"
+
+Each worker builds its own app (no preload_app), so SQLite connections and
+the warmed catalog are created after the fork. Threads per worker match the
+reader pool size so a request never waits on a pooled connection.
+"""
+from server.config import ServerConfig
+from server.wsgi import shutdown
+
+_config = ServerConfig.from_env()
+
+bind = f"{_config.host}:{_config.port}"
+workers = _config.workers
+worker_class = "gthread"
+threads = _config.threads
+preload_app = False
+graceful_timeout = int(_config.drain_timeout_seconds)
+timeout = 60
+accesslog = "-"
+
+
+def worker_exit(server, worker):
+    # worker.wsgi is the app the factory returned for this worker.
+    app = getattr(worker, "wsgi", None)
+    if app is not None:
+        shutdown(app)
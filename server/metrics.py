@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from flask import Flask, Response, current_app, g, request
+
+from db.connection import InstrumentedConnection
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ENCODE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        running = 0
+        cumulative = []
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+@dataclass(frozen=True)
+class Sample:
+    """One value reported by a collector at render time."""
+
+    name: str
+    kind: str
+    help: str
+    labels: dict[str, Any]
+    value: float
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_float(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class RequestMetrics:
+    """In-process request metrics rendered in the Prometheus text format.
+
+    Series are keyed by the matched route rule (e.g. /plans/<int:plan_id>),
+    not the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latency: dict[tuple[str, str], Histogram] = {}
+        self._sql_latency: dict[tuple[str, str], Histogram] = {}
+        self._encode_latency: dict[tuple[str, str], Histogram] = {}
+        self._response_size: dict[tuple[str, str], Histogram] = {}
+        self._requests: dict[tuple[str, str, int], int] = {}
+        self._errors: dict[tuple[str, str, str], int] = {}
+        self._sql_statements: dict[tuple[str, str], int] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def observe_request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        sql_statements: int,
+        sql_seconds: float,
+        encode_seconds: float = 0.0,
+        response_bytes: int | None = None,
+    ) -> None:
+        """Record one request. response_bytes is the body as sent (after
+        compression), or None for streamed bodies of unknown length."""
+        key = (endpoint, method)
+        with self._lock:
+            self._latency.setdefault(key, Histogram()).observe(seconds)
+            self._sql_latency.setdefault(key, Histogram()).observe(sql_seconds)
+            self._encode_latency.setdefault(key, Histogram(ENCODE_BUCKETS)).observe(
+                encode_seconds
+            )
+            if response_bytes is not None:
+                self._response_size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(
+                    response_bytes
+                )
+            self._requests[(endpoint, method, status)] = (
+                self._requests.get((endpoint, method, status), 0) + 1
+            )
+            self._sql_statements[key] = self._sql_statements.get(key, 0) + sql_statements
+            if status >= 400:
+                error_key = (endpoint, method, f"{status // 100}xx")
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+
+    def add_collector(self, collect: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callback whose samples are read fresh on every render."""
+        self._collectors.append(collect)
+
+    def _render_histograms(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        histograms: dict[tuple[str, str], Histogram],
+    ) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (endpoint, method), histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.cumulative()):
+                labels = _labels(endpoint=endpoint, method=method, le=_format_float(bound))
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _labels(endpoint=endpoint, method=method, le="+Inf")
+            lines.append(f"{name}_bucket{labels} {histogram.count}")
+            labels = _labels(endpoint=endpoint, method=method)
+            lines.append(f"{name}_sum{labels} {_format_float(histogram.total)}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            self._render_histograms(
+                lines,
+                "http_request_duration_seconds",
+                "Time from request start to response, by route.",
+                self._latency,
+            )
+            self._render_histograms(
+                lines,
+                "http_request_sql_duration_seconds",
+                "Time spent in SQLite per request, by route.",
+                self._sql_latency,
+            )
+            self._render_histograms(
+                lines,
+                "http_response_encode_seconds",
+                "Time spent serializing JSON response bodies, by route.",
+                self._encode_latency,
+            )
+            self._render_histograms(
+                lines,
+                "http_response_size_bytes",
+                "Response body size as sent, after compression, by route.",
+                self._response_size,
+            )
+            lines.append("# HELP http_requests_total Requests handled, by route and status.")
+            lines.append("# TYPE http_requests_total counter")
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"http_requests_total{labels} {count}")
+            lines.append("# HELP http_request_errors_total Requests answered with a 4xx or 5xx.")
+            lines.append("# TYPE http_request_errors_total counter")
+            for (endpoint, method, status_class), count in sorted(self._errors.items()):
+                labels = _labels(endpoint=endpoint, method=method, status_class=status_class)
+                lines.append(f"http_request_errors_total{labels} {count}")
+            lines.append("# HELP http_request_sql_statements_total SQL statements run, by route.")
+            lines.append("# TYPE http_request_sql_statements_total counter")
+            for (endpoint, method), count in sorted(self._sql_statements.items()):
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f"http_request_sql_statements_total{labels} {count}")
+            collectors = list(self._collectors)
+        described: set[str] = set()
+        for collect in collectors:
+            for sample in collect():
+                if sample.name not in described:
+                    described.add(sample.name)
+                    lines.append(f"# HELP {sample.name} {sample.help}")
+                    lines.append(f"# TYPE {sample.name} {sample.kind}")
+                labels = _labels(**sample.labels) if sample.labels else ""
+                lines.append(f"{sample.name}{labels} {_format_float(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _request_query_stats() -> tuple[int, float]:
+    db = g.get("db")
+    if isinstance(db, InstrumentedConnection):
+        stats = db.take_query_stats()
+        return stats.statements, stats.seconds
+    return 0, 0.0
+
+
+def init_request_metrics(app: Flask, metrics: RequestMetrics | None = None) -> RequestMetrics:
+    """Time every request, add a Server-Timing header and serve /metrics.
+
+    SQL figures come from the request's pooled connection, so the pool must
+    be created with instrumented=True for them to be non-zero.
+    """
+    metrics = metrics or RequestMetrics()
+    app.extensions["request_metrics"] = metrics
+
+    @app.before_request
+    def start_request_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response: Response) -> Response:
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        sql_statements, sql_seconds = _request_query_stats()
+        encode_seconds = g.pop("json_encode_seconds", 0.0)
+        endpoint = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ENDPOINT
+        current_app.extensions["request_metrics"].observe_request(
+            endpoint,
+            request.method,
+            response.status_code,
+            elapsed,
+            sql_statements,
+            sql_seconds,
+            encode_seconds=encode_seconds,
+            response_bytes=response.calculate_content_length(),
+        )
+        app_seconds = max(elapsed - sql_seconds - encode_seconds, 0.0)
+        response.headers["Server-Timing"] = (
+            f"db;dur={sql_seconds * 1000:.2f};desc=\"{sql_statements} queries\", "
+            f"json;dur={encode_seconds * 1000:.2f}, "
+            f"app;dur={app_seconds * 1000:.2f}, "
+            f"total;dur={elapsed * 1000:.2f}"
+        )
+        return response
+
+    @app.get("/metrics")
+    def metrics_endpoint() -> Any:
+        return Response(
+            current_app.extensions["request_metrics"].render(),
+            content_type=PROMETHEUS_CONTENT_TYPE,
+        )
+
+    return metrics
@@ -0,0 +1,152 @@
+"""Request-independent pieces of the HTTP API: schema setup, response payload
+builders and query-string parsing. Shared by the Flask app (server/app.py)
+and the asyncio app (server/asgi.py)."""
+from __future__ import annotations
+
+import pathlib
+import sqlite3
+from dataclasses import asdict
+from typing import Any
+
+from db.connection import DbConnection
+from domain.plans.snapshots import build_plan_payload, encode_plan_payload
+from domain.workouts.history import get_exercise_history
+from queries.snapshots import fetch_plan_snapshot
+from queries.versions import fetch_user_data_version
+
+# Responses are per user, and clients must revalidate: a 304 is one
+# primary-key lookup, and a stale plan after a swap is not acceptable.
+CACHE_CONTROL = "private, no-cache"
+
+
+def ensure_session_plan_table(db_path: pathlib.Path) -> None:
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS workout_session_plans (
+                session_id INTEGER NOT NULL REFERENCES workout_sessions(id),
+                plan_id INTEGER NOT NULL REFERENCES plans(id),
+                day_index INTEGER NOT NULL,
+                PRIMARY KEY (session_id, plan_id)
+            )
+            """
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _plan_etag(plan_id: int, data_version: int, catalog_version: str) -> str:
+    return f"plan-{plan_id}-{data_version}-{catalog_version}"
+
+
+def fetch_plan_body(
+    db: DbConnection, plan_id: int, if_none_match: str | None = None
+) -> tuple[str, bytes | None]:
+    """ETag and encoded JSON for GET /plans/<id>.
+
+    The body is None when If-None-Match is still current. Otherwise it is
+    the stored snapshot, read by the same primary-key lookup as the ETag,
+    or, if the snapshot is missing or stale (e.g. after a catalog reseed),
+    built from the tables.
+    """
+    snapshot = fetch_plan_snapshot(db, plan_id)
+    if snapshot is None:
+        raise ValueError("PLAN_NOT_FOUND")
+    etag = _plan_etag(plan_id, snapshot.data_version, snapshot.catalog_version)
+    if etag_matches(if_none_match, etag):
+        return etag, None
+    if snapshot.payload is not None:
+        return etag, snapshot.payload
+    return etag, encode_plan_payload(build_plan_payload(db, plan_id))
+
+
+def _user_etag(user_id: int, data_version: int, catalog_version: str) -> str:
+    return f"user-{user_id}-{data_version}-{catalog_version}"
+
+
+def user_etag(db: DbConnection, user_id: int) -> str | None:
+    """ETag for a user's history reads: changes whenever sessions are logged."""
+    version = fetch_user_data_version(db, user_id)
+    if version is None:
+        return None
+    return _user_etag(user_id, *version)
+
+
+def fetch_exercise_history_body(
+    db: DbConnection, user_id: int, exercise_id: int, if_none_match: str | None = None
+) -> tuple[str | None, dict[str, Any] | None]:
+    """ETag and payload for GET /exercises/<id>/history.
+
+    The user version read for the ETag also keys the history cache, so a
+    cached body always belongs to the version its ETag names, whichever
+    worker logged the session.
+    """
+    version = fetch_user_data_version(db, user_id)
+    if version is None:
+        return None, get_exercise_history(db, user_id, exercise_id)
+    etag = _user_etag(user_id, *version)
+    if etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, get_exercise_history(db, user_id, exercise_id, version)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an unquoted ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def recommendation_payload(recommendation: Any) -> dict[str, Any]:
+    payload = asdict(recommendation)
+    payload["rep_range"] = list(payload.get("rep_range", []))
+    return payload
+
+
+def batch_recommendation_payload(
+    exercise_ids: list[int], recommendations: dict[int, Any]
+) -> list[dict[str, Any]]:
+    """One entry per requested id, in request order; ids without a
+    recommendation (not in the catalog) carry an error instead."""
+    return [
+        {"exercise_id": exercise_id, **recommendation_payload(recommendations[exercise_id])}
+        if exercise_id in recommendations
+        else {"exercise_id": exercise_id, "error": "INVALID_EXERCISE_ID"}
+        for exercise_id in exercise_ids
+    ]
+
+
+def parse_id_list(value: str | None) -> list[int]:
+    if not value:
+        return []
+    return list(dict.fromkeys(int(item.strip()) for item in value.split(",") if item.strip()))
+
+
+def fetch_last_completed_day_index(
+    db: DbConnection, plan_id: int, user_id: int
+) -> dict[str, Any]:
+    row = db.execute(
+        """
+        SELECT wsp.day_index, ws.performed_at
+        FROM workout_session_plans wsp
+        JOIN workout_sessions ws ON ws.id = wsp.session_id
+        WHERE wsp.plan_id = ?
+          AND ws.user_id = ?
+        ORDER BY ws.performed_at DESC
+        LIMIT 1
+        """,
+        (plan_id, user_id),
+    ).fetchone()
+    if row is None:
+        return {"day_index": None, "performed_at": None}
+    return {"day_index": row[0], "performed_at": row[1]}
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gzip
+import time
+from typing import Any
+
+from flask import Flask, Response, g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from api.encoding import JsonEncoder, select_json_encoder
+from server.config import COMPRESS_MIN_BYTES
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_MIMETYPES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "image/svg+xml",
+        "text/css",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+    }
+)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through a pluggable JsonEncoder, timing each encode.
+
+    The time spent is added to g.json_encode_seconds, which the request
+    metrics report per route.
+    """
+
+    def __init__(self, app: Flask, encoder: JsonEncoder) -> None:
+        super().__init__(app)
+        self.encoder = encoder
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.encode(obj).decode("utf-8")
+
+    def encode(self, obj: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self.encoder.dumps(obj)
+        finally:
+            if has_app_context():
+                g.json_encode_seconds = g.get("json_encode_seconds", 0.0) + (
+                    time.perf_counter() - started
+                )
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
+def init_json_encoder(app: Flask, name: str | None = None) -> JsonEncoder:
+    encoder = select_json_encoder(name)
+    app.json = FastJSONProvider(app, encoder)
+    return encoder
+
+
+def negotiate_encoding() -> str | None:
+    """Best Content-Encoding this server supports for the current request."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical input.
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _weaken_etag(response: Response) -> None:
+    # A compressed body is a different byte sequence, so a strong ETag no
+    # longer describes it. If-None-Match compares weakly, so clients still
+    # get 304s.
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_compression(app: Flask, min_bytes: int = COMPRESS_MIN_BYTES) -> None:
+    """gzip or brotli JSON, UI assets and /metrics when the client asks for it.
+
+    Streamed responses (exports) are left alone; they are consumed
+    incrementally and compressing them here would buffer the whole body.
+    """
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+        encoding = negotiate_encoding()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+        if response.status_code == 304:
+            _weaken_etag(response)
+            return response
+        if response.status_code != 200:
+            return response
+        if response.direct_passthrough:
+            # send_from_directory hands back a file wrapper; UI assets are
+            # small, so read them in and compress like any other body.
+            response.direct_passthrough = False
+        elif response.is_streamed:
+            return response
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+        response.set_data(_compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        _weaken_etag(response)
+        return response
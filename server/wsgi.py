@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Production entry point: debug off, catalog warmed, pool drained on exit.
+
+    gunicorn -c server/gunicorn.conf.py "server.wsgi:create_production_app()"
+    python3 -m server.wsgi --db ./workouts.db --threads 8      # waitress
+
+Settings come from WORKOUT_* environment variables (see ServerConfig), so the
+same factory works under either server.
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import logging
+from dataclasses import replace
+from pathlib import Path
+
+from flask import Flask
+
+from db.tracing import SqlTracer
+from domain.exercises.catalog import ExerciseCatalog
+from server.app import create_app
+from server.config import DEFAULT_DRAIN_TIMEOUT_SECONDS, ServerConfig, warm_catalog
+
+logger = logging.getLogger("server.wsgi")
+
+
+def warm_up(app: Flask) -> ExerciseCatalog:
+    with app.extensions["db_pool"].connection() as db:
+        return warm_catalog(db)
+
+
+def shutdown(app: Flask, timeout: float | None = None) -> bool:
+    """Drain the app's connection pool; safe to call more than once."""
+    if timeout is None:
+        timeout = app.config.get("DRAIN_TIMEOUT_SECONDS", DEFAULT_DRAIN_TIMEOUT_SECONDS)
+    drained = app.extensions["db_pool"].drain(timeout)
+    if not drained:
+        logger.warning("connection pool still had connections in use after %.1fs", timeout)
+    return drained
+
+
+def create_production_app(config: ServerConfig | None = None) -> Flask:
+    """App factory for production servers. Call it once per worker process:
+    SQLite connections must not be shared across a fork."""
+    config = config or ServerConfig.from_env()
+    sql_tracer = None
+    if config.slow_query_ms is not None:
+        sql_tracer = SqlTracer(slow_threshold_seconds=config.slow_query_ms / 1000)
+    app = create_app(config.db_path, pool_size=config.threads, sql_tracer=sql_tracer)
+    app.debug = False
+    app.config["DRAIN_TIMEOUT_SECONDS"] = config.drain_timeout_seconds
+    catalog = warm_up(app)
+    logger.info("catalog warmed: %d exercises", len(catalog.by_id))
+    atexit.register(shutdown, app)
+    return app
+
+
+def main() -> None:
+    defaults = ServerConfig.from_env()
+    parser = argparse.ArgumentParser(description="Serve the API with waitress.")
+    parser.add_argument("--db", type=Path, default=defaults.db_path)
+    parser.add_argument("--host", type=str, default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--threads", type=int, default=defaults.threads)
+    parser.add_argument("--slow-query-ms", type=float, default=defaults.slow_query_ms)
+    args = parser.parse_args()
+
+    try:
+        import waitress
+    except ImportError:
+        raise SystemExit("waitress is not installed: pip3 install waitress") from None
+
+    logging.basicConfig(level=logging.INFO)
+    config = replace(
+        defaults,
+        db_path=args.db,
+        host=args.host,
+        port=args.port,
+        threads=args.threads,
+        slow_query_ms=args.slow_query_ms,
+    )
+    app = create_production_app(config)
+    try:
+        waitress.serve(app, host=config.host, port=config.port, threads=config.threads)
+    finally:
+        shutdown(app)
+
+
+if __name__ == "__main__":
+    main()
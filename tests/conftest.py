@@ -0,0 +1,74 @@
+import pathlib
+import sqlite3
+
+import pytest
+
+from api.workouts import create_session
+from data.exercises.seed_exercises import parse_exercise_rows, seed_sqlite
+from db.connection import get_db_connection
+from db.migrations import apply_migrations
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[1]
+LIBRARY_PATH = REPO_ROOT / "EXERCISE_LIBRARY_EXPANDED.md"
+
+
+@pytest.fixture
+def db_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "test.db"
+    apply_migrations(path)
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(
+            "INSERT INTO users (id, email, smallest_increment) VALUES (1, 'test@user', 2.5)"
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    lines = LIBRARY_PATH.read_text(encoding="utf-8").splitlines()
+    seed_sqlite(path, parse_exercise_rows(lines), batch_size=50)
+    return path
+
+
+@pytest.fixture
+def db(db_path: pathlib.Path):
+    connection = get_db_connection(db_path)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def log_session(db):
+    """Return a helper that logs one session of identical sets via create_session."""
+
+    def _log(
+        exercise_id: int,
+        performed_at: str,
+        reps: list[int],
+        weight: float = 100.0,
+        completion_status: str = "completed",
+        is_initial_load: bool = False,
+        manual_audit_flag: bool = False,
+    ) -> int:
+        return create_session(
+            db,
+            {
+                "user_id": 1,
+                "performed_at": performed_at,
+                "completion_status": completion_status,
+                "manual_audit_flag": manual_audit_flag,
+                "set_logs": [
+                    {
+                        "exercise_id": exercise_id,
+                        "set_number": set_number,
+                        "reps": rep_count,
+                        "weight": weight,
+                        "rpe": 8.0,
+                        "rest_seconds": 90,
+                        "is_initial_load": is_initial_load,
+                    }
+                    for set_number, rep_count in enumerate(reps, start=1)
+                ],
+            },
+        )
+
+    return _log
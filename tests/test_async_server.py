@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from db.connection import ReadWritePool
+from queries.exercise_history import fetch_exercise_history
+from server.executor import DbExecutor
+
+
+def test_executor_bounds_concurrent_reads(db_path, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [8, 8, 8])
+    executor = DbExecutor(ReadWritePool(db_path, readers=2))
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def slow_history(db, exercise_id):
+        with lock:
+            active.append(exercise_id)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(exercise_id)
+        return fetch_exercise_history(db, 1, exercise_id)
+
+    async def main():
+        return await asyncio.gather(*(executor.read(slow_history, 1) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert executor.close(timeout=1.0)
+    assert len(results) == 10
+    assert all(result == results[0] for result in results)
+    assert max(peak) <= 2
+
+
+def test_async_app_matches_sync_routes(db_path, log_session) -> None:
+    pytest.importorskip("starlette")
+    from starlette.testclient import TestClient
+
+    from server.asgi import create_async_app
+    from server.app import create_app
+
+    log_session(1, "2024-01-01T10:00:00Z", [8, 8, 8])
+    url = "/progression/recommendations?user_id=1&exercise_id=1"
+    expected = create_app(db_path).test_client().get(url).get_json()
+    with TestClient(create_async_app(db_path, pool_size=2)) as client:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json() == expected
+        assert client.get("/progression/recommendations?user_id=1").status_code == 400
@@ -0,0 +1,37 @@
+import sqlite3
+
+from benchmarks.synthetic import SyntheticConfig, build_synthetic_db, pick_sample
+from benchmarks.timing import compare_results, measure
+
+CONFIG = SyntheticConfig(users=3, weeks=3, questionnaires_per_user=2, seed=7)
+
+
+def _set_log_rows(db_path) -> list[tuple]:
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(
+            "SELECT session_id, exercise_id, set_number, reps, weight FROM set_logs ORDER BY 1, 2, 3"
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def test_synthetic_db_is_deterministic(tmp_path) -> None:
+    first = build_synthetic_db(tmp_path / "a.db", CONFIG)
+    second = build_synthetic_db(tmp_path / "b.db", CONFIG)
+
+    assert first.summary() == second.summary()
+    assert first.summary()["plans"] == 6 and first.sessions > 0
+    assert _set_log_rows(first.db_path) == _set_log_rows(second.db_path)
+    assert pick_sample(first.db_path)["plan_id"] == first.plan_ids[1]
+
+
+def test_compare_results_flags_slower_medians() -> None:
+    stats = measure("noop", lambda: None, rounds=5, warmup=0).to_dict()
+    baseline = {"noop": {**stats, "median": 1.0}, "gone": {**stats, "median": 1.0}}
+    current = {"noop": {**stats, "median": 1.5}}
+
+    [comparison] = compare_results(current, baseline)
+
+    assert comparison.ratio == 1.5
+    assert comparison.regressed(1.25) and not comparison.regressed(2.0)
@@ -0,0 +1,124 @@
+import logging
+import sqlite3
+import threading
+
+import pytest
+
+from db.connection import ConnectionPool, ReadWritePool, get_db_connection
+from db.tracing import SqlTracer
+
+
+def test_pool_reuses_released_connection(db_path) -> None:
+    pool = ConnectionPool(db_path, max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    pool.release(second)
+    assert first is second
+    stats = pool.stats()
+    assert stats.size == 1
+    assert stats.checkouts == 2
+    assert stats.in_use == 0
+    pool.close()
+
+
+def test_pool_enables_foreign_keys(db_path) -> None:
+    pool = ConnectionPool(db_path, max_size=1)
+    with pool.connection() as db:
+        assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    pool.close()
+
+
+def test_pool_times_out_when_exhausted(db_path) -> None:
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.01)
+    held = pool.acquire()
+    with pytest.raises(TimeoutError, match="CONNECTION_POOL_EXHAUSTED"):
+        pool.acquire()
+    pool.release(held)
+    pool.close()
+
+
+def test_pool_hands_connection_to_waiting_thread(db_path) -> None:
+    pool = ConnectionPool(db_path, max_size=1, timeout=5.0)
+    held = pool.acquire()
+    acquired = []
+
+    def worker() -> None:
+        with pool.connection() as db:
+            acquired.append(db)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    pool.release(held)
+    thread.join(timeout=5.0)
+    assert acquired == [held]
+    assert pool.stats().max_wait_seconds > 0
+    pool.close()
+
+
+def test_release_rolls_back_open_transaction(db_path) -> None:
+    pool = ConnectionPool(db_path, max_size=1)
+    db = pool.acquire()
+    db.execute("UPDATE users SET smallest_increment = 5 WHERE id = 1")
+    assert db.in_transaction
+    pool.release(db)
+    with pool.connection() as db:
+        assert not db.in_transaction
+        value = db.execute("SELECT smallest_increment FROM users WHERE id = 1").fetchone()[0]
+    assert value == 2.5
+    pool.close()
+
+
+def test_read_write_pool_enables_wal_and_read_only_readers(db_path) -> None:
+    pools = ReadWritePool(db_path, readers=2)
+    with pools.connection(write=True) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with pools.connection() as db:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            db.execute("UPDATE users SET smallest_increment = 5 WHERE id = 1")
+    pools.close()
+
+
+def test_readers_are_not_blocked_by_open_write_transaction(db_path) -> None:
+    pools = ReadWritePool(db_path, readers=1)
+    writer = pools.writer.acquire()
+    writer.execute("UPDATE users SET smallest_increment = 5 WHERE id = 1")
+    with pools.connection() as reader:
+        value = reader.execute("SELECT smallest_increment FROM users WHERE id = 1").fetchone()[0]
+    assert value == 2.5
+    writer.commit()
+    with pools.connection() as reader:
+        value = reader.execute("SELECT smallest_increment FROM users WHERE id = 1").fetchone()[0]
+    assert value == 5
+    pools.writer.release(writer)
+    pools.close()
+
+
+def test_tracer_aggregates_by_shape_and_logs_slow_plans(db_path, caplog) -> None:
+    tracer = SqlTracer(slow_threshold_seconds=0.0)
+    db = get_db_connection(db_path, tracer=tracer)
+    with caplog.at_level(logging.WARNING, logger="db.slow_query"):
+        db.execute("SELECT name FROM exercises WHERE id IN (?, ?)", (1, 2)).fetchall()
+        db.execute("SELECT name FROM exercises WHERE id IN (?, ?, ?)", (1, 2, 3)).fetchall()
+        db.execute("SELECT COUNT(*) FROM exercises WHERE name = 'Squat'").fetchone()
+    db.close()
+
+    stats = {item.statement: item for item in tracer.snapshot()}
+    assert stats["SELECT name FROM exercises WHERE id IN (?...)"].calls == 2
+    assert stats["SELECT COUNT(*) FROM exercises WHERE name = ?"].slow_calls == 1
+    assert "SEARCH exercises USING INTEGER PRIMARY KEY" in caplog.text
+    assert "SCAN exercises" in caplog.text
+
+
+def test_drain_waits_for_checked_out_connections(db_path) -> None:
+    pool = ReadWritePool(db_path, readers=2)
+    held = pool.reader.acquire()
+    assert not pool.drain(timeout=0.01)
+    with pytest.raises(RuntimeError, match="CONNECTION_POOL_CLOSED"):
+        pool.reader.acquire()
+
+    releaser = threading.Timer(0.05, pool.reader.release, args=(held,))
+    releaser.start()
+    assert pool.drain(timeout=5.0)
+    releaser.join()
+    assert pool.reader.stats().size == 0
@@ -0,0 +1,154 @@
+import re
+
+from api.questionnaire import create_questionnaire
+from data.exercises.seed_exercises import (
+    parse_exercise_rows,
+    seed_sqlite,
+    update_exercise_alternatives,
+)
+from domain.exercises.catalog import get_exercise_catalog
+from domain.plans.generator import PlanGenerator
+from domain.plans.swap import list_swap_options
+from domain.plans.swap_graph import get_swap_graph
+from queries.plans import fetch_planned_exercises
+from tests.conftest import LIBRARY_PATH
+
+EXERCISES_TABLE = re.compile(r"\bexercises\b")
+
+
+def test_catalog_pool_filters_by_pattern_and_equipment_in_name_order(db) -> None:
+    catalog = get_exercise_catalog(db)
+    patterns = ["squat", "hinge", "horizontal push", "accessory"]
+    equipment_ids = ["barbell", "dumbbell", "bodyweight"]
+
+    pool = catalog.pool(patterns, equipment_ids)
+
+    expected = sorted(
+        (
+            exercise
+            for exercise in catalog.by_id.values()
+            if exercise.movement_pattern in patterns and exercise.equipment_id in equipment_ids
+        ),
+        key=lambda exercise: exercise.name,
+    )
+    assert pool
+    assert [exercise.id for exercise in pool] == [exercise.id for exercise in expected]
+    assert get_exercise_catalog(db) is catalog
+
+
+def test_plan_generation_and_swap_options_skip_exercise_queries(db) -> None:
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "muscle_gain",
+            "experience_level": "beginner",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    get_exercise_catalog(db)
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        plan_id = PlanGenerator().generate(db, questionnaire_id)
+        options = list_swap_options(db, plan_id, 0, 1)
+    finally:
+        db.set_trace_callback(None)
+
+    assert options
+    assert [statement for statement in statements if EXERCISES_TABLE.search(statement)] == []
+
+
+def test_swap_options_come_from_graph_with_suggestions_first(db) -> None:
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "strength",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    plan_id = PlanGenerator().generate(db, questionnaire_id)
+    list_swap_options(db, plan_id, 0, 1)
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        options = list_swap_options(db, plan_id, 0, 1)
+    finally:
+        db.set_trace_callback(None)
+
+    assert len(statements) == 1
+    planned = next(
+        row
+        for row in fetch_planned_exercises(db, [plan_id])[plan_id]
+        if (row.day_index, row.sequence) == (0, 1)
+    )
+    catalog = get_exercise_catalog(db)
+    graph = get_swap_graph(catalog)
+    assert get_swap_graph(catalog) is graph
+    suggested = graph.suggested[planned.exercise_id]
+    assert suggested
+    flags = [option.suggested for option in options]
+    assert flags == sorted(flags, reverse=True)
+    assert {option.id for option in options if option.suggested} <= suggested
+    assert planned.exercise_id not in {option.id for option in options}
+
+
+def test_reseed_invalidates_cached_catalog(db, db_path) -> None:
+    rows = parse_exercise_rows(LIBRARY_PATH.read_text(encoding="utf-8").splitlines())
+    before = get_exercise_catalog(db)
+
+    seed_sqlite(db_path, rows[:10], batch_size=50)
+    after = get_exercise_catalog(db)
+
+    assert after.version != before.version
+    assert len(after.by_id) == 10
+    assert get_exercise_catalog(db) is after
+
+
+def test_alternatives_backfill_by_name_once_exercises_are_referenced(db, db_path) -> None:
+    rows = parse_exercise_rows(LIBRARY_PATH.read_text(encoding="utf-8").splitlines())
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "strength",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    PlanGenerator().generate(db, questionnaire_id)
+    with db:
+        db.execute("UPDATE exercises SET alternatives = ''")
+    before = get_exercise_catalog(db)
+
+    assert update_exercise_alternatives(db_path, rows) > 0
+
+    after = get_exercise_catalog(db)
+    assert after.version != before.version
+    expected = {row[0]: row[6] for row in rows}
+    assert all(exercise.alternatives == expected[exercise.name] for exercise in after.by_id.values())
+    assert update_exercise_alternatives(db_path, rows) == 0
+    assert get_exercise_catalog(db).version == after.version
+
+
+def test_candidate_index_partitions_pool_by_pattern(db) -> None:
+    catalog = get_exercise_catalog(db)
+    equipment_ids = {"bodyweight", "band", "dumbbell"}
+    candidates = catalog.candidates(equipment_ids)
+
+    for pattern in ("squat", "horizontal push", "accessory"):
+        pool = catalog.pool([pattern], equipment_ids)
+        indexed = candidates.pattern(pattern)
+        assert list(indexed.all) == pool
+        assert list(indexed.compound) == [e for e in pool if e.category.lower() == "compound"]
+        assert indexed.eligible("advanced") == indexed.compound + indexed.accessory
+    assert candidates.pattern("unknown").all == ()
+    assert catalog.candidates(sorted(equipment_ids)) is candidates
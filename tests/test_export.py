@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+
+import pytest
+
+from api.export import SESSION_CSV_COLUMNS, SET_CSV_COLUMNS, export_history
+from api.plans import generate_plan
+from api.questionnaire import create_questionnaire
+from queries.sessions import iter_session_history
+
+
+def _create_plan(db) -> int:
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "strength",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    return generate_plan(db, {"questionnaire_id": questionnaire_id})
+
+
+def test_ndjson_export_has_one_line_per_session(db, log_session) -> None:
+    first = log_session(1, "2024-01-01T10:00:00Z", [10, 9], is_initial_load=True)
+    second = log_session(2, "2024-01-02T10:00:00Z", [8, 8, 8], weight=60.0)
+
+    lines = list(export_history(db, 1))
+    sessions = [json.loads(line) for line in lines]
+
+    assert all(line.endswith("\n") for line in lines)
+    assert [session["id"] for session in sessions] == [first, second]
+    assert [set_log["reps"] for set_log in sessions[0]["set_logs"]] == [10, 9]
+    assert sessions[0]["set_logs"][0]["is_initial_load"] is True
+    assert sessions[1]["set_logs"][0]["weight"] == 60.0
+    assert [json.loads(line)["id"] for line in export_history(db, 1, since="2024-01-02")] == [
+        second
+    ]
+
+
+def test_csv_export_has_one_row_per_set(db, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 9])
+    log_session(2, "2024-01-02T10:00:00Z", [8])
+
+    rows = list(csv.reader(io.StringIO("".join(export_history(db, 1, export_format="csv")))))
+
+    assert rows[0] == SESSION_CSV_COLUMNS + SET_CSV_COLUMNS
+    assert [row[SESSION_CSV_COLUMNS.index("performed_at")] for row in rows[1:]] == [
+        "2024-01-01T10:00:00Z",
+        "2024-01-01T10:00:00Z",
+        "2024-01-02T10:00:00Z",
+    ]
+    with pytest.raises(ValueError, match="INVALID_EXPORT_FORMAT"):
+        export_history(db, 1, export_format="xml")
+
+
+def test_history_iterator_streams_in_fetch_sized_batches(db, log_session) -> None:
+    for day in range(1, 6):
+        log_session(1, f"2024-01-0{day}T10:00:00Z", [10, 10, 10])
+
+    sessions = iter_session_history(db, 1, fetch_size=2)
+    first = next(sessions)
+
+    assert len(first["set_logs"]) == 3
+    assert len(list(sessions)) == 4
+
+
+def test_history_reports_the_lowest_linked_plan(db, log_session) -> None:
+    plan_ids = [_create_plan(db), _create_plan(db)]
+    linked = log_session(1, "2024-01-01T10:00:00Z", [10, 9])
+    unlinked = log_session(1, "2024-01-02T10:00:00Z", [10])
+    with db:
+        db.executemany(
+            "INSERT INTO workout_session_plans (session_id, plan_id, day_index) VALUES (?, ?, ?)",
+            [(linked, plan_ids[1], 2), (linked, plan_ids[0], 1)],
+        )
+
+    sessions = list(iter_session_history(db, 1))
+
+    assert [(session["id"], session["plan_id"], session["day_index"]) for session in sessions] == [
+        (linked, plan_ids[0], 1),
+        (unlinked, None, None),
+    ]
+    assert len(sessions[0]["set_logs"]) == 2
@@ -0,0 +1,74 @@
+from api.workouts import create_session
+from db.connection import get_db_connection
+from domain.workouts.history import (
+    clear_exercise_history_cache,
+    exercise_history_cache_stats,
+    get_exercise_history,
+)
+from queries.exercise_history import fetch_exercise_history
+from server.app import create_app
+from server.payloads import user_etag
+
+
+def test_history_is_cached_until_the_user_logs_a_session(db, log_session) -> None:
+    clear_exercise_history_cache()
+    log_session(1, "2024-01-01T10:00:00Z", [8, 8, 8])
+    log_session(2, "2024-01-01T10:00:00Z", [8, 8, 8])
+    get_exercise_history(db, 1, 1)
+    get_exercise_history(db, 1, 2)
+
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        cached = get_exercise_history(db, 1, 1)
+    finally:
+        db.set_trace_callback(None)
+    assert len(statements) == 1
+    assert cached == fetch_exercise_history(db, 1, 1)
+
+    log_session(1, "2024-01-03T10:00:00Z", [9, 9, 9], weight=105.0)
+    assert get_exercise_history(db, 1, 1) == fetch_exercise_history(db, 1, 1)
+    assert len(get_exercise_history(db, 1, 1)["recent_sessions"]) == 2
+    get_exercise_history(db, 1, 2)
+
+    stats = exercise_history_cache_stats()
+    assert (stats.hits, stats.misses) == (2, 4)
+    assert stats.size == 4
+
+
+def test_history_body_matches_etag_after_another_connection_writes(db_path, db) -> None:
+    clear_exercise_history_cache()
+    client = create_app(db_path).test_client()
+    before = client.get("/exercises/1/history")
+    assert before.get_json()["recent_sessions"] == []
+
+    # Another worker: its own connection, and none of this process's cache.
+    writer = get_db_connection(db_path)
+    try:
+        create_session(
+            writer,
+            {
+                "user_id": 1,
+                "performed_at": "2024-01-01T10:00:00Z",
+                "completion_status": "completed",
+                "set_logs": [
+                    {
+                        "exercise_id": 1,
+                        "set_number": 1,
+                        "reps": 8,
+                        "weight": 100.0,
+                        "rpe": 8.0,
+                        "rest_seconds": 90,
+                        "is_initial_load": False,
+                    },
+                ],
+            },
+        )
+    finally:
+        writer.close()
+
+    after = client.get("/exercises/1/history", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] == f'"{user_etag(db, 1)}"'
+    assert after.get_json() == fetch_exercise_history(db, 1, 1)
+    assert len(after.get_json()["recent_sessions"]) == 1
@@ -0,0 +1,140 @@
+import gzip
+import json
+import sqlite3
+
+from api.plans import generate_plan, get_swap_options, swap_plan_exercise
+from api.questionnaire import create_questionnaire
+from domain.plans.snapshots import build_plan_payload, refresh_plan_snapshots
+from queries.catalog import bump_catalog_version
+from queries.snapshots import fetch_plan_snapshot, fetch_stale_plan_ids
+import server.payloads
+from server.app import create_app
+from server.payloads import fetch_plan_body
+
+
+def _create_plan(db) -> int:
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "strength",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    return generate_plan(db, {"questionnaire_id": questionnaire_id})
+
+
+def test_plan_etag_revalidates_until_swap(db_path, db) -> None:
+    plan_id = _create_plan(db)
+    app = create_app(db_path)
+    client = app.test_client()
+
+    first = client.get(f"/plans/{plan_id}")
+    etag = first.headers["ETag"]
+    # The stored snapshot is byte-for-byte what the app's encoder produces.
+    assert first.data == app.json.encode(build_plan_payload(db, plan_id))
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    cached = client.get(f"/plans/{plan_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.data == b""
+
+    option = get_swap_options(db, plan_id, 0, 1)[0]
+    swap_plan_exercise(
+        db, {"plan_id": plan_id, "day_index": 0, "sequence": 1, "exercise_id": option["id"]}
+    )
+    changed = client.get(f"/plans/{plan_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_plan_reads_serve_the_snapshot_rewritten_by_swaps(db) -> None:
+    plan_id = _create_plan(db)
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        _etag, body = fetch_plan_body(db, plan_id)
+    finally:
+        db.set_trace_callback(None)
+    assert len(statements) == 1
+    assert json.loads(body) == build_plan_payload(db, plan_id)
+
+    option = get_swap_options(db, plan_id, 0, 1)[0]
+    swap_plan_exercise(
+        db, {"plan_id": plan_id, "day_index": 0, "sequence": 1, "exercise_id": option["id"]}
+    )
+    _etag, body = fetch_plan_body(db, plan_id)
+    assert json.loads(body)["workouts"][0]["exercises"][0]["exercise_id"] == option["id"]
+
+    # A stale snapshot (here: catalog stamp moved) is bypassed, not served.
+    db.execute("UPDATE plan_snapshots SET catalog_version = 'old' WHERE plan_id = ?", (plan_id,))
+    db.commit()
+    _etag, body = fetch_plan_body(db, plan_id)
+    assert json.loads(body) == build_plan_payload(db, plan_id)
+
+
+def test_history_etags_change_when_a_session_is_logged(db_path, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [8, 8, 8])
+    client = create_app(db_path).test_client()
+    urls = ["/workouts/sessions?user_id=1", "/exercises/1/history?user_id=1"]
+    etags = [client.get(url).headers["ETag"] for url in urls]
+    for url, etag in zip(urls, etags):
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    log_session(1, "2024-01-03T10:00:00Z", [9, 9, 9])
+    for url, etag in zip(urls, etags):
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_large_json_is_gzipped_with_a_weak_etag(db_path, db) -> None:
+    plan_id = _create_plan(db)
+    client = create_app(db_path).test_client()
+
+    plain = client.get(f"/plans/{plan_id}")
+    compressed = client.get(f"/plans/{plan_id}", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers["ETag"] == "W/" + plain.headers["ETag"]
+
+    revalidated = client.get(
+        f"/plans/{plan_id}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'http_response_size_bytes_count{endpoint="/plans/<int:plan_id>",method="GET"} 3' in metrics
+
+
+def test_user_version_errors_return_json(db_path, monkeypatch) -> None:
+    def fail(_db, _user_id):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(server.payloads, "fetch_user_data_version", fail)
+    client = create_app(db_path).test_client()
+
+    for path in ("/workouts/sessions", "/exercises/1/history"):
+        response = client.get(path)
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "database is locked"}
+
+
+def test_refresh_rewrites_missing_and_stale_plan_snapshots(db) -> None:
+    plan_ids = [_create_plan(db), _create_plan(db)]
+    with db:
+        db.execute("DELETE FROM plan_snapshots WHERE plan_id = ?", (plan_ids[0],))
+    assert fetch_stale_plan_ids(db) == [plan_ids[0]]
+    with db:
+        bump_catalog_version(db)
+    assert fetch_stale_plan_ids(db) == plan_ids
+
+    assert refresh_plan_snapshots(db, batch_size=1) == 2
+
+    assert fetch_stale_plan_ids(db) == []
+    for plan_id in plan_ids:
+        snapshot = fetch_plan_snapshot(db, plan_id)
+        assert json.loads(snapshot.payload) == build_plan_payload(db, plan_id)
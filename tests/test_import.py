@@ -0,0 +1,78 @@
+import json
+
+from api.export import export_history
+from api.workouts import import_sessions, iter_ndjson_payloads
+from domain.progression.state import check_progression_state
+from queries.sessions import iter_session_history
+
+
+def _session(performed_at: str, exercise_id: int = 1, reps: int = 10, **overrides) -> dict:
+    payload = {
+        "user_id": 1,
+        "performed_at": performed_at,
+        "completion_status": "completed",
+        "set_logs": [
+            {
+                "exercise_id": exercise_id,
+                "set_number": set_number,
+                "reps": reps,
+                "weight": 100.0,
+                "rpe": 8.0,
+                "rest_seconds": 90,
+            }
+            for set_number in (1, 2, 3)
+        ],
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_import_reports_per_record_errors_without_aborting(db) -> None:
+    missing_field = _session("2024-01-02T10:00:00Z")
+    del missing_field["performed_at"]
+    lines = [
+        json.dumps(_session("2024-01-01T10:00:00Z")),
+        json.dumps(missing_field),
+        "{not json",
+        json.dumps(_session("2024-01-03T10:00:00Z", exercise_id=999_999)),
+        json.dumps(_session("2024-01-04T10:00:00Z", completion_status="skipped")),
+        "",
+        json.dumps(_session("2024-01-05T10:00:00Z", exercise_id=2, user_id=42)),
+        json.dumps(_session("2024-01-06T10:00:00Z", exercise_id=2)),
+        json.dumps(_session("2024-01-07T10:00:00Z", user_id=[1])),
+        json.dumps(_session("2024-01-08T10:00:00Z", exercise_id={"id": 1})),
+    ]
+
+    result = import_sessions(db, iter_ndjson_payloads(lines), chunk_size=2)
+
+    assert result.imported == 2
+    assert [(error.index, error.error) for error in result.errors] == [
+        (1, "performed_at is required"),
+        (2, "invalid JSON: Expecting property name enclosed in double quotes"),
+        (3, "INVALID_EXERCISE_ID"),
+        (4, "set_logs must be empty for skipped sessions"),
+        (5, "INVALID_USER_ID"),
+        (7, "user_id must be an integer"),
+        (8, "exercise_id must be an integer"),
+    ]
+    stored = [session["performed_at"] for session in iter_session_history(db, 1)]
+    assert stored == ["2024-01-01T10:00:00Z", "2024-01-06T10:00:00Z"]
+    assert check_progression_state(db) == []
+
+
+def test_exported_history_imports_back(db, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 10, 10], is_initial_load=True)
+    log_session(1, "2024-01-03T10:00:00Z", [12, 12, 10])
+    exported = list(export_history(db, 1))
+    with db:
+        db.execute("DELETE FROM exercise_progression_state")
+        db.execute("DELETE FROM personal_records")
+        db.execute("DELETE FROM set_logs")
+        db.execute("DELETE FROM workout_sessions")
+
+    result = import_sessions(db, iter_ndjson_payloads(exported))
+
+    assert result.errors == []
+    reimported = [json.dumps({**session, "id": None}) for session in iter_session_history(db, 1)]
+    assert reimported == [json.dumps({**json.loads(line), "id": None}) for line in exported]
+    assert check_progression_state(db) == []
@@ -0,0 +1,27 @@
+from server.app import create_app
+
+
+def test_requests_get_server_timing_and_metrics(db_path, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [8, 8, 8])
+    client = create_app(db_path).test_client()
+
+    response = client.get("/progression/recommendations?user_id=1&exercise_id=1")
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "total;dur=" in timing
+    assert client.get("/progression/recommendations?user_id=1").status_code == 400
+
+    body = client.get("/metrics").get_data(as_text=True)
+    route = 'endpoint="/progression/recommendations",method="GET"'
+    assert f"http_request_duration_seconds_count{{{route}}} 2" in body
+    assert f'http_requests_total{{{route},status="200"}} 1' in body
+    assert f'http_request_errors_total{{{route},status_class="4xx"}} 1' in body
+    statements = next(
+        line
+        for line in body.splitlines()
+        if line.startswith(f"http_request_sql_statements_total{{{route}}}")
+    )
+    assert int(statements.rsplit(" ", 1)[1]) > 0
+    assert 'db_pool_checkouts_total{pool="reader"}' in body
+    assert "plan_skeleton_cache_lookups_total" in body
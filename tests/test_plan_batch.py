@@ -0,0 +1,58 @@
+from api.plans import generate_plan
+from api.questionnaire import create_questionnaire
+from domain.plans.batch import regenerate_all_plans
+from queries.catalog import bump_catalog_version
+from queries.snapshots import fetch_stale_plan_ids
+
+QUESTIONNAIRE = {
+    "user_id": 1,
+    "goals": "strength",
+    "experience_level": "intermediate",
+    "equipment_available": "home_gym",
+    "smallest_increment": 2.5,
+    "schedule_days": 3,
+}
+
+
+def _plan_count(db) -> int:
+    return db.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+
+def test_dry_run_reports_diffs_without_writing(db, db_path) -> None:
+    planned_id = create_questionnaire(db, QUESTIONNAIRE)
+    plan_id = generate_plan(db, {"questionnaire_id": planned_id})
+    unplanned_id = create_questionnaire(db, {**QUESTIONNAIRE, "schedule_days": 4})
+    db.execute(
+        "UPDATE planned_exercises SET target_sets = 5 WHERE plan_id = ? AND day_index = 0 AND sequence = 1",
+        (plan_id,),
+    )
+    db.commit()
+    results = []
+
+    progress = regenerate_all_plans(db_path, dry_run=True, workers=1, on_result=results.append)
+
+    assert (progress.processed, progress.changed, progress.written) == (2, 2, 0)
+    by_id = {result.questionnaire_id: result for result in results}
+    assert [(c.field, c.existing, c.proposed) for c in by_id[planned_id].changes] == [
+        ("target_sets", 5, 3)
+    ]
+    assert by_id[unplanned_id].existing_plan_id is None
+    assert _plan_count(db) == 1
+
+
+def test_pooled_run_writes_only_changed_plans(db, db_path) -> None:
+    questionnaire_ids = [
+        create_questionnaire(db, {**QUESTIONNAIRE, "schedule_days": days}) for days in (2, 3, 4)
+    ]
+    generate_plan(db, {"questionnaire_id": questionnaire_ids[0]})
+
+    progress = regenerate_all_plans(db_path, workers=2, chunk_size=1, write_batch_size=1)
+
+    assert (progress.processed, progress.changed, progress.written) == (3, 2, 2)
+    assert _plan_count(db) == 3
+    with db:
+        bump_catalog_version(db)
+    rerun = regenerate_all_plans(db_path, workers=2, chunk_size=2)
+    assert (rerun.changed, rerun.written) == (0, 0)
+    # Unchanged plans still get snapshots for the new catalog stamp.
+    assert fetch_stale_plan_ids(db) == []
@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+
+import domain.plans.generator as generator_module
+from api.questionnaire import create_questionnaire
+from domain.cache import CacheStats, LruCache
+from domain.plans.generator import PlanGenerator
+from queries.plans import fetch_latest_performances
+from queries.snapshots import fetch_plan_snapshot
+
+QUESTIONNAIRE = {
+    "user_id": 1,
+    "goals": "muscle_gain",
+    "experience_level": "intermediate",
+    "equipment_available": "full_gym",
+    "smallest_increment": 2.5,
+    "schedule_days": 6,
+}
+
+
+def test_latest_performances_take_the_newest_loaded_session(db, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 10], weight=80.0)
+    log_session(1, "2024-01-03T10:00:00Z", [10, 10], weight=85.0)
+    log_session(2, "2024-01-02T10:00:00Z", [10], weight=40.0)
+    log_session(2, "2024-01-04T10:00:00Z", [], completion_status="skipped")
+
+    bulk = fetch_latest_performances(db, 1, [1, 2, 3])
+
+    assert bulk == {1: 85.0, 2: 40.0}
+
+
+def test_generate_uses_logged_weights_with_one_lookup(db, log_session) -> None:
+    questionnaire_id = create_questionnaire(db, QUESTIONNAIRE)
+    first_plan_id = PlanGenerator().generate(db, questionnaire_id)
+    exercise_id = db.execute(
+        "SELECT exercise_id FROM planned_exercises WHERE plan_id = ? ORDER BY day_index, sequence",
+        (first_plan_id,),
+    ).fetchone()[0]
+    log_session(exercise_id, "2024-01-01T10:00:00Z", [10, 10, 10], weight=62.5)
+
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        plan_id = PlanGenerator().generate(db, questionnaire_id)
+    finally:
+        db.set_trace_callback(None)
+
+    assert sum("weight_rank" in statement for statement in statements) == 1
+    rows = db.execute(
+        "SELECT starting_weight, is_initial_load FROM planned_exercises WHERE plan_id = ? AND exercise_id = ?",
+        (plan_id, exercise_id),
+    ).fetchall()
+    assert rows and all(row == (62.5, 0) for row in rows)
+
+
+def test_repeat_answers_reuse_skeleton_with_per_user_weights(db, log_session) -> None:
+    db.execute("INSERT INTO users (id, email, smallest_increment) VALUES (2, 'other@user', 2.5)")
+    db.commit()
+    cache = LruCache(maxsize=4)
+    generator = PlanGenerator(skeleton_cache=cache)
+    first_plan_id = generator.generate(db, create_questionnaire(db, QUESTIONNAIRE))
+    first = db.execute(
+        "SELECT exercise_id, starting_weight FROM planned_exercises WHERE plan_id = ? ORDER BY day_index, sequence",
+        (first_plan_id,),
+    ).fetchall()
+    log_session(first[0][0], "2024-01-01T10:00:00Z", [10, 10, 10], weight=62.5)
+
+    plan_ids = [
+        generator.generate(db, create_questionnaire(db, {**QUESTIONNAIRE, "user_id": user_id}))
+        for user_id in (1, 2)
+    ]
+    mine, theirs = (
+        db.execute(
+            "SELECT exercise_id, starting_weight FROM planned_exercises WHERE plan_id = ? ORDER BY day_index, sequence",
+            (plan_id,),
+        ).fetchall()
+        for plan_id in plan_ids
+    )
+
+    assert cache.stats() == CacheStats(hits=2, misses=1, size=1, maxsize=4)
+    assert [row[0] for row in mine] == [row[0] for row in theirs] == [row[0] for row in first]
+    assert mine[0][1] == 62.5
+    assert theirs == first
+
+
+def test_plan_and_snapshot_commit_together(db, monkeypatch) -> None:
+    questionnaire_id = create_questionnaire(db, QUESTIONNAIRE)
+
+    def fail(_db, _plan_ids):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(generator_module, "write_plan_snapshots", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        PlanGenerator().generate(db, questionnaire_id)
+    assert db.execute("SELECT COUNT(*) FROM plans").fetchone()[0] == 0
+
+    monkeypatch.undo()
+    plan_id = PlanGenerator().generate(db, questionnaire_id)
+    assert fetch_plan_snapshot(db, plan_id).payload is not None
@@ -0,0 +1,106 @@
+from api.plans import generate_plan, get_swap_options, swap_plan_exercise
+from api.questionnaire import create_questionnaire
+from queries.plans import fetch_planned_exercises
+from queries.snapshots import fetch_plan_snapshot
+from server.app import create_app
+
+
+def _create_plan(db) -> int:
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "strength",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 3,
+        },
+    )
+    return generate_plan(db, {"questionnaire_id": questionnaire_id})
+
+
+def _swap_count(db, plan_id: int) -> int:
+    return db.execute(
+        "SELECT COUNT(*) FROM planned_exercise_swaps WHERE plan_id = ?", (plan_id,)
+    ).fetchone()[0]
+
+
+def test_bulk_swap_applies_every_slot_in_one_version_bump(db_path, db) -> None:
+    plan_id = _create_plan(db)
+    rows = fetch_planned_exercises(db, [plan_id])[plan_id]
+    slots = [(row.day_index, row.sequence) for row in (rows[0], rows[1], rows[-1])]
+    swaps = [
+        {
+            "day_index": day_index,
+            "sequence": sequence,
+            "exercise_id": get_swap_options(db, plan_id, day_index, sequence)[0]["id"],
+        }
+        for day_index, sequence in slots
+    ]
+    version = fetch_plan_snapshot(db, plan_id).data_version
+    client = create_app(db_path).test_client()
+
+    response = client.patch(f"/plans/{plan_id}/swaps", json={"swaps": swaps})
+
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok", "swapped": 3}
+    planned = {
+        (row.day_index, row.sequence): row.exercise_id
+        for row in fetch_planned_exercises(db, [plan_id])[plan_id]
+    }
+    assert [planned[slot] for slot in slots] == [swap["exercise_id"] for swap in swaps]
+    assert _swap_count(db, plan_id) == 3
+    assert fetch_plan_snapshot(db, plan_id).data_version == version + 1
+
+
+def test_bulk_swap_writes_nothing_when_any_slot_is_invalid(db_path, db) -> None:
+    plan_id = _create_plan(db)
+    option = get_swap_options(db, plan_id, 0, 1)[0]
+    before = fetch_planned_exercises(db, [plan_id])[plan_id]
+    client = create_app(db_path).test_client()
+
+    response = client.patch(
+        f"/plans/{plan_id}/swaps",
+        json={
+            "swaps": [
+                {"day_index": 0, "sequence": 1, "exercise_id": option["id"]},
+                {"day_index": 0, "sequence": 2, "exercise_id": 999999},
+            ]
+        },
+    )
+    duplicate = client.patch(
+        f"/plans/{plan_id}/swaps",
+        json={"swaps": [{"day_index": 0, "sequence": 1, "exercise_id": option["id"]}] * 2},
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "INVALID_SWAP_EXERCISE"
+    assert duplicate.get_json()["error"] == "DUPLICATE_SWAP_SLOT"
+    assert fetch_planned_exercises(db, [plan_id])[plan_id] == before
+    assert _swap_count(db, plan_id) == 0
+
+
+def test_swap_to_current_exercise_resets_starting_load(db) -> None:
+    plan_id = _create_plan(db)
+    slot = fetch_planned_exercises(db, [plan_id])[plan_id][0]
+    swap = {
+        "plan_id": plan_id,
+        "day_index": slot.day_index,
+        "sequence": slot.sequence,
+        "exercise_id": slot.exercise_id,
+    }
+    with db:
+        db.execute(
+            """
+            UPDATE planned_exercises SET starting_weight = 123.0
+            WHERE plan_id = ? AND day_index = ? AND sequence = ?
+            """,
+            (plan_id, slot.day_index, slot.sequence),
+        )
+
+    swap_plan_exercise(db, swap)
+
+    after = fetch_planned_exercises(db, [plan_id])[plan_id][0]
+    assert after == slot
+    assert _swap_count(db, plan_id) == 1
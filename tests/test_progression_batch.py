@@ -0,0 +1,45 @@
+from domain.progression.engine import recommend_next_load, recommend_next_loads
+from server.app import create_app
+
+
+def test_batch_matches_single_recommendations(db, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 10, 10], is_initial_load=True)
+    log_session(1, "2024-01-03T10:00:00Z", [12, 11, 10])
+    log_session(1, "2024-01-05T10:00:00Z", [12, 12, 10])
+    log_session(2, "2024-01-02T10:00:00Z", [5, 5, 4])
+    log_session(2, "2024-01-04T10:00:00Z", [5, 4, 4])
+    log_session(3, "2024-01-02T10:00:00Z", [8, 8, 8], manual_audit_flag=True)
+    exercise_ids = [1, 2, 3, 4]
+
+    batch = recommend_next_loads(db, 1, exercise_ids)
+
+    assert list(batch) == exercise_ids
+    for exercise_id in exercise_ids:
+        assert batch[exercise_id] == recommend_next_load(db, 1, exercise_id)
+    assert batch[1].action == "increase"
+    assert batch[2].action == "deload"
+    assert batch[4].action == "start"
+
+
+def test_batch_uses_constant_number_of_queries(db, log_session) -> None:
+    for exercise_id in range(1, 8):
+        log_session(exercise_id, "2024-01-01T10:00:00Z", [10, 10, 10])
+    statements: list[str] = []
+    db.set_trace_callback(statements.append)
+    try:
+        recommend_next_loads(db, 1, list(range(1, 8)))
+    finally:
+        db.set_trace_callback(None)
+    assert len(statements) == 3
+
+
+def test_batch_route_flags_unknown_ids_without_failing_the_rest(db_path, log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 10, 10])
+    client = create_app(db_path).test_client()
+
+    response = client.get("/progression/recommendations/batch?user_id=1&exercise_ids=1,999999")
+
+    assert response.status_code == 200
+    known, unknown = response.get_json()
+    assert known["exercise_id"] == 1 and "action" in known
+    assert unknown == {"exercise_id": 999999, "error": "INVALID_EXERCISE_ID"}
@@ -0,0 +1,118 @@
+from domain.progression.engine import recommend_next_load
+from domain.progression.state import (
+    check_progression_state,
+    compute_progression_states,
+    rebuild_progression_state,
+)
+from domain.progression.records import compute_personal_records
+from queries.exercise_history import fetch_exercise_history
+from queries.personal_records import fetch_personal_records
+from queries.progression_state import fetch_user_progression_states
+from server.payloads import user_etag
+
+
+def _log_history(log_session) -> None:
+    log_session(1, "2024-01-01T10:00:00Z", [10, 10, 10], weight=95.0, is_initial_load=True)
+    log_session(1, "2024-01-03T10:00:00Z", [12, 11, 10])
+    log_session(1, "2024-01-05T10:00:00Z", [12, 12, 10], weight=102.5)
+    log_session(2, "2024-01-04T10:00:00Z", [5, 5, 4])
+    log_session(2, "2024-01-06T10:00:00Z", [5, 4, 4])
+    # Backdated entry lands behind the newest session for exercise 2.
+    log_session(2, "2024-01-02T10:00:00Z", [8, 8, 8], weight=110.0)
+    log_session(3, "2024-01-02T10:00:00Z", [8, 8, 8], manual_audit_flag=True)
+
+
+def test_incremental_state_matches_full_recompute(db, log_session) -> None:
+    _log_history(log_session)
+
+    stored = fetch_user_progression_states(db, 1)
+    expected = compute_progression_states(db, 1, [1, 2, 3])
+
+    assert stored == expected
+    assert stored[1].baseline_established
+    assert stored[1].best_weight == 102.5
+    assert stored[2].best_weight == 110.0
+    assert stored[2].consecutive_misses == 2
+    assert check_progression_state(db) == []
+
+
+def test_personal_records_track_top_three_incrementally(db, log_session) -> None:
+    _log_history(log_session)
+
+    stored = fetch_personal_records(db, 1, [1, 2, 3])
+
+    assert stored == compute_personal_records(db, 1, [1, 2, 3])
+    assert [(r.weight, r.reps) for r in stored[1]] == [(102.5, 12), (102.5, 12), (102.5, 10)]
+    # Equal sets keep the earlier one ahead.
+    assert [r.set_number for r in stored[1][:2]] == [1, 2]
+    assert [r.weight for r in stored[2]] == [110.0, 110.0, 110.0]
+    best_sets = fetch_exercise_history(db, 1, 2)["best_sets"]
+    assert [(s["session_id"], s["set_number"]) for s in best_sets] == [
+        (r.session_id, r.set_number) for r in stored[2]
+    ]
+
+    db.execute("DELETE FROM personal_records WHERE exercise_id = 3")
+    db.commit()
+    assert [m.column for m in check_progression_state(db)] == ["personal_records"]
+    rebuild_progression_state(db)
+    assert check_progression_state(db) == []
+
+
+def test_checker_reports_drift_and_rebuild_repairs_it(db, log_session) -> None:
+    _log_history(log_session)
+    with db:
+        db.execute(
+            "UPDATE exercise_progression_state SET consecutive_misses = 0 WHERE exercise_id = 2"
+        )
+        db.execute("DELETE FROM exercise_progression_state WHERE exercise_id = 3")
+
+    mismatches = check_progression_state(db, user_id=1)
+
+    assert {(mismatch.exercise_id, mismatch.column) for mismatch in mismatches} == {
+        (2, "consecutive_misses"),
+        (3, "row"),
+    }
+    assert rebuild_progression_state(db) == 3
+    assert check_progression_state(db) == []
+
+
+def test_recommendation_reads_materialized_state(db, log_session) -> None:
+    _log_history(log_session)
+    assert recommend_next_load(db, 1, 2).action == "deload"
+
+    with db:
+        db.execute(
+            "UPDATE exercise_progression_state SET consecutive_misses = 0 WHERE exercise_id = 2"
+        )
+
+    assert recommend_next_load(db, 1, 2).action == "hold"
+    rebuild_progression_state(db, user_id=1)
+    assert recommend_next_load(db, 1, 2).action == "deload"
+
+
+def test_history_baseline_reads_state_and_falls_back_to_set_logs(db, log_session) -> None:
+    _log_history(log_session)
+    assert fetch_exercise_history(db, 1, 1)["baseline_established"]
+    assert not fetch_exercise_history(db, 1, 2)["baseline_established"]
+
+    with db:
+        db.execute(
+            """
+            UPDATE exercise_progression_state SET baseline_established = 0
+            WHERE user_id = 1 AND exercise_id = 1
+            """
+        )
+    assert not fetch_exercise_history(db, 1, 1)["baseline_established"]
+
+    with db:
+        db.execute("DELETE FROM exercise_progression_state WHERE user_id = 1")
+    assert fetch_exercise_history(db, 1, 1)["baseline_status"] == "Baseline established"
+
+
+def test_rebuild_changes_the_history_etag(db, log_session) -> None:
+    _log_history(log_session)
+    before = user_etag(db, 1)
+
+    rebuild_progression_state(db, 1)
+
+    assert user_etag(db, 1) != before
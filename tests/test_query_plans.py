@@ -0,0 +1,274 @@
+import inspect
+import re
+import sqlite3
+from typing import Any, Callable
+
+import pytest
+
+import queries.catalog
+import queries.exercise_history
+import queries.personal_records
+import queries.plans
+import queries.progression
+import queries.progression_state
+import queries.sessions
+import queries.snapshots
+import queries.versions
+from api.plans import generate_plan
+from api.questionnaire import create_questionnaire
+from api.workouts import create_session
+from db.connection import get_db_connection
+from db.migrations import apply_migrations, fetch_applied_versions
+
+QUERY_MODULES = [
+    queries.catalog,
+    queries.exercise_history,
+    queries.personal_records,
+    queries.plans,
+    queries.progression,
+    queries.progression_state,
+    queries.sessions,
+    queries.snapshots,
+    queries.versions,
+]
+WRITE_ONLY_FUNCTIONS = {
+    "insert_workout_plan",
+    "apply_planned_exercise_swaps",
+    "upsert_plan_snapshot",
+    "replace_personal_records",
+    "delete_personal_records",
+    "upsert_progression_states",
+    "delete_progression_states",
+    "bump_catalog_version",
+    "bump_plan_data_version",
+    "bump_user_data_versions",
+}
+# Pure helpers that never touch the database.
+NON_QUERY_FUNCTIONS = {"encode_cursor", "decode_cursor"}
+# Maintenance queries that visit every user or plan by design.
+FULL_SCAN_FUNCTIONS = {
+    "fetch_user_ids_with_sessions",
+    "fetch_all_exercises",
+    "count_questionnaire_responses",
+    "iter_questionnaire_responses",
+    "fetch_stale_plan_ids",
+}
+
+
+class RecordingConnection:
+    """Delegate to a real connection while recording every statement run."""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+        self.statements: list[tuple[str, Any]] = []
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        self.statements.append((sql, parameters))
+        return self._connection.execute(sql, parameters)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+def _table_aliases(db: sqlite3.Connection, sql: str) -> dict[str, str]:
+    tables = {
+        row[0]
+        for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    aliases = {table: table for table in tables}
+    for table, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql):
+        if table in tables and alias and alias.upper() not in {"ON", "WHERE", "JOIN"}:
+            aliases[alias] = table
+    return aliases
+
+
+def _full_scans(db: sqlite3.Connection, sql: str, parameters: Any) -> list[str]:
+    """Return plan steps that scan a real table instead of searching an index.
+
+    A materialized CTE or subquery may be scanned as the outermost loop of
+    its level, where it runs once; scanned under an earlier loop it is
+    rescanned for every outer row, so that is flagged too.
+    """
+    aliases = _table_aliases(db, sql)
+    rows = db.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    scans = []
+    outer_loops: set[int] = set()
+    for _id, parent, _notused, detail in rows:
+        match = re.match(r"(SCAN|SEARCH) (\w+)", detail)
+        if match is None:
+            continue
+        step, name = match.groups()
+        if step == "SCAN" and (name in aliases or parent in outer_loops):
+            scans.append(detail)
+        outer_loops.add(parent)
+    return scans
+
+
+@pytest.fixture
+def populated_db(db_path):
+    db = get_db_connection(db_path)
+    questionnaire_id = create_questionnaire(
+        db,
+        {
+            "user_id": 1,
+            "goals": "muscle_gain",
+            "experience_level": "intermediate",
+            "equipment_available": "full_gym",
+            "smallest_increment": 2.5,
+            "schedule_days": 4,
+        },
+    )
+    plan_id = generate_plan(db, {"questionnaire_id": questionnaire_id})
+    exercise_id = db.execute(
+        "SELECT exercise_id FROM planned_exercises WHERE plan_id = ? ORDER BY day_index, sequence",
+        (plan_id,),
+    ).fetchone()[0]
+    for day in range(1, 4):
+        create_session(
+            db,
+            {
+                "user_id": 1,
+                "performed_at": f"2024-01-0{day}T10:00:00Z",
+                "completion_status": "completed",
+                "plan_id": plan_id,
+                "day_index": 0,
+                "set_logs": [
+                    {
+                        "exercise_id": exercise_id,
+                        "set_number": set_number,
+                        "reps": 10,
+                        "weight": 100.0,
+                        "rpe": 8.0,
+                        "rest_seconds": 90,
+                    }
+                    for set_number in (1, 2, 3)
+                ],
+            },
+        )
+    yield db, {"plan_id": plan_id, "questionnaire_id": questionnaire_id, "exercise_id": exercise_id}
+    db.close()
+
+
+def _query_cases(ids: dict[str, int]) -> dict[str, Callable[[Any], Any]]:
+    plan_id = ids["plan_id"]
+    exercise_id = ids["exercise_id"]
+    return {
+        "fetch_exercise_history": lambda db: queries.exercise_history.fetch_exercise_history(
+            db, 1, exercise_id
+        ),
+        "fetch_questionnaire_response": lambda db: queries.plans.fetch_questionnaire_response(
+            db, ids["questionnaire_id"]
+        ),
+        "fetch_plan_summary": lambda db: queries.snapshots.fetch_plan_summary(db, plan_id),
+        "fetch_plan_snapshot": lambda db: queries.snapshots.fetch_plan_snapshot(db, plan_id),
+        "fetch_stale_plan_ids": lambda db: queries.snapshots.fetch_stale_plan_ids(db),
+        "fetch_personal_records": lambda db: queries.personal_records.fetch_personal_records(
+            db, 1, [exercise_id, exercise_id + 1]
+        ),
+        "fetch_top_sets_for_exercises": (
+            lambda db: queries.personal_records.fetch_top_sets_for_exercises(
+                db, 1, [exercise_id, exercise_id + 1], 3
+            )
+        ),
+        "fetch_swap_slot": lambda db: queries.plans.fetch_swap_slot(db, plan_id, 0, 1),
+        "fetch_swap_slots": lambda db: queries.plans.fetch_swap_slots(
+            db, plan_id, [(0, 1), (0, 2)]
+        ),
+        "fetch_planned_exercises": lambda db: queries.plans.fetch_planned_exercises(
+            db, [plan_id, plan_id + 1]
+        ),
+        "fetch_latest_generated_plan_ids": (
+            lambda db: queries.plans.fetch_latest_generated_plan_ids(
+                db, [ids["questionnaire_id"], ids["questionnaire_id"] + 1]
+            )
+        ),
+        "count_questionnaire_responses": (
+            lambda db: queries.plans.count_questionnaire_responses(db)
+        ),
+        "iter_questionnaire_responses": lambda db: list(
+            queries.plans.iter_questionnaire_responses(db)
+        ),
+        "fetch_catalog_version": lambda db: queries.catalog.fetch_catalog_version(db),
+        "fetch_user_data_version": lambda db: queries.versions.fetch_user_data_version(db, 1),
+        "fetch_all_exercises": lambda db: queries.catalog.fetch_all_exercises(db),
+        "fetch_latest_performances": lambda db: queries.plans.fetch_latest_performances(
+            db, 1, [exercise_id, exercise_id + 1]
+        ),
+        "fetch_user_smallest_increment": lambda db: queries.plans.fetch_user_smallest_increment(
+            db, 1
+        ),
+        "fetch_recent_sessions_for_exercises": (
+            lambda db: queries.exercise_history.fetch_recent_sessions_for_exercises(
+                db, 1, [exercise_id, exercise_id + 1], limit_sessions=3
+            )
+        ),
+        "fetch_progression_states": lambda db: queries.progression_state.fetch_progression_states(
+            db, 1, [exercise_id, exercise_id + 1]
+        ),
+        "fetch_user_progression_states": (
+            lambda db: queries.progression_state.fetch_user_progression_states(db, 1)
+        ),
+        "fetch_logged_exercise_ids": (
+            lambda db: queries.progression_state.fetch_logged_exercise_ids(db, 1)
+        ),
+        "fetch_best_sets_for_exercises": (
+            lambda db: queries.progression_state.fetch_best_sets_for_exercises(
+                db, 1, [exercise_id, exercise_id + 1]
+            )
+        ),
+        "fetch_baseline_exercise_ids": (
+            lambda db: queries.progression_state.fetch_baseline_exercise_ids(
+                db, 1, [exercise_id, exercise_id + 1]
+            )
+        ),
+        "fetch_session_page": lambda db: queries.sessions.fetch_session_page(
+            db,
+            1,
+            limit=2,
+            before=queries.sessions.SessionCursor("2024-01-03T10:00:00Z", 10**6),
+            since="2024-01-01",
+        ),
+        "iter_session_history": lambda db: list(
+            queries.sessions.iter_session_history(db, 1, since="2024-01-01")
+        ),
+        "fetch_user_ids_with_sessions": (
+            lambda db: queries.progression_state.fetch_user_ids_with_sessions(db)
+        ),
+    }
+
+
+def test_every_read_query_has_a_plan_case(populated_db) -> None:
+    _db, ids = populated_db
+    cases = _query_cases(ids)
+    public_functions = {
+        name
+        for module in QUERY_MODULES
+        for name, member in inspect.getmembers(module, inspect.isfunction)
+        if member.__module__ == module.__name__ and not name.startswith("_")
+    }
+    assert public_functions - WRITE_ONLY_FUNCTIONS - NON_QUERY_FUNCTIONS <= cases.keys()
+
+
+def test_read_queries_use_indexes(populated_db) -> None:
+    db, ids = populated_db
+    failures = []
+    for name, call in _query_cases(ids).items():
+        recorder = RecordingConnection(db)
+        call(recorder)
+        assert recorder.statements, name
+        if name in FULL_SCAN_FUNCTIONS:
+            continue
+        for sql, parameters in recorder.statements:
+            scans = _full_scans(db, sql, parameters)
+            if scans:
+                failures.append(f"{name}: {scans}")
+    assert not failures, "\n".join(failures)
+
+
+def test_apply_migrations_is_idempotent(db_path) -> None:
+    assert apply_migrations(db_path) == []
+    connection = sqlite3.connect(db_path)
+    try:
+        assert {2, 3, 4, 5, 6, 7, 8, 9, 10} <= fetch_applied_versions(connection)
+    finally:
+        connection.close()
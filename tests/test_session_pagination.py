@@ -0,0 +1,41 @@
+import pytest
+
+from queries.sessions import decode_cursor, fetch_session_page
+
+
+def _walk(db, **filters) -> list[int]:
+    seen: list[int] = []
+    cursor = None
+    while True:
+        page = fetch_session_page(db, 1, limit=2, before=cursor, **filters)
+        seen.extend(session["id"] for session in page.sessions)
+        if page.next_cursor is None:
+            return seen
+        cursor = decode_cursor(page.next_cursor)
+
+
+def test_keyset_pages_cover_every_session_once(db, log_session) -> None:
+    # Two sessions share a timestamp so the id tie-breaker is exercised.
+    ids = [
+        log_session(1, "2024-01-01T10:00:00Z", [10, 10]),
+        log_session(1, "2024-01-02T10:00:00Z", [10, 10]),
+        log_session(2, "2024-01-02T10:00:00Z", [10, 10]),
+        log_session(1, "2024-01-03T10:00:00Z", [10, 10]),
+        log_session(1, "2024-01-04T10:00:00Z", [10, 10]),
+    ]
+
+    assert _walk(db) == [ids[4], ids[3], ids[2], ids[1], ids[0]]
+    assert _walk(db, since="2024-01-02", until="2024-01-04") == [ids[3], ids[2], ids[1]]
+
+    first_page = fetch_session_page(db, 1, limit=2)
+    assert [len(session["set_logs"]) for session in first_page.sessions] == [2, 2]
+    newer = fetch_session_page(db, 1, limit=2, after=decode_cursor(first_page.next_cursor))
+    assert [session["id"] for session in newer.sessions] == [ids[4]]
+    assert newer.next_cursor is not None
+
+
+def test_rejects_bad_paging_arguments(db) -> None:
+    with pytest.raises(ValueError, match="INVALID_CURSOR"):
+        decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError, match="INVALID_LIMIT"):
+        fetch_session_page(db, 1, limit=0)
@@ -0,0 +1,18 @@
+from domain.exercises import catalog as catalog_module
+from server.wsgi import ServerConfig, create_production_app, shutdown
+
+
+def test_production_app_warms_catalog_and_drains(db_path, monkeypatch) -> None:
+    monkeypatch.setattr(catalog_module, "_cached_catalog", None)
+    config = ServerConfig.from_env({"WORKOUT_DB_PATH": str(db_path), "WORKOUT_THREADS": "2"})
+    app = create_production_app(config)
+
+    assert not app.debug
+    warmed = catalog_module._cached_catalog
+    assert warmed is not None
+    assert len(warmed._candidate_indexes) == 4
+    assert app.extensions["db_pool"].reader.max_size == 2
+
+    assert app.test_client().get("/exercises/1/history?user_id=1").status_code == 200
+    assert shutdown(app, timeout=1.0)
+    assert app.extensions["db_pool"].stats()["reader"].size == 0
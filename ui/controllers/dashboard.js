@@ -139,7 +139,7 @@ class DashboardController {
       return;
     }
     try {
-      const response = await fetch(`/workouts/sessions?user_id=${userId}`);
+      const response = await fetch(`/workouts/sessions?user_id=${userId}&limit=1`);
       if (!response.ok) {
         return;
       }
@@ -1,5 +1,7 @@
 import { ViewManager } from "../js/view-manager.js";
 
+const HISTORY_PAGE_SIZE = 20;
+
 class HistoryController {
   constructor({ store, viewManager } = {}) {
     this.store = store;
@@ -13,6 +15,7 @@ class HistoryController {
     this.trendLabel = document.querySelector("[data-history-trend]");
     this.volumeBars = document.querySelector("[data-history-volume-bars]");
     this.sessions = [];
+    this.nextCursor = null;
     this.exercises = [];
     this.activeExerciseId = null;
   }
@@ -30,6 +33,11 @@ class HistoryController {
 
   bindEvents() {
     this.root.addEventListener("click", (event) => {
+      if (event.target.closest("[data-history-load-more]")) {
+        this.loadSessions({ append: true });
+        return;
+      }
+
       const exerciseButton = event.target.closest("[data-history-exercise]");
       if (exerciseButton) {
         const exerciseId = Number(exerciseButton.dataset.historyExercise ?? 0);
@@ -47,27 +55,46 @@ class HistoryController {
     });
   }
 
-  async loadSessions() {
+  async loadSessions({ append = false } = {}) {
     if (!this.sessionList) {
       return;
     }
+    if (append && !this.nextCursor) {
+      return;
+    }
     this.setStatus("History loading...", false);
     const userId = Number(this.store?.getState?.()?.onboardingData?.user_id ?? 1);
-    const query = Number.isFinite(userId) ? `?user_id=${userId}` : "";
+    const params = new URLSearchParams({ limit: String(HISTORY_PAGE_SIZE) });
+    if (Number.isFinite(userId)) {
+      params.set("user_id", String(userId));
+    }
+    if (append) {
+      params.set("before", this.nextCursor);
+    }
 
     try {
-      const response = await fetch(`/workouts/sessions${query}`);
+      const response = await fetch(`/workouts/sessions?${params}`);
       if (!response.ok) {
         const text = await response.text();
         throw new Error(text || "History request failed");
       }
       const payload = await response.json();
-      this.sessions = Array.isArray(payload) ? payload : payload?.sessions ?? [];
+      const page = Array.isArray(payload) ? payload : payload?.sessions ?? [];
+      this.sessions = append ? [...this.sessions, ...page] : page;
+      this.nextCursor = Array.isArray(payload) ? null : payload?.next_cursor ?? null;
       this.renderSessions();
       this.buildExerciseList();
       this.setStatus("History synchronized.", false);
     } catch (error) {
+      if (append) {
+        this.setStatus(
+          `History fetch failed: ${error?.message ?? "Unknown error"}`,
+          true,
+        );
+        return;
+      }
       this.sessions = [];
+      this.nextCursor = null;
       this.renderSessions();
       this.buildExerciseList();
       this.setStatus(
@@ -96,7 +123,7 @@ class HistoryController {
       return;
     }
 
-    this.sessionList.innerHTML = this.sessions
+    const sessionEntries = this.sessions
       .map((session) => {
         const sessionId = session.id ?? session.session_id ?? session.sessionId;
         const dateLabel = this.formatDate(
@@ -120,6 +147,14 @@ class HistoryController {
         `;
       })
       .join("");
+    const loadMore = this.nextCursor
+      ? `
+          <button class="history-entry" type="button" data-history-load-more>
+            <span class="history-entry__title">Load older sessions</span>
+          </button>
+        `
+      : "";
+    this.sessionList.innerHTML = sessionEntries + loadMore;
   }
 
   buildExerciseList() {
@@ -229,40 +229,59 @@ class SessionController {
     const userId = Number(
       this.store.getState()?.onboardingData?.user_id ?? 1,
     );
-    const recommendationTasks = this.exercises.map(async (exercise) => {
+    const exerciseIds = [];
+    this.exercises.forEach((exercise) => {
       if (!exercise.exercise_id) {
         this.missingExercises.add(
           exercise.sequence ?? exercise.name ?? "Exercise",
         );
         return;
       }
-      try {
-        const response = await fetch(
-          `/progression/recommendations?user_id=${userId}&exercise_id=${exercise.exercise_id}`,
-        );
-        if (!response.ok) {
+      exerciseIds.push(exercise.exercise_id);
+    });
+
+    const markAllFailed = () => {
+      this.exercises.forEach((exercise) => {
+        if (exercise.exercise_id) {
           this.recommendationFailures.add(
             exercise.name ?? exercise.exercise_id,
           );
-          return;
         }
-        const payload = await response.json();
-        if (!payload) {
-          this.recommendationFailures.add(
-            exercise.name ?? exercise.exercise_id,
-          );
-          return;
+      });
+    };
+
+    if (exerciseIds.length) {
+      try {
+        const response = await fetch(
+          `/progression/recommendations/batch?user_id=${userId}&exercise_ids=${exerciseIds.join(",")}`,
+        );
+        if (!response.ok) {
+          markAllFailed();
+        } else {
+          const payload = await response.json();
+          const results = Array.isArray(payload) ? payload : [];
+          results.forEach((entry) => {
+            // Unknown ids come back with an error; they are marked as
+            // failed below without affecting the rest of the day.
+            if (entry?.exercise_id && !entry.error) {
+              this.recommendations.set(entry.exercise_id, entry);
+            }
+          });
+          this.exercises.forEach((exercise) => {
+            if (
+              exercise.exercise_id &&
+              !this.recommendations.has(exercise.exercise_id)
+            ) {
+              this.recommendationFailures.add(
+                exercise.name ?? exercise.exercise_id,
+              );
+            }
+          });
         }
-        this.recommendations.set(exercise.exercise_id, payload);
       } catch (error) {
-        this.recommendationFailures.add(
-          exercise.name ?? exercise.exercise_id,
-        );
-        return;
+        markAllFailed();
       }
-    });
-
-    await Promise.all(recommendationTasks);
+    }
     if (this.saveButton) {
       this.saveButton.disabled =
         this.missingExercises.size > 0 || this.isReadOnly;